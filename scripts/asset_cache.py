@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for generated Dictée assets.
+
+Every generated artifact (sentence text, TTS audio, image) is stored under a
+key that hashes everything that went into producing it: the model, the prompt
+text, the voice, the language and the request config. Because the key only
+depends on the inputs, the cache is shared by every week: a word that shows up
+again in another week, or a re-run with a different --path, is served from the
+cache without an API call.
+
+Hits are materialized into the week directory with a hardlink (or a reflink,
+or a plain copy as a last resort), so a shared asset costs no extra disk.
+Since week files may share an inode with the cache, week files must never be
+modified in place: materialize() always replaces the destination.
+
+The cache is bounded by size and evicts least recently used entries; a hit
+refreshes the entry's access time. Its mtime is left alone, and a week file
+hardlinked to the blob shares it, so a restored asset can be older than
+variants built from a different one: the generator rebuilds the variants
+(and the sprite) of every asset it writes rather than trusting mtimes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GiB
+
+
+def cache_key(**parts) -> str:
+    """Stable SHA-256 over the (JSON-serializable) inputs of a generation."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    """Copy-on-write clone (Linux FICLONE). Raises OSError if unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("reflink not supported on this platform")
+
+    FICLONE = 0x40049409
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dst.unlink(missing_ok=True)
+            raise
+
+
+class AssetCache:
+    """A directory of blobs named <key[:2]>/<key><suffix>."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.total_bytes = sum(p.stat().st_size for p in self._entries())
+
+    def _entries(self):
+        return (p for p in self.root.glob("??/*") if p.is_file() and not p.name.startswith("."))
+
+    def path(self, key: str, suffix: str) -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def get_path(self, key: str, suffix: str) -> Path | None:
+        """Return the blob path on a hit (and mark it recently used)."""
+        path = self.path(key, suffix)
+        try:
+            os.utime(path, ns=(time.time_ns(), path.stat().st_mtime_ns))
+        except FileNotFoundError:
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return path
+
+    def get_text(self, key: str) -> str | None:
+        path = self.get_path(key, ".txt")
+        if path is None:
+            return None
+        return path.read_text(encoding="utf-8")
+
+    def put(self, key: str, suffix: str, data: bytes) -> Path:
+        """Store a blob (atomically) and return its path."""
+        path = self.path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        replaced = path.stat().st_size if path.exists() else 0
+        os.replace(tmp, path)
+
+        with self.lock:
+            self.total_bytes += len(data) - replaced
+        self.evict()
+        return path
+
+    def put_file(self, key: str, suffix: str, src: Path) -> Path:
+        """Store an already written file (linked, not read) and return its path."""
+        path = self.path(key, suffix)
+        replaced = path.stat().st_size if path.exists() else 0
+        self.link(Path(src), path)
+
+        with self.lock:
+            self.total_bytes += path.stat().st_size - replaced
+        self.evict()
+        return path
+
+    def put_text(self, key: str, text: str) -> Path:
+        return self.put(key, ".txt", text.encode("utf-8"))
+
+    def materialize(self, key: str, suffix: str, dest: Path) -> bool:
+        """
+        Place the cached blob at dest via hardlink, reflink or copy.
+        Returns False on a cache miss.
+        """
+        src = self.get_path(key, suffix)
+        if src is None:
+            return False
+        self.link(src, dest)
+        return True
+
+    def link(self, src: Path, dest: Path) -> None:
+        """Replace dest with a hardlink/reflink/copy of the cache blob src."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.{threading.get_ident()}.tmp")
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(src, tmp)
+        except OSError:
+            try:
+                _reflink(src, tmp)
+            except OSError:
+                shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+        # Renaming a hardlink over another link to the same file is a no-op
+        # that leaves the source name behind
+        tmp.unlink(missing_ok=True)
+
+    def discard_copies(self, paths: list[Path]) -> int:
+        """
+        Remove the blobs hardlinked to any of `paths` (say, corrupt week
+        files), so the next run regenerates them instead of linking the same
+        bytes back. Returns the number of blobs removed.
+        """
+        inodes = set()
+        for path in paths:
+            st = Path(path).stat()
+            if st.st_nlink > 1:
+                inodes.add((st.st_dev, st.st_ino))
+        if not inodes:
+            return 0
+
+        removed = 0
+        for p in list(self._entries()):
+            st = p.stat()
+            if (st.st_dev, st.st_ino) in inodes:
+                p.unlink(missing_ok=True)
+                with self.lock:
+                    self.total_bytes -= st.st_size
+                removed += 1
+        return removed
+
+    def evict(self) -> None:
+        """Drop least recently used blobs until the cache fits max_bytes."""
+        with self.lock:
+            if self.total_bytes <= self.max_bytes:
+                return
+            entries = []
+            for p in self._entries():
+                st = p.stat()
+                entries.append((st.st_atime, st.st_size, p))
+            entries.sort()
+            for _, size, p in entries:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                self.total_bytes -= size
+                self.evicted += 1
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses, {self.evicted} evicted, "
+            f"{self.total_bytes / 1024 ** 2:.1f} MB in {self.root}"
+        )
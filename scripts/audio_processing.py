@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+Offline audio processing for the Dictée asset generator.
+
+Encoding uses soundfile (libsndfile >= 1.1 bundles Opus and MP3 encoders), so
+compressed variants can be produced locally without ffmpeg or any API call.
+The generated WAV stays the source of truth; compressed variants are derived
+from it and rebuilt whenever the WAV is newer.
+
+Slower and faster speech is derived the same way: one TTS clip is
+time-stretched locally (WSOLA keeps the pitch) instead of asking the API
+for every speed.
+"""
+
+import os
+import re
+import shutil
+import wave
+from pathlib import Path
+
+
+# Compressed variants, in the order the client should prefer them
+AUDIO_FORMATS = {
+    "opus": {"format": "OGG", "subtype": "OPUS", "suffix": ".opus"},
+    "mp3": {"format": "MP3", "subtype": "MPEG_LAYER_III", "suffix": ".mp3"},
+}
+DEFAULT_AUDIO_FORMATS = ["opus", "mp3"]
+
+# Silence trimming and loudness normalization of TTS clips
+TRIM_THRESHOLD_DB = -40.0   # frames this far below the loudest frame count as silence
+TRIM_PADDING = 0.05         # seconds of silence kept before and after the speech
+TARGET_LOUDNESS_DB = -20.0  # RMS of the speech frames, in dBFS
+PEAK_CEILING_DB = -1.0      # never amplify peaks above this
+FADE = 0.01                 # seconds of fade in/out
+FRAME = 0.01                # analysis frame length in seconds
+CLEAN_CHUNK = 1 << 16       # samples clean_wav() reads at a time
+
+# Splitting a merged word+sentence TTS clip at its longest pause
+SPLIT_MIN_GAP = 0.25      # seconds of silence the split pause must last at least
+SPLIT_GAP_RATIO = 1.5     # ...and how much longer than any other pause it must be
+SPLIT_MIN_SPEECH = 0.15   # seconds of speech each side must contain
+
+# Local time-stretching (WSOLA) for speed variants
+DEFAULT_SPEEDS = [0.75, 1.25]
+WSOLA_WINDOW = 0.03     # seconds per overlap-add segment
+WSOLA_TOLERANCE = 0.01  # seconds the segment may shift to stay in phase
+SPEED_SUFFIX = re.compile(r"_\d+(\.\d+)?x$")
+
+
+def parse_formats(value: str) -> list[str]:
+    """Parse a comma-separated --audio-formats value ("" or "none" disables)."""
+    formats = [f.strip().lower() for f in value.split(",") if f.strip()]
+    if formats == ["none"]:
+        return []
+    unknown = [f for f in formats if f not in AUDIO_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown audio format(s): {', '.join(unknown)} (choose from {', '.join(AUDIO_FORMATS)})")
+    return formats
+
+
+def variant_path(wav_path: Path, fmt: str) -> Path:
+    return wav_path.with_suffix(AUDIO_FORMATS[fmt]["suffix"])
+
+
+def read_wav(wav_path: Path):
+    """Read a 16-bit mono WAV into an int16 NumPy array. Returns (samples, rate)."""
+    import numpy as np
+
+    with wave.open(str(wav_path), "rb") as wf:
+        rate = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+    return np.frombuffer(frames, dtype="<i2"), rate
+
+
+def write_wav(wav_path: Path, samples, rate: int) -> None:
+    """Write int16 samples as a mono WAV, replacing the file (never in place)."""
+    tmp_path = wav_path.with_name(f".{wav_path.name}.{os.getpid()}.tmp")
+    with wave.open(str(tmp_path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype("<i2").tobytes())
+    os.replace(tmp_path, wav_path)
+
+
+def speech_bounds(rms, n_samples: int, rate: int, threshold_db: float = TRIM_THRESHOLD_DB):
+    """
+    From the RMS level of each FRAME of a clip: the (start, end) samples to
+    keep around the speech and the RMS of the speech frames, or None if the
+    clip is silent.
+    """
+    import numpy as np
+
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+    active = db > db.max() + threshold_db
+    if not active.any() or rms.max() < 1e-6:
+        return None
+
+    frame = max(1, round(FRAME * rate))
+    first, last = np.flatnonzero(active)[[0, -1]]
+    padding = round(TRIM_PADDING * rate)
+    start = max(0, first * frame - padding)
+    end = min(n_samples, (last + 1) * frame + padding)
+    return int(start), int(end), np.sqrt(np.mean(rms[active] ** 2))
+
+
+def speech_gain(speech_rms, peak, target_db: float = TARGET_LOUDNESS_DB):
+    """Gain that brings the speech RMS to target_db, capped to keep the peak under PEAK_CEILING_DB."""
+    gain = 10 ** (target_db / 20) / speech_rms
+    if peak > 0:
+        gain = min(gain, 10 ** (PEAK_CEILING_DB / 20) / peak)
+    return gain
+
+
+def fade_ramp(length: int, rate: int, fade: float = FADE):
+    import numpy as np
+
+    return np.linspace(0.0, 1.0, min(round(fade * rate), length // 2), dtype=np.float32)
+
+
+def apply_fades(x, offset: int, length: int, ramp) -> None:
+    """Fade in/out, in place, the part `x` (starting at `offset`) of a clip `length` samples long."""
+    n_fade = len(ramp)
+    if n_fade == 0:
+        return
+    lo, hi = offset, offset + len(x)
+    a, b = max(lo, 0), min(hi, n_fade)
+    if a < b:
+        x[a - lo:b - lo] *= ramp[a:b]
+    tail = length - n_fade
+    a, b = max(lo, tail), min(hi, length)
+    if a < b:
+        x[a - lo:b - lo] *= ramp[::-1][a - tail:b - tail]
+
+
+def clean_pcm(
+    samples,
+    rate: int,
+    threshold_db: float = TRIM_THRESHOLD_DB,
+    target_db: float = TARGET_LOUDNESS_DB,
+    fade: float = FADE,
+):
+    """
+    Trim leading/trailing silence, normalize loudness and fade the edges.
+
+    Silence is detected per FRAME from RMS energy relative to the loudest
+    frame, so the threshold works the same for quiet and loud clips.
+    Loudness is the RMS of the non-silent frames only, so pauses inside a
+    sentence don't skew the gain; the gain is capped to keep peaks under
+    PEAK_CEILING_DB. Takes and returns int16 NumPy arrays.
+    """
+    import numpy as np
+
+    x = np.asarray(samples, dtype=np.float32) / 32768.0
+    frame = max(1, round(FRAME * rate))
+    n_frames = len(x) // frame
+    if n_frames == 0:
+        return np.asarray(samples, dtype="<i2")
+
+    frames = x[:n_frames * frame].reshape(n_frames, frame)
+    bounds = speech_bounds(np.sqrt(np.mean(frames ** 2, axis=1)), len(x), rate, threshold_db)
+    if bounds is None:
+        return np.asarray(samples, dtype="<i2")
+
+    # Trim, keeping a little padding around the speech, then normalize the
+    # speech frames' RMS without pushing peaks into clipping
+    start, end, speech_rms = bounds
+    x = x[start:end]
+    x = x * speech_gain(speech_rms, np.abs(x).max(), target_db)
+
+    # Short linear fades so the cut never clicks
+    apply_fades(x, 0, len(x), fade_ramp(len(x), rate, fade))
+
+    return np.clip(np.round(x * 32768.0), -32768, 32767).astype("<i2")
+
+
+def split_at_pause(samples, rate: int, threshold_db: float = TRIM_THRESHOLD_DB) -> int | None:
+    """
+    Find where to cut a "word ... sentence" clip in two: the middle of the
+    longest pause between speech. Returns the sample index, or None if the
+    clip doesn't split cleanly.
+
+    Silence is detected per FRAME as in clean_pcm(). The split is rejected
+    when the longest pause is shorter than SPLIT_MIN_GAP or not clearly
+    longer (SPLIT_GAP_RATIO) than the next one, since a sentence has pauses
+    of its own, or when either side has less than SPLIT_MIN_SPEECH of speech.
+    """
+    import numpy as np
+
+    x = np.asarray(samples, dtype=np.float32) / 32768.0
+    frame = max(1, round(FRAME * rate))
+    n_frames = len(x) // frame
+    if n_frames == 0:
+        return None
+
+    rms = np.sqrt(np.mean(x[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+    active = db > db.max() + threshold_db
+    speech = np.flatnonzero(active)
+    if len(speech) < 2:
+        return None
+
+    # Runs of silence strictly between the first and last speech frame
+    edges = np.diff(active[speech[0]:speech[-1] + 1].astype(np.int8))
+    starts = np.flatnonzero(edges == -1) + 1 + speech[0]
+    ends = np.flatnonzero(edges == 1) + 1 + speech[0]
+    if len(starts) == 0:
+        return None
+    lengths = ends - starts
+    order = np.argsort(lengths)[::-1]
+    longest = lengths[order[0]]
+    runner_up = lengths[order[1]] if len(order) > 1 else 0
+
+    if longest * FRAME < SPLIT_MIN_GAP or longest < SPLIT_GAP_RATIO * runner_up:
+        return None
+    start, end = starts[order[0]], ends[order[0]]
+    min_speech = SPLIT_MIN_SPEECH / FRAME
+    if active[:start].sum() < min_speech or active[end:].sum() < min_speech:
+        return None
+    return int((start + end) // 2 * frame)
+
+
+def split_pcm_bytes(pcm_data: bytes, rate: int, **params) -> tuple[bytes, bytes] | None:
+    """split_at_pause() over raw 16-bit PCM bytes: (before, after) or None."""
+    import numpy as np
+
+    cut = split_at_pause(np.frombuffer(pcm_data, dtype="<i2"), rate, **params)
+    if cut is None:
+        return None
+    return pcm_data[:cut * 2], pcm_data[cut * 2:]
+
+
+def clean_pcm_bytes(pcm_data: bytes, rate: int, **params) -> bytes:
+    """clean_pcm() over raw little-endian 16-bit PCM bytes."""
+    import numpy as np
+
+    return clean_pcm(np.frombuffer(pcm_data, dtype="<i2"), rate, **params).tobytes()
+
+
+def clean_wav(
+    wav_path: Path,
+    threshold_db: float = TRIM_THRESHOLD_DB,
+    target_db: float = TARGET_LOUDNESS_DB,
+    dest_path: Path | None = None,
+) -> tuple[float, float]:
+    """
+    clean_pcm() over a WAV on disk, CLEAN_CHUNK samples at a time, so the
+    clip is never held in memory: one pass for the frame levels, one for
+    the peak of the kept range, one to write it. Replaces dest_path (by
+    default the WAV itself). Returns the durations (seconds) before and
+    after.
+    """
+    import numpy as np
+
+    wav_path = Path(wav_path)
+    dest_path = Path(dest_path or wav_path)
+    with wave.open(str(wav_path), "rb") as wf:
+        rate = wf.getframerate()
+        n_samples = wf.getnframes()
+        frame = max(1, round(FRAME * rate))
+        step = max(1, CLEAN_CHUNK // frame) * frame
+
+        def chunks(start: int, end: int):
+            """(offset from start, float32 samples) of [start, end)."""
+            wf.setpos(start)
+            for offset in range(0, end - start, step):
+                data = wf.readframes(min(step, end - start - offset))
+                yield offset, np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+        n_frames = n_samples // frame
+        levels = [
+            np.sqrt(np.mean(x.reshape(-1, frame) ** 2, axis=1))
+            for _, x in chunks(0, n_frames * frame)
+        ]
+        bounds = speech_bounds(np.concatenate(levels), n_samples, rate, threshold_db) if n_frames else None
+        if bounds is None:
+            if dest_path != wav_path:
+                shutil.copyfile(wav_path, dest_path)
+            return n_samples / rate, n_samples / rate
+
+        start, end, speech_rms = bounds
+        peak = max(np.abs(x).max() for _, x in chunks(start, end))
+        gain = speech_gain(speech_rms, peak, target_db)
+        ramp = fade_ramp(end - start, rate)
+
+        tmp_path = dest_path.with_name(f".{dest_path.name}.{os.getpid()}.tmp")
+        with wave.open(str(tmp_path), "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(rate)
+            for offset, x in chunks(start, end):
+                x = x * gain
+                apply_fades(x, offset, end - start, ramp)
+                out.writeframes(np.clip(np.round(x * 32768.0), -32768, 32767).astype("<i2").tobytes())
+    os.replace(tmp_path, dest_path)
+    return n_samples / rate, (end - start) / rate
+
+
+def parse_speeds(value: str) -> list[float]:
+    """Parse a comma-separated --speeds value ("" or "none" disables); 1.0 is implied."""
+    if value.strip().lower() in ("", "none"):
+        return []
+    speeds = sorted({float(v) for v in value.split(",") if v.strip()})
+    if any(speed <= 0 for speed in speeds):
+        raise ValueError("Speeds must be positive")
+    return [speed for speed in speeds if speed != 1.0]
+
+
+def speed_label(speed: float) -> str:
+    return f"{speed:g}x"
+
+
+def speed_variant_path(wav_path: Path, speed: float) -> Path:
+    return wav_path.with_name(f"{wav_path.stem}_{speed_label(speed)}.wav")
+
+
+def is_speed_variant(wav_path: Path) -> bool:
+    return SPEED_SUFFIX.search(Path(wav_path).stem) is not None
+
+
+def time_stretch(samples, rate: int, speed: float):
+    """
+    Change the tempo of int16 speech by `speed` (0.75 = slower) without
+    changing its pitch, using WSOLA (waveform-similarity overlap-add).
+
+    Output segments are laid down every hop; each input segment is taken
+    near its nominal position, shifted by up to WSOLA_TOLERANCE to best
+    match the natural continuation of the previous segment (found with a
+    cross-correlation), so the overlap-add stays in phase.
+    """
+    import numpy as np
+
+    x = np.asarray(samples, dtype=np.float32)
+    if speed == 1.0 or len(x) == 0:
+        return np.asarray(samples, dtype="<i2")
+
+    win = max(2, round(WSOLA_WINDOW * rate)) // 2 * 2
+    hop = win // 2
+    tol = round(WSOLA_TOLERANCE * rate)
+    window = np.hanning(win + 1)[:win].astype(np.float32)  # periodic: sums to 1 at 50% overlap
+
+    # Pad so every template and search region stays in bounds
+    padded = np.concatenate([np.zeros(tol, np.float32), x, np.zeros(win + hop + tol, np.float32)])
+    n_out = round(len(x) / speed)
+    n_frames = n_out // hop + 1
+    out = np.zeros(n_frames * hop + win, dtype=np.float32)
+    norm = np.zeros_like(out)
+
+    prev = tol  # start of the previous segment in `padded`
+    for k in range(n_frames):
+        nominal = tol + round(k * hop * speed)
+        if nominal + win > len(padded) - tol:
+            break
+        if k == 0:
+            start = nominal
+        else:
+            template = padded[prev + hop:prev + hop + win]
+            region = padded[nominal - tol:nominal + tol + win]
+            corr = np.correlate(region, template, mode="valid")
+            start = nominal - tol + int(np.argmax(corr))
+        out[k * hop:k * hop + win] += padded[start:start + win] * window
+        norm[k * hop:k * hop + win] += window
+        prev = start
+
+    out = out[:n_out] / np.maximum(norm[:n_out], 1e-3)
+    return np.clip(np.round(out), -32768, 32767).astype("<i2")
+
+
+def stretch_wav(wav_path: Path, speeds: list[float], formats: list[str], force: bool = False) -> dict[float, dict[str, Path]]:
+    """
+    Write a time-stretched copy of the WAV for every speed, plus its
+    compressed variants. Copies newer than the source are kept unless force
+    is set. Returns {speed: {format: path}} including "wav".
+    """
+    wav_path = Path(wav_path)
+    wav_mtime = wav_path.stat().st_mtime
+    samples = rate = None
+    variants = {}
+
+    for speed in speeds:
+        out_path = speed_variant_path(wav_path, speed)
+        if force or not out_path.exists() or out_path.stat().st_mtime < wav_mtime:
+            if samples is None:
+                samples, rate = read_wav(wav_path)
+            write_wav(out_path, time_stretch(samples, rate, speed), rate)
+
+        variants[speed] = {**encode_wav(out_path, formats, force), "wav": out_path}
+
+    return variants
+
+
+def encode_wav(wav_path: Path, formats: list[str], force: bool = False) -> dict[str, Path]:
+    """
+    Encode a WAV into each compressed format next to it.
+
+    Variants that are already newer than the WAV are kept unless force is
+    set. Returns {format: path} for every variant that exists afterwards.
+    Runs in worker processes, so it only takes and returns picklable values.
+    """
+    import soundfile as sf
+
+    wav_path = Path(wav_path)
+    wav_mtime = wav_path.stat().st_mtime
+    samples = None
+    rate = None
+    variants = {}
+
+    for fmt in formats:
+        out_path = variant_path(wav_path, fmt)
+        if not force and out_path.exists() and out_path.stat().st_mtime >= wav_mtime:
+            variants[fmt] = out_path
+            continue
+
+        if samples is None:
+            samples, rate = read_wav(wav_path)
+
+        spec = AUDIO_FORMATS[fmt]
+        tmp_path = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+        sf.write(str(tmp_path), samples, rate, format=spec["format"], subtype=spec["subtype"])
+        os.replace(tmp_path, out_path)
+        variants[fmt] = out_path
+
+    return variants
+
+
+class PcmStreamWriter:
+    """
+    Write 16-bit mono PCM that arrives in chunks (a streamed TTS response)
+    to a WAV, and optionally to compressed variants encoded on the fly, so
+    the clip is never held in memory and encoding overlaps the transfer.
+
+    Everything is written under temporary names and renamed into place on
+    close(), the WAV first so the variants count as up to date for
+    encode_wav(); abort() (or an exception inside a `with` block) drops
+    them. Chunks may split a sample; the odd byte is carried over.
+    """
+
+    def __init__(self, wav_path: Path, rate: int, formats: list[str] = ()):
+        import soundfile as sf
+
+        self.wav_path = Path(wav_path)
+        self.received = 0
+        self.carry = b""
+        self.tmp_paths = {"wav": self.wav_path.with_name(f".{self.wav_path.name}.{os.getpid()}.{id(self)}.tmp")}
+        self.wav = wave.open(str(self.tmp_paths["wav"]), "wb")
+        self.wav.setnchannels(1)
+        self.wav.setsampwidth(2)
+        self.wav.setframerate(rate)
+
+        self.encoders = {}
+        for fmt in formats:
+            spec = AUDIO_FORMATS[fmt]
+            out_path = variant_path(self.wav_path, fmt)
+            self.tmp_paths[fmt] = out_path.with_name(f".{out_path.name}.{os.getpid()}.{id(self)}.tmp")
+            self.encoders[fmt] = sf.SoundFile(
+                str(self.tmp_paths[fmt]), "w", samplerate=rate, channels=1, format=spec["format"], subtype=spec["subtype"]
+            )
+
+    def write(self, pcm_data: bytes) -> None:
+        import numpy as np
+
+        self.received += len(pcm_data)
+        pcm_data = self.carry + pcm_data
+        whole = len(pcm_data) - len(pcm_data) % 2
+        pcm_data, self.carry = pcm_data[:whole], pcm_data[whole:]
+        if not pcm_data:
+            return
+        self.wav.writeframes(pcm_data)
+        if self.encoders:
+            samples = np.frombuffer(pcm_data, dtype="<i2")
+            for encoder in self.encoders.values():
+                encoder.write(samples)
+
+    def close(self) -> dict[str, Path]:
+        """Finish every file. Returns {format: path, "wav": path}."""
+        self.wav.close()
+        for encoder in self.encoders.values():
+            encoder.close()
+        if not self.received:
+            self._remove()
+            raise ValueError(f"No audio received for {self.wav_path.name}")
+
+        outputs = {"wav": self.wav_path}
+        os.replace(self.tmp_paths["wav"], self.wav_path)
+        for fmt in self.encoders:
+            outputs[fmt] = variant_path(self.wav_path, fmt)
+            os.replace(self.tmp_paths[fmt], outputs[fmt])
+        return outputs
+
+    def abort(self) -> None:
+        self.wav.close()
+        for encoder in self.encoders.values():
+            encoder.close()
+        self._remove()
+
+    def _remove(self) -> None:
+        for tmp_path in self.tmp_paths.values():
+            tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def encoder_available() -> bool:
+    """True if soundfile is installed and its libsndfile can write Opus and MP3."""
+    try:
+        import soundfile as sf
+    except (ImportError, OSError):
+        return False
+    return all(sf.check_format(spec["format"], spec["subtype"]) for spec in AUDIO_FORMATS.values())
+
+
+def build_sprite(clips: list[tuple[object, Path]], sprite_path: Path, gap: float = 0.5) -> dict:
+    """
+    Concatenate WAV clips into one sprite WAV, with `gap` seconds of
+    silence before, between and after the clips so a player that overshoots
+    an offset (or an MP3 encoder's padding) never bleeds into a neighbour.
+
+    `clips` is a list of (name, wav_path) with any hashable name. Returns
+    {name: {"start": seconds, "duration": seconds}} for every clip that was
+    packed. Clips whose sample rate differs from the first are left
+    out.
+    """
+    import numpy as np
+
+    pieces = []
+    offsets = {}
+    rate = None
+    position = 0
+
+    for name, wav_path in clips:
+        samples, clip_rate = read_wav(wav_path)
+        if rate is None:
+            rate = clip_rate
+            silence = np.zeros(round(gap * rate), dtype="<i2")
+            pieces.append(silence)
+            position = len(silence)
+        elif clip_rate != rate:
+            continue
+
+        offsets[name] = {
+            "start": round(position / rate, 3),
+            "duration": round(len(samples) / rate, 3),
+        }
+        pieces.append(samples)
+        pieces.append(silence)
+        position += len(samples) + len(silence)
+
+    if rate is None:
+        return {}
+
+    write_wav(sprite_path, np.concatenate(pieces), rate)
+
+    return offsets
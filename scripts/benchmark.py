@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the Dictée asset generator.
+
+Runs generate_assets.py end to end against the FakeClient (fake_client.py)
+in a scratch public/ directory, so pipeline changes can be measured on any
+machine without Vertex AI credentials. Each benchmark builds weeks of
+realistic sizes from the real word lists and runs three scenarios:
+
+    cold         empty cache, every asset is generated
+    warm         fresh week directories, every asset comes from the cache
+    incremental  nothing changed, nothing to do
+
+and reports words/min, API calls per word and bytes written for each.
+
+Time is compressed by --speedup: fake API latencies are divided by it and
+rate limits multiplied by it, so a run that would wait 10 minutes on the
+real API waits 30 seconds. CPU-bound post-processing (encoding, resizing)
+isn't compressed, so it weighs more here than in a real run; pass
+`-- --audio-formats none --image-formats none` to leave it out.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --weeks 15,47,47 --throttle-rate 0.05 --json bench.json
+    python benchmark.py --baseline bench.json   # exit 1 on a regression
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+import generate_assets as ga
+from fake_client import DEFAULT_LATENCY, FakeClient
+from metrics import Metrics
+
+
+SCENARIOS = ("cold", "warm", "incremental")
+DEFAULT_WEEKS = "15,47"
+DEFAULT_SPEEDUP = 20.0
+REGRESSION_TOLERANCE = 0.10  # allowed relative drop in words/min vs --baseline
+
+
+def sample_words(count: int, offset: int) -> list[str]:
+    """`count` real words from the repo's word lists (cycled if needed)."""
+    pool = []
+    for words_file in sorted(ga.PUBLIC_DIR.glob("*/words_of_week.txt")):
+        pool.extend(ga.read_words(words_file))
+    pool = list(dict.fromkeys(pool)) or [f"mot{i}" for i in range(100)]
+
+    words = []
+    for i in range(offset, offset + count):
+        cycle, index = divmod(i, len(pool))
+        words.append(pool[index] if cycle == 0 else f"{pool[index]}{cycle}")
+    return words
+
+
+def make_weeks(public_dir: Path, sizes: list[int]) -> None:
+    """Write bench weeks (word lists + metadata.yaml) under public_dir."""
+    offset = 0
+    entries = []
+    for i, size in enumerate(sizes):
+        path = f"bench{i + 1}"
+        (public_dir / path).mkdir(parents=True, exist_ok=True)
+        (public_dir / path / "words_of_week.txt").write_text("\n".join(sample_words(size, offset)) + "\n", encoding="utf-8")
+        offset += size
+        entries.append({
+            "sounds": path, "path": path, "week_start": f"2026-01-{i + 1:02d}", "week_end": f"2026-01-{i + 1:02d}",
+            "date_of_generation": "2026-01-01", "source": "words_of_week.txt", "language": "fr",
+        })
+    ga.write_asset(public_dir / "metadata.yaml", yaml.dump({"dictee": entries}, allow_unicode=True).encode("utf-8"))
+
+
+def clear_week_outputs(public_dir: Path) -> None:
+    """Drop generated files but keep word lists and metadata."""
+    for week_dir in public_dir.iterdir():
+        if week_dir.is_dir():
+            for child in week_dir.iterdir():
+                if child.name != "words_of_week.txt":
+                    shutil.rmtree(child) if child.is_dir() else child.unlink()
+
+
+def tree_bytes(root: Path) -> int:
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+
+def run_scenario(name: str, public_dir: Path, cache_dir: Path, args: argparse.Namespace) -> dict:
+    """Run one `generate --all` against a fresh FakeClient and measure it."""
+    ga.PUBLIC_DIR = public_dir
+    ga.METADATA_FILE = public_dir / "metadata.yaml"
+    ga.client = FakeClient(
+        latency={family: seconds / args.speedup for family, seconds in DEFAULT_LATENCY.items()},
+        throttle_rate=args.throttle_rate,
+        failure_rate=args.failure_rate,
+        image_size=args.image_size,
+        seed=args.seed,
+    )
+    ga.metrics = Metrics()
+    ga.asset_cache = None
+    ga.registry = None
+
+    limits = {model: rpm * args.speedup for model, rpm in ga.RATE_LIMITS.items()}
+    argv = [
+        "generate", "--all",
+        "--cache-dir", str(cache_dir),
+        "--concurrency", str(args.concurrency),
+        "--text-rpm", str(limits[ga.language_model]),
+        "--speech-rpm", str(limits[ga.speech_model]),
+        "--image-rpm", str(limits[ga.image_model]),
+        *args.generate_args,
+    ]
+
+    before = tree_bytes(public_dir)
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+        ga.main(argv)
+    elapsed = time.perf_counter() - started
+
+    words = sum(len(ga.read_words(p)) for p in public_dir.glob("*/words_of_week.txt"))
+    stats = ga.client.models.stats
+    calls = {model: s["calls"] for model, s in stats.items()}
+    return {
+        "scenario": name,
+        "words": words,
+        "seconds": round(elapsed, 3),
+        "words_per_min": round(words / elapsed * 60, 1),
+        "api_calls_per_word": round(sum(calls.values()) / words, 3),
+        "calls": calls,
+        "throttled": sum(s["throttled"] for s in stats.values()),
+        "failed": sum(s["failed"] for s in stats.values()),
+        "bytes_written": tree_bytes(public_dir) - before,
+    }
+
+
+def print_results(results: list[dict]) -> None:
+    print(f"{'scenario':<12} {'words':>5} {'seconds':>8} {'words/min':>10} {'calls/word':>10} {'429s':>5} {'MB written':>10}")
+    for r in results:
+        print(
+            f"{r['scenario']:<12} {r['words']:>5} {r['seconds']:>8.2f} {r['words_per_min']:>10.1f} "
+            f"{r['api_calls_per_word']:>10.2f} {r['throttled']:>5} {r['bytes_written'] / 1024 ** 2:>10.1f}"
+        )
+
+
+def check_baseline(results: list[dict], baseline_file: Path) -> list[str]:
+    """Regressions vs a previous --json result: slower, or more API calls per word."""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = {r["scenario"]: r for r in json.load(f)["results"]}
+
+    problems = []
+    for r in results:
+        base = baseline.get(r["scenario"])
+        if base is None:
+            continue
+        if r["words_per_min"] < base["words_per_min"] * (1 - REGRESSION_TOLERANCE):
+            problems.append(f"{r['scenario']}: {r['words_per_min']} words/min vs {base['words_per_min']} in baseline")
+        if r["api_calls_per_word"] > base["api_calls_per_word"] + 1e-9:
+            problems.append(f"{r['scenario']}: {r['api_calls_per_word']} calls/word vs {base['api_calls_per_word']} in baseline")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark generate_assets.py offline with a simulated API",
+        epilog="Arguments after `--` are passed to `generate`, e.g. -- --audio-formats none",
+    )
+    parser.add_argument(
+        "--weeks",
+        default=DEFAULT_WEEKS,
+        help=f"Comma-separated number of words per week (default: {DEFAULT_WEEKS})"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=ga.DEFAULT_CONCURRENCY,
+        help=f"Words processed in parallel (default: {ga.DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--speedup",
+        type=float,
+        default=DEFAULT_SPEEDUP,
+        help=f"Divide API latency and multiply rate limits by this (default: {DEFAULT_SPEEDUP:g})"
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of calls answered with a 429 (default: 0)"
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of calls that fail with a server error (default: 0)"
+    )
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        default=1024,
+        help="Side of the fake PNGs in pixels (default: 1024)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for simulated latency, throttling and failures (default: 0)"
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"Comma-separated scenarios to run, in order (default: {','.join(SCENARIOS)})"
+    )
+    parser.add_argument(
+        "--json",
+        type=Path,
+        default=None,
+        help="Write the results to this file"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help=f"Compare with a previous --json file; exit 1 if words/min drops by more than {REGRESSION_TOLERANCE:.0%}% or calls/word rise"
+    )
+    parser.add_argument(
+        "--keep",
+        type=Path,
+        default=None,
+        help="Work in this directory and keep it, instead of a temporary one"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show the generator's output"
+    )
+    argv = sys.argv[1:] if argv is None else argv
+    generate_args = []
+    if "--" in argv:
+        generate_args = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+    args.generate_args = generate_args
+
+    sizes = [int(size) for size in args.weeks.split(",") if size.strip()]
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    work_dir = args.keep or Path(tempfile.mkdtemp(prefix="dictee-bench-"))
+    public_dir = work_dir / "public"
+    cache_dir = work_dir / "cache"
+    make_weeks(public_dir, sizes)
+
+    print(f"Benchmarking {sum(sizes)} words in {len(sizes)} week(s), concurrency {args.concurrency}, speedup {args.speedup:g}x")
+    results = []
+    try:
+        for scenario in scenarios:
+            if scenario == "cold":
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                clear_week_outputs(public_dir)
+            elif scenario == "warm":
+                clear_week_outputs(public_dir)
+            results.append(run_scenario(scenario, public_dir, cache_dir, args))
+    finally:
+        if args.keep is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_results(results)
+
+    if args.json:
+        report = {"weeks": sizes, "concurrency": args.concurrency, "speedup": args.speedup, "results": results}
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to: {args.json}")
+
+    if args.baseline:
+        problems = check_baseline(results, args.baseline)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
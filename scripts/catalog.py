@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Client catalog for the Dictée app.
+
+Without it the app fetches metadata.yaml, then each week's manifest.json,
+then every asset by a mutable path such as /gn_ph/audio/gnou_word.wav, so
+nothing can be cached for long. build_catalog() writes:
+
+    public/catalog.json        every week with its words, in one compact
+                               file (plus .gz, and .br if `brotli` is
+                               installed, for servers that serve them as is)
+    public/static/             each referenced asset under a content-hashed
+                               name (chat_word.3f2a9c1b04de.opus), hardlinked
+                               to the original, so it can be served with
+                               `Cache-Control: immutable`
+    public/precache.json       the catalog's URL and revision plus every
+                               asset URL grouped by format ("opus", "mp3",
+                               "webp@512", ...), for a service worker to
+                               precache what the device can use
+
+Hashes are remembered in public/static/.hashes.json by size and mtime, so
+a rebuild only reads new or changed files. Fingerprinted files no longer
+referenced are removed.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+
+CATALOG_NAME = "catalog.json"
+PRECACHE_NAME = "precache.json"
+STATIC_DIR_NAME = "static"
+HASH_INDEX_NAME = ".hashes.json"
+HASH_LENGTH = 12  # hex digits of sha256 kept in names and the version
+
+# Week fields copied from metadata.yaml into the catalog
+WEEK_FIELDS = ("sounds", "path", "week_start", "week_end", "date_of_generation", "language")
+
+# Manifest entry fields that stay out of the catalog (generator bookkeeping)
+PRIVATE_FIELDS = ("provenance",)
+
+
+def write_file(path: Path, data: bytes) -> bool:
+    """Atomically replace path with data, unless it already holds it. Returns True if written."""
+    if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return True
+
+
+def link_or_copy(src: Path, dest: Path) -> None:
+    tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dest)
+
+
+def brotli_compress(data: bytes) -> bytes | None:
+    """Brotli at max quality, or None if the `brotli` package isn't installed."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+class Fingerprinter:
+    """Content-hashed copies of public/ files under public/static/."""
+
+    def __init__(self, public_dir: Path):
+        self.public_dir = Path(public_dir)
+        self.static_dir = self.public_dir / STATIC_DIR_NAME
+        self.static_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.static_dir / HASH_INDEX_NAME
+        try:
+            self.index = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {}
+        self.used_index = {}
+        self.names = set()
+        self.hashed = 0
+        self.linked = 0
+        self.missing = []
+
+    def digest(self, path: Path, relative: str) -> str:
+        st = path.stat()
+        stamp = [st.st_size, st.st_mtime_ns]
+        known = self.used_index.get(relative) or self.index.get(relative)
+        if known and known[:2] == stamp:
+            digest = known[2]
+        else:
+            hasher = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(block)
+            digest = hasher.hexdigest()[:HASH_LENGTH]
+            self.hashed += 1
+        self.used_index[relative] = [*stamp, digest]
+        return digest
+
+    def url(self, url: str) -> str:
+        """Fingerprinted URL for a public/ URL (unchanged if the file is missing)."""
+        relative = url.lstrip("/")
+        path = self.public_dir / relative
+        if not path.is_file():
+            self.missing.append(url)
+            return url
+        name = f"{path.stem}.{self.digest(path, relative)}{path.suffix}"
+        dest = self.static_dir / name
+        if name not in self.names and not dest.exists():
+            link_or_copy(path, dest)
+            self.linked += 1
+        self.names.add(name)
+        return f"/{STATIC_DIR_NAME}/{name}"
+
+    def finish(self) -> int:
+        """Save the hash index and remove unreferenced fingerprinted files. Returns the number removed."""
+        removed = 0
+        for path in self.static_dir.iterdir():
+            if path.is_file() and not path.name.startswith(".") and path.name not in self.names:
+                path.unlink()
+                removed += 1
+        write_file(self.index_file, json.dumps(self.used_index, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        return removed
+
+
+def precache_group(keys: tuple, url: str) -> str:
+    """Group of an asset in precache.json: its format, with the width for resized images."""
+    if len(keys) >= 3 and keys[-3] == "imageSrcset":
+        return f"{keys[-2]}@{keys[-1]}"
+    return Path(url).suffix.lstrip(".").lower()
+
+
+def build_catalog(public_dir: Path, weeks: list[dict]) -> dict:
+    """
+    Write catalog.json (+ .gz/.br), public/static/ and precache.json for
+    `weeks` (metadata.yaml entries; weeks without a manifest.json are left
+    out). Returns stats: {"version", "weeks", "assets", "hashed", "linked",
+    "removed", "missing", "bytes", "gzip_bytes", "brotli_bytes"}.
+    """
+    public_dir = Path(public_dir)
+    fingerprinter = Fingerprinter(public_dir)
+    groups: dict[str, set] = {}
+
+    def rewrite(value, keys: tuple):
+        if isinstance(value, dict):
+            return {key: rewrite(item, (*keys, str(key))) for key, item in value.items()}
+        if isinstance(value, str) and value.startswith("/") and "/" in value[1:]:
+            url = fingerprinter.url(value)
+            groups.setdefault(precache_group(keys, value), set()).add(url)
+            return url
+        return value
+
+    catalog_weeks = []
+    for week in weeks:
+        manifest_file = public_dir / week["path"] / "manifest.json"
+        if not manifest_file.exists():
+            continue
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        catalog_week = {field: week[field] for field in WEEK_FIELDS if week.get(field) is not None}
+        catalog_week["generatedAt"] = manifest.get("generatedAt")
+        catalog_week["words"] = [
+            {key: rewrite(value, (key,)) for key, value in entry.items() if key not in PRIVATE_FIELDS}
+            for entry in manifest.get("words", [])
+        ]
+        if manifest.get("sprite"):
+            catalog_week["sprite"] = rewrite(manifest["sprite"], ("sprite",))
+        if manifest.get("preload"):
+            catalog_week["preload"] = manifest["preload"]
+        catalog_weeks.append(catalog_week)
+
+    body = json.dumps({"weeks": catalog_weeks}, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str)
+    version = hashlib.sha256(body.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+    data = json.dumps({"version": version, "weeks": catalog_weeks}, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+    catalog_file = public_dir / CATALOG_NAME
+    write_file(catalog_file, data)
+    gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+    write_file(catalog_file.with_name(CATALOG_NAME + ".gz"), gzipped)
+    brotli_data = brotli_compress(data)
+    if brotli_data is not None:
+        write_file(catalog_file.with_name(CATALOG_NAME + ".br"), brotli_data)
+
+    precache = {
+        "version": version,
+        "core": [{"url": f"/{CATALOG_NAME}", "revision": version}],
+        "assets": {group: sorted(urls) for group, urls in sorted(groups.items())},
+    }
+    write_file(public_dir / PRECACHE_NAME, json.dumps(precache, ensure_ascii=False, indent=1).encode("utf-8"))
+
+    removed = fingerprinter.finish()
+    return {
+        "version": version,
+        "weeks": len(catalog_weeks),
+        "assets": len(fingerprinter.names),
+        "hashed": fingerprinter.hashed,
+        "linked": fingerprinter.linked,
+        "removed": removed,
+        "missing": fingerprinter.missing,
+        "bytes": len(data),
+        "gzip_bytes": len(gzipped),
+        "brotli_bytes": len(brotli_data) if brotli_data is not None else None,
+    }
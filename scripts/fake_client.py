@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the genai client, for benchmarks and dry runs.
+
+FakeClient answers the calls the generator makes (models.generate_content
+for text and TTS, models.generate_content_stream for streamed TTS,
+models.generate_images) with deterministic content derived from the prompt:
+a sentence that contains the word, speech-like 24 kHz PCM whose length
+follows the text, and a 1024x1024 PNG. Latency, throttling (429s, either at random or above a
+per-model quota) and failures are configurable, so the pipeline's
+concurrency, rate limiting and retries can be exercised without Vertex AI.
+
+    python generate_assets.py --client fake --sounds ez --week-start ... --week-end ...
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from types import SimpleNamespace
+
+
+# Seconds per call before jitter, by model family
+DEFAULT_LATENCY = {"text": 0.8, "tts": 1.5, "image": 4.0}
+SAMPLE_RATE = 24000
+SECONDS_PER_CHAR = 0.07
+IMAGE_SIZE = 1024
+FIRST_CHUNK = 0.3  # share of a streamed call's latency before its first chunk
+
+
+class FakeQuotaError(Exception):
+    """Looks like a Vertex AI 429 to rate_limiter.is_quota_error()."""
+
+    code = 429
+
+
+def model_family(model: str) -> str:
+    if "tts" in model:
+        return "tts"
+    if "imagen" in model:
+        return "image"
+    return "text"
+
+
+def seed_of(*parts) -> int:
+    return int.from_bytes(hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).digest()[:8], "big")
+
+
+def fake_sentence(word: str) -> str:
+    templates = ["Le petit {w} est là.", "Regarde le {w} !", "J'aime le {w}.", "Voici un joli {w}."]
+    return templates[seed_of(word) % len(templates)].format(w=word)
+
+
+def fake_pcm(text: str) -> bytes:
+    """
+    Syllable-like tone bursts with silence around them, one per ~3 chars.
+    An ellipsis ("...") in the text becomes a long pause.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed_of(text))
+    pitch = 180 + 40 * rng.random()
+    silence = np.zeros(int(0.3 * SAMPLE_RATE))
+    pieces = [silence]
+    for i, segment in enumerate(part for part in text.split("...") if part.strip()):
+        if i:
+            pieces.append(np.zeros(int(0.8 * SAMPLE_RATE)))
+        speech = max(0.3, len(segment.strip()) * SECONDS_PER_CHAR)
+        t = np.arange(int(speech * SAMPLE_RATE)) / SAMPLE_RATE
+        envelope = np.abs(np.sin(np.pi * t / (3 * SECONDS_PER_CHAR)))
+        pieces.append(np.sin(2 * np.pi * pitch * t) * envelope * 9000 + rng.normal(0, 200, len(t)))
+    pieces.append(silence)
+    return np.clip(np.concatenate(pieces), -32768, 32767).astype("<i2").tobytes()
+
+
+def fake_png(prompt: str, size: int = IMAGE_SIZE) -> bytes:
+    """A deterministic RGB gradient PNG (stdlib + NumPy only)."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed_of(prompt))
+    base = rng.integers(0, 256, 3)
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    image = np.empty((size, size, 3), dtype=np.uint8)
+    image[..., 0] = (base[0] + ramp[None, :]) % 256
+    image[..., 1] = (base[1] + ramp[:, None]) % 256
+    image[..., 2] = (base[2] + (ramp[None, :] + ramp[:, None]) / 2) % 256
+    noise = rng.integers(0, 4, (size, size, 3), dtype=np.uint8)
+    image = image + noise  # some entropy, so the PNG is about Imagen-sized
+
+    raw = b"".join(b"\x00" + row.tobytes() for row in image)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+class FakeModels:
+    """The client.models namespace."""
+
+    def __init__(self, latency: dict | None = None, jitter: float = 0.5, throttle_rate: float = 0.0,
+                 failure_rate: float = 0.0, quota_rpm: dict | None = None, image_size: int = IMAGE_SIZE, seed: int = 0):
+        self.latency = {**DEFAULT_LATENCY, **(latency or {})}
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.failure_rate = failure_rate
+        self.quota_rpm = quota_rpm or {}
+        self.image_size = image_size
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.recent: dict[str, deque] = {}
+
+        # {model: {"calls": n, "throttled": n, "failed": n}}
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def _enter(self, model: str, wait: bool = True) -> float:
+        """
+        Count the call, maybe throttle or fail it, and sleep for its latency
+        (unless `wait` is False, for streams that pace themselves). Returns
+        the latency.
+        """
+        family = model_family(model)
+        with self.lock:
+            stats = self.stats.setdefault(model, {"calls": 0, "throttled": 0, "failed": 0})
+            stats["calls"] += 1
+            roll = self.random.random()
+            delay = self.latency[family] * (1 + self.jitter * (2 * self.random.random() - 1))
+
+            now = time.monotonic()
+            window = self.recent.setdefault(model, deque())
+            while window and now - window[0] > 60:
+                window.popleft()
+            over_quota = family in self.quota_rpm and len(window) >= self.quota_rpm[family]
+            if not over_quota:
+                window.append(now)
+
+            if over_quota or roll < self.throttle_rate:
+                stats["throttled"] += 1
+                error = FakeQuotaError(f"429 RESOURCE_EXHAUSTED: Quota exceeded for {model}")
+            elif roll < self.throttle_rate + self.failure_rate:
+                stats["failed"] += 1
+                error = RuntimeError(f"500 INTERNAL: simulated failure of {model}")
+            else:
+                error = None
+
+        # Rejections come back fast; successes take the full latency
+        if error:
+            time.sleep(delay * 0.1)
+            raise error
+        if wait:
+            time.sleep(delay)
+        return delay
+
+    def generate_content(self, model: str, contents: str, config=None):
+        self._enter(model)
+        if model_family(model) == "tts":
+            text = contents.split(":", 1)[-1].strip()
+            part = SimpleNamespace(inline_data=SimpleNamespace(data=fake_pcm(text), mime_type=f"audio/L16;rate={SAMPLE_RATE}"))
+            return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))], text=None)
+
+        if isinstance(config, dict) and config.get("response_mime_type") == "application/json":
+            # The word list is the "- word" block before the first blank line
+            words = re.findall(r"^- (.+)$", contents.split("\n\n")[0], re.M)
+            return SimpleNamespace(text=json.dumps([{"word": w, "sentence": fake_sentence(w)} for w in words], ensure_ascii=False))
+
+        match = re.search(r'"([^"]+)"', contents)
+        return SimpleNamespace(text=fake_sentence(match.group(1) if match else contents[:20]))
+
+    def generate_content_stream(self, model: str, contents: str, config=None):
+        """TTS as a stream of ~0.25 s chunks spread over the call's latency."""
+        delay = self._enter(model, wait=False)
+        text = contents.split(":", 1)[-1].strip()
+        pcm = fake_pcm(text)
+        step = SAMPLE_RATE // 4 * 2
+        chunks = [pcm[i:i + step] for i in range(0, len(pcm), step)]
+        time.sleep(delay * FIRST_CHUNK)
+        for chunk in chunks:
+            part = SimpleNamespace(inline_data=SimpleNamespace(data=chunk, mime_type=f"audio/L16;rate={SAMPLE_RATE}"))
+            yield SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))], text=None)
+            time.sleep(delay * (1 - FIRST_CHUNK) / len(chunks))
+
+    def generate_images(self, model: str, prompt: str, config=None):
+        self._enter(model)
+        image = SimpleNamespace(image=SimpleNamespace(image_bytes=fake_png(prompt, self.image_size)))
+        return SimpleNamespace(generated_images=[image])
+
+
+class FakeClient:
+    """Drop-in for genai.Client(...) as used by generate_assets.py."""
+
+    def __init__(self, **options):
+        self.models = FakeModels(**options)
+
+    @classmethod
+    def from_env(cls) -> "FakeClient":
+        """
+        Options from the environment, for `--client fake`:
+        DICTEE_FAKE_LATENCY_SCALE (multiplies DEFAULT_LATENCY, default 1),
+        DICTEE_FAKE_THROTTLE_RATE, DICTEE_FAKE_FAILURE_RATE, DICTEE_FAKE_SEED.
+        """
+        scale = float(os.getenv("DICTEE_FAKE_LATENCY_SCALE", "1"))
+        return cls(
+            latency={family: seconds * scale for family, seconds in DEFAULT_LATENCY.items()},
+            throttle_rate=float(os.getenv("DICTEE_FAKE_THROTTLE_RATE", "0")),
+            failure_rate=float(os.getenv("DICTEE_FAKE_FAILURE_RATE", "0")),
+            seed=int(os.getenv("DICTEE_FAKE_SEED", "0")),
+        )
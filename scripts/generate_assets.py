@@ -16,39 +16,58 @@ Usage:
 
 import os
 import json
-import base64
+import hashlib
+import math
+import re
+import sys
 import argparse
+import threading
 import time
-import requests
-import yaml
 from pathlib import Path
 from datetime import datetime, date
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dotenv import load_dotenv
-
-from google import genai
-from google.genai import types
-from PIL import Image
 from io import BytesIO
 
+# google.genai and yaml are slow to import, so they are imported where they
+# are used: --help, `plan` and the offline subcommands never load them.
+
+from asset_cache import AssetCache, cache_key
+from catalog import CATALOG_NAME, build_catalog
+from audio_processing import (
+    AUDIO_FORMATS, DEFAULT_AUDIO_FORMATS, DEFAULT_SPEEDS, TARGET_LOUDNESS_DB, TRIM_THRESHOLD_DB, build_sprite, clean_pcm_bytes,
+    PcmStreamWriter, clean_wav, encode_wav, encoder_available, is_speed_variant, parse_formats, parse_speeds, read_wav,
+    split_pcm_bytes, stretch_wav, variant_path,
+)
+from integrity import manifest_references, verify_week
+from journal import WeekJournal
+from media import entry_files, media_tree, preload_order
+from metrics import Metrics
+from image_processing import (
+    DEFAULT_IMAGE_FORMATS, IMAGE_WIDTHS, available_image_formats, image_placeholder, optimize_image,
+    parse_image_formats, parse_widths,
+)
+from rate_limiter import RateLimiter
+from registry import REGISTRY_NAME, AssetRegistry
+from similarity import index_weeks
+
 # Load environment variables
 load_dotenv()
 
 # Configuration
 GOOGLE_PROJECT_NAME = os.getenv("GOOGLE_PROJECT_NAME")
-if not GOOGLE_PROJECT_NAME:
-    raise ValueError("GOOGLE_PROJECT_NAME environment variable is required")
 
 language_model = "gemini-2.5-flash"
 image_model = "imagen-3.0-generate-002"
 speech_model= "gemini-2.5-flash-tts"
 
-# 1. Setup the Client for Vertex AI
-# Ensure you have 'GOOGLE_CLOUD_PROJECT' set in your environment
-client = genai.Client(
-    vertexai=True,
-    project=GOOGLE_PROJECT_NAME,
-    location="us-central1"
-)
+# 1. Setup the Client for Vertex AI, created on first use by get_client().
+# CLIENT_BACKEND "fake" swaps in the offline FakeClient (fake_client.py);
+# tests and benchmarks may also assign `client` directly.
+CLIENT_BACKENDS = ("vertex", "fake")
+CLIENT_BACKEND = os.getenv("DICTEE_CLIENT", "vertex")
+client = None
+client_lock = threading.Lock()
 
 # Paths (base paths, week_path applied dynamically)
 SCRIPT_DIR = Path(__file__).parent
@@ -56,9 +75,94 @@ PROJECT_DIR = SCRIPT_DIR.parent
 PUBLIC_DIR = PROJECT_DIR / "public"
 METADATA_FILE = PUBLIC_DIR / "metadata.yaml"
 
-# Rate limiting for image generation
-last_image_time = 0
-image_rate_limit = 60  # seconds between image requests (default: 1 per minute)
+# Content-addressed cache shared by every week (configured in main)
+DEFAULT_CACHE_DIR = Path(os.getenv("DICTEE_CACHE_DIR", PROJECT_DIR / ".asset_cache"))
+DEFAULT_CACHE_MAX_MB = 2048
+asset_cache: AssetCache | None = None
+
+# SQLite registry that manifest.json and metadata.yaml are exported from,
+# opened on first use by get_registry() next to PUBLIC_DIR (or at
+# $DICTEE_REGISTRY)
+REGISTRY_FILE = os.getenv("DICTEE_REGISTRY")
+registry: AssetRegistry | None = None
+registry_readonly = False  # plan and status only read it (configured by their commands)
+registry_lock = threading.Lock()
+
+TTS_VOICE = "Aoede"
+TTS_SAMPLE_RATE = 24000  # Gemini TTS returns 24kHz, mono, 16-bit PCM
+
+# Ask for the word and sentence audio in one TTS request and split it
+# locally (configured in main)
+merge_tts = False
+
+# Stream TTS responses to disk as they arrive (configured in main)
+stream_tts = False
+
+# Silence trimming / loudness normalization applied to TTS audio before
+# it is written, as clean_pcm() keyword arguments (None = keep raw audio)
+audio_cleanup: dict | None = None
+
+# Compressed audio variants written next to each WAV (configured in main)
+audio_formats: list[str] = []
+
+# Playback speeds derived locally from each clip (configured in main)
+audio_speeds: list[float] = []
+
+# Per-week audio sprite: every clip of the week in one file
+SPRITE_NAME = "week_sprite.wav"
+SPRITE_GAP = 0.5  # seconds of silence around each clip
+
+# Resized image variants written next to each PNG (configured in main)
+image_formats: list[str] = []
+image_widths: list[int] = IMAGE_WIDTHS
+
+# Rate limiting: requests per minute for each model's token bucket.
+# Buckets back off on 429s and creep back up to these ceilings.
+RATE_LIMITS = {
+    language_model: 60,
+    speech_model: 30,
+    image_model: 10,
+}
+rate_limiter = RateLimiter(RATE_LIMITS)
+
+# Typical seconds per call, only used by the planner's wall-time estimate
+ESTIMATED_LATENCY = {
+    language_model: 3.0,
+    speech_model: 4.0,
+    image_model: 10.0,
+}
+
+# Stage timings and API call records for the end-of-run summary / --trace
+metrics = Metrics()
+
+# Words processed in parallel (overridden by --concurrency)
+DEFAULT_CONCURRENCY = 4
+
+# `watch`: seconds between polls, and how long a change must settle first
+WATCH_INTERVAL = 1.0
+WATCH_DEBOUNCE = 1.0
+
+# Per-cache-key locks, see key_lock()
+key_locks: dict[str, threading.Lock] = {}
+key_locks_lock = threading.Lock()
+
+# Max words per batched sentence request
+SENTENCE_BATCH_SIZE = 25
+
+# Structured output schema for batched sentence generation
+SENTENCE_BATCH_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "word": {"type": "STRING"},
+            "sentence": {"type": "STRING"},
+        },
+        "required": ["word", "sentence"],
+    },
+}
+
+print_lock = threading.Lock()
 
 # Language-specific configuration
 LANGUAGE_CONFIG = {
@@ -74,9 +178,22 @@ Requirements:
 - Avoid using the 'passé composé' if possible; stick to the 'présent de l'indicatif'.
 
 Return ONLY the French sentence, nothing else.""",
+        "sentence_batch_prompt": """Create one simple, kid-friendly French sentence for each of these words:
+{words}
+
+Requirements:
+- Each sentence should be appropriate for a 7-year-old child
+- Use simple vocabulary and grammar
+- Each sentence should be fun or interesting for a child
+- Keep each sentence short (5-10 words maximum)
+- Each word must appear in its sentence exactly as written
+- Avoid using the 'passé composé' if possible; stick to the 'présent de l'indicatif'.
+
+Return one entry per word, with the word exactly as given and its French sentence.""",
         "sentence_fallback": "Le mot est {word}.",
         "tts_language_code": "fr-FR",
         "tts_prompt_template": "Dites d'une voix féminine {speed} : {text}",
+        "tts_pair_prompt_template": "Dites d'une voix féminine, d'abord le mot seul lentement, puis après une longue pause la phrase : {word} ... {sentence}",
         "tts_speed_slow": "lentement",
         "tts_speed_normal": "",
         "image_context": "French",
@@ -93,9 +210,22 @@ Requirements:
 - Use simple present tense when possible.
 
 Return ONLY the English sentence, nothing else.""",
+        "sentence_batch_prompt": """Create one simple, kid-friendly English sentence for each of these words:
+{words}
+
+Requirements:
+- Each sentence should be appropriate for a 7-year-old child
+- Use simple vocabulary and grammar
+- Each sentence should be fun or interesting for a child
+- Keep each sentence short (5-10 words maximum)
+- Each word must appear in its sentence exactly as written
+- Use simple present tense when possible.
+
+Return one entry per word, with the word exactly as given and its English sentence.""",
         "sentence_fallback": "The word is {word}.",
         "tts_language_code": "en-US",
         "tts_prompt_template": "Say in a female voice {speed}: {text}",
+        "tts_pair_prompt_template": "Say in a female voice, first the word alone slowly, then after a long pause the sentence: {word} ... {sentence}",
         "tts_speed_slow": "slowly",
         "tts_speed_normal": "",
         "image_context": "English",
@@ -103,6 +233,98 @@ Return ONLY the English sentence, nothing else.""",
 }
 
 
+def log(message: str) -> None:
+    """Print a line without interleaving output from concurrent workers."""
+    with print_lock:
+        print(message, flush=True)
+
+
+def submit_stage(executor: ThreadPoolExecutor | None, fn, *args, **kwargs) -> Future:
+    """Run fn on the stage executor, or inline when no executor is given."""
+    if executor is not None:
+        return executor.submit(fn, *args, **kwargs)
+
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def response_bytes(response) -> int:
+    """Payload size of a text, TTS or image response, for the metrics."""
+    if response is None:
+        return 0
+    if isinstance(response, int):
+        return response  # streamed responses report the bytes they wrote
+    size = 0
+    for image in getattr(response, "generated_images", None) or []:
+        size += len(image.image.image_bytes or b"")
+    for candidate in getattr(response, "candidates", None) or []:
+        for part in getattr(getattr(candidate, "content", None), "parts", None) or []:
+            inline_data = getattr(part, "inline_data", None)
+            if inline_data is not None and inline_data.data:
+                size += len(inline_data.data)
+    if not size and isinstance(getattr(response, "text", None), str):
+        size = len(response.text.encode("utf-8"))
+    return size
+
+
+def observe_api_call(model: str, response, error: Exception | None, latency: float, waited: float, retries: int) -> None:
+    """Rate limiter observer: record every API call in the run metrics."""
+    metrics.record_call(model, latency, response_bytes(response), retries, waited, str(error) if error else None)
+
+
+def get_client():
+    """The genai client for CLIENT_BACKEND, created on first use."""
+    global client
+
+    with client_lock:
+        if client is None:
+            if CLIENT_BACKEND == "fake":
+                from fake_client import FakeClient
+
+                client = FakeClient.from_env()
+            else:
+                from google import genai
+
+                # Ensure you have 'GOOGLE_PROJECT_NAME' set in your environment
+                if not GOOGLE_PROJECT_NAME:
+                    raise ValueError("GOOGLE_PROJECT_NAME environment variable is required")
+                client = genai.Client(
+                    vertexai=True,
+                    project=GOOGLE_PROJECT_NAME,
+                    location="us-central1"
+                )
+        return client
+
+
+def get_registry() -> AssetRegistry:
+    """The asset registry, opened on first use."""
+    global registry
+
+    with registry_lock:
+        if registry is None:
+            registry = AssetRegistry(
+                Path(REGISTRY_FILE) if REGISTRY_FILE else PUBLIC_DIR.parent / REGISTRY_NAME,
+                PUBLIC_DIR,
+                readonly=registry_readonly,
+            )
+        return registry
+
+
+def key_lock(key: str) -> threading.Lock:
+    """
+    Lock for one cache key. Weeks that share a word generate the same
+    assets; holding the key's lock across the cache check and the API call
+    makes the second week wait for the first week's result instead of
+    paying for the same request twice.
+    """
+    with key_locks_lock:
+        return key_locks.setdefault(key, threading.Lock())
+
+
 def read_words(words_file: Path) -> list[str]:
     """Read words from the words file."""
     if not words_file.exists():
@@ -122,11 +344,29 @@ def read_words(words_file: Path) -> list[str]:
     return unique_words
 
 
+def list_week_paths(weeks: str | None = None) -> list[str]:
+    """Week subdirectories to operate on: the given comma list, or every week under public/."""
+    if weeks:
+        return [w.strip() for w in weeks.split(",") if w.strip()]
+    return sorted(
+        d.name for d in PUBLIC_DIR.iterdir()
+        if d.is_dir() and ((d / "manifest.json").exists() or (d / "words_of_week.txt").exists())
+    )
+
+
+def asset_url(week_path: str, path: Path) -> str:
+    """Public URL of a file in a week's audio/ or images/ directory."""
+    return f"/{week_path}/{path.parent.name}/{path.name}"
+
+
 def load_existing_manifest(manifest_file: Path) -> dict:
     """Load existing manifest and return a dict keyed by word text."""
     if not manifest_file.exists():
         return {}
 
+    # A manifest edited by hand (say, a corrected sentence) wins over the registry
+    get_registry().sync_manifest(manifest_file)
+
     try:
         with open(manifest_file, "r", encoding="utf-8") as f:
             manifest = json.load(f)
@@ -136,62 +376,287 @@ def load_existing_manifest(manifest_file: Path) -> dict:
         return {}
 
 
-def check_existing_assets(word: str, existing_data: dict | None, audio_dir: Path, images_dir: Path) -> dict:
+def text_hash(text: str) -> str:
+    """Short hash of a piece of text, for provenance records."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def asset_input_hashes(word: str, sentence: str, language: str) -> dict:
+    """
+    Hash of the inputs each asset is generated from (a prefix of its cache key):
+      prompt   -> sentence
+      word     -> audioWord
+      sentence -> audioSentence, image
+    """
+    return {
+        "sentence": sentence_cache_key(word, language)[:16],
+        "audioWord": tts_request(word, language, slow=True)[2][:16],
+        "audioSentence": tts_request(sentence, language)[2][:16],
+        "image": image_request(sentence, word, language)[2][:16],
+    }
+
+
+def write_manifest(manifest_file: Path, words: list[dict], generated_at: str | None = None, removed=(), **extra) -> None:
+    """
+    Record a week's words in the registry and export manifest.json from it,
+    with words in the given order, plus any extra top-level keys. Entries
+    another run added meanwhile are kept; only the `removed` words (no
+    longer in words_of_week.txt) are dropped. Every entry (and the sprite)
+    gets the size, hash and timing of its files under "media", and the
+    week its "preload" order.
+    """
+    extra = {key: value for key, value in extra.items() if value is not None}
+    sprite = extra.get("sprite")
+    infos = get_registry().describe_files(
+        [url for item in [*words, sprite or {}] for url in entry_files(item)]
+    )
+    for entry in words:
+        entry["media"] = media_tree(entry, infos)
+    if sprite:
+        extra["sprite"] = {**sprite, "media": media_tree(sprite, infos)}
+    extra["preload"] = preload_order(words)
+
+    manifest = {
+        "generatedAt": generated_at or datetime.now().isoformat(),
+        "words": words,
+        **extra,
+    }
+
+    get_registry().save_manifest(manifest_file, manifest, removed)
+
+
+def check_existing_assets(word: str, existing_data: dict | None, audio_dir: Path, images_dir: Path, language: str) -> dict:
     """
-    Check which assets already exist for a word.
-    Returns a dict with what needs to be generated.
+    Check which assets of a word are missing or stale.
+
+    Returns {asset: reason}, where reason is None for an up-to-date asset.
+    An asset is stale when the input hash recorded in the manifest entry's
+    "provenance" differs from the hash of its current inputs. Assets with
+    no recorded hash (manifests from before provenance) are kept as-is.
+
+    The recorded "sentenceText" is the hash of the sentence as generated; a
+    sentence that no longer matches it was edited by hand and is never
+    regenerated, but its audio and image are.
     """
+    existing_data = existing_data or {}
+    provenance = existing_data.get("provenance", {})
+    sentence = existing_data.get("sentence")
+
     needs = {
-        "sentence": True,
-        "audioWord": True,
-        "audioSentence": True,
-        "image": True,
+        "sentence": None,
+        "audioWord": None,
+        "audioSentence": None,
+        "image": None,
     }
 
-    # Check files on disk
-    word_audio_path = audio_dir / f"{word}_word.wav"
-    sentence_audio_path = audio_dir / f"{word}_sentence.wav"
-    image_path = images_dir / f"{word}.png"
+    # Sentence (can't verify from file)
+    hand_edited = bool(sentence) and provenance.get("sentenceText") not in (None, text_hash(sentence))
+    current = asset_input_hashes(word, sentence or word, language)
+    recorded = provenance.get("sentence")
+    if not sentence:
+        needs["sentence"] = "missing"
+    elif recorded and recorded != current["sentence"] and not hand_edited:
+        needs["sentence"] = "sentence prompt changed"
 
-    if word_audio_path.exists():
-        needs["audioWord"] = False
-    if sentence_audio_path.exists():
-        needs["audioSentence"] = False
-    if image_path.exists():
-        needs["image"] = False
+    # Check files on disk
+    paths = {
+        "audioWord": audio_dir / f"{word}_word.wav",
+        "audioSentence": audio_dir / f"{word}_sentence.wav",
+        "image": images_dir / f"{word}.png",
+    }
 
-    # Check manifest for sentence (can't verify from file)
-    if existing_data and existing_data.get("sentence"):
-        needs["sentence"] = False
+    for asset, path in paths.items():
+        recorded = provenance.get(asset)
+        if not path.exists():
+            needs[asset] = "missing"
+        elif asset != "audioWord" and needs["sentence"]:
+            needs[asset] = "sentence will be regenerated"
+        elif recorded and recorded != current[asset]:
+            if asset != "audioWord" and hand_edited:
+                needs[asset] = "sentence edited"
+            else:
+                needs[asset] = "prompt or config changed"
 
     return needs
 
 
+def print_plan(state: dict) -> None:
+    """Print which assets of a loaded week would be regenerated, and why, without calling any API."""
+    words = state["words"]
+    existing_manifest = state["existing"]
+    plans = {}
+    for word in words:
+        stale = {asset: reason for asset, reason in state["needs"][word].items() if reason}
+        if stale:
+            plans[word] = stale
+
+    print(f"\nPlan for {state['path']}: {len(plans)} of {len(words)} words need work")
+    for word, stale in plans.items():
+        print(f"  {word}")
+        for asset, reason in stale.items():
+            print(f"    - {asset}: {reason}")
+
+    removed = [word for word in existing_manifest if word not in words]
+    if removed:
+        print(f"  Dropped from manifest (no longer in word list): {', '.join(removed)}")
+
+
+def clean_sentence(text: str) -> str:
+    """Strip whitespace and surrounding quotes from a generated sentence."""
+    sentence = text.strip()
+
+    # Remove quotes if present
+    if sentence.startswith('"') and sentence.endswith('"'):
+        sentence = sentence[1:-1]
+    if sentence.startswith("'") and sentence.endswith("'"):
+        sentence = sentence[1:-1]
+
+    return sentence
+
+
+def sentence_contains_word(sentence: str, word: str) -> bool:
+    """Check the word appears as a whole word, allowing a capitalized first letter."""
+    for form in (word, word[:1].upper() + word[1:]):
+        if re.search(rf"(?<!\w){re.escape(form)}(?!\w)", sentence):
+            return True
+    return False
+
+
+def write_asset(output_path: Path, data: bytes, key: str | None = None) -> None:
+    """
+    Write a generated asset. With the cache enabled the bytes are stored
+    under `key` and hardlinked into place; otherwise they are written to a
+    temporary file and renamed. Either way the destination is replaced,
+    never rewritten in place, since it may share an inode with a cache
+    entry, and a crash never leaves a partial file behind.
+    """
+    if asset_cache is not None and key is not None:
+        asset_cache.link(asset_cache.put(key, output_path.suffix, data), output_path)
+        return
+
+    tmp_path = output_path.with_name(f".{output_path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, output_path)
+
+
+def sentence_cache_key(word: str, language: str) -> str:
+    """
+    Cache key for a word's sentence. Batched and per-word sentences share
+    the per-word prompt as their key, since either answers the same request.
+    """
+    return cache_key(
+        kind="sentence",
+        model=language_model,
+        prompt=LANGUAGE_CONFIG[language]["sentence_prompt"].format(word=word),
+        language=language,
+    )
+
+
+def cached_sentence(word: str, language: str) -> str | None:
+    if asset_cache is None:
+        return None
+    return asset_cache.get_text(sentence_cache_key(word, language))
+
+
 def generate_sentence(word: str, language: str) -> str:
     """Generate a kid-friendly sentence using the word."""
+    sentence = cached_sentence(word, language)
+    if sentence is not None:
+        return sentence
+
     lang_config = LANGUAGE_CONFIG[language]
     the_prompt = lang_config["sentence_prompt"].format(word=word)
 
-    text_response = client.models.generate_content(
+    text_response = rate_limiter.call(
+        language_model,
+        get_client().models.generate_content,
         model=language_model,
         contents=the_prompt
     )
 
-    sentence = text_response.text.strip()
+    sentence = clean_sentence(text_response.text)
+    if asset_cache is not None:
+        asset_cache.put_text(sentence_cache_key(word, language), sentence)
+    return sentence
 
-    # Remove quotes if present
-    if sentence.startswith('"') and sentence.endswith('"'):
-        sentence = sentence[1:-1]
-    if sentence.startswith("'") and sentence.endswith("'"):
-        sentence = sentence[1:-1]
 
-    return sentence
+def generate_sentences_batch(words: list[str], language: str) -> dict[str, str]:
+    """
+    Generate sentences for many words with one structured-output request per
+    SENTENCE_BATCH_SIZE words.
 
-import wave
+    Returns {word: sentence} for the words that came back with a valid
+    sentence. Words that are missing, or whose sentence doesn't contain the
+    word exactly, are left out so the caller can fall back to
+    generate_sentence() for them.
+    """
+    lang_config = LANGUAGE_CONFIG[language]
+    sentences = {}
 
-def generate_audio_tts(text: str, output_path: Path, language: str, slow: bool = False) -> bool:
-    """Safe version that saves raw PCM as a playable WAV file."""
+    # Cached sentences don't need a request at all
+    for word in words:
+        sentence = cached_sentence(word, language)
+        if sentence is not None:
+            sentences[word] = sentence
+    words = [word for word in words if word not in sentences]
+
+    for i in range(0, len(words), SENTENCE_BATCH_SIZE):
+        chunk = words[i:i + SENTENCE_BATCH_SIZE]
+        the_prompt = lang_config["sentence_batch_prompt"].format(
+            words="\n".join(f"- {word}" for word in chunk)
+        )
+
+        try:
+            response = rate_limiter.call(
+                language_model,
+                get_client().models.generate_content,
+                model=language_model,
+                contents=the_prompt,
+                config={
+                    "response_mime_type": "application/json",
+                    "response_schema": SENTENCE_BATCH_SCHEMA,
+                }
+            )
+            entries = json.loads(response.text)
+        except Exception as e:
+            log(f"  Batched sentence request failed ({len(chunk)} words): {e}")
+            continue
+
+        # Map back by exact word, then case-insensitively
+        by_lower = {word.lower(): word for word in chunk}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            returned = str(entry.get("word", "")).strip()
+            word = returned if returned in chunk else by_lower.get(returned.lower())
+            sentence = clean_sentence(str(entry.get("sentence", "")))
+            if word and word not in sentences and sentence_contains_word(sentence, word):
+                sentences[word] = sentence
+                if asset_cache is not None:
+                    asset_cache.put_text(sentence_cache_key(word, language), sentence)
+
+    return sentences
 
+import wave
+
+def pcm_to_wav(pcm_data: bytes) -> bytes:
+    """Wrap raw Gemini TTS PCM in a WAV container."""
+    # Gemini TTS defaults: 24kHz, Mono, 16-bit PCM
+    # We must save this as a .wav for afplay to understand it
+    buffer = BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)          # Mono
+        wf.setsampwidth(2)          # 16-bit (2 bytes)
+        wf.setframerate(TTS_SAMPLE_RATE)  # 24kHz is standard for Gemini-TTS
+        wf.writeframes(pcm_data)
+    return buffer.getvalue()
+
+
+def tts_request(text: str, language: str, slow: bool = False) -> tuple[str, dict, str]:
+    """Build the TTS prompt and config, and the cache key that identifies them."""
     lang_config = LANGUAGE_CONFIG[language]
     speed = lang_config["tts_speed_slow"] if slow else lang_config["tts_speed_normal"]
     prompt = lang_config["tts_prompt_template"].format(speed=speed, text=text)
@@ -201,52 +666,186 @@ def generate_audio_tts(text: str, output_path: Path, language: str, slow: bool =
         "speech_config": {
             "language_code" : lang_config["tts_language_code"],
             "voice_config": {
-                "prebuilt_voice_config": {"voice_name": "Aoede"}
+                "prebuilt_voice_config": {"voice_name": TTS_VOICE}
             }
         }
     }
 
-    try:
-        response = client.models.generate_content(
-            model=speech_model,
-            contents=prompt,
-            config=minimal_config
-        )
+    key = cache_key(
+        kind="audio",
+        model=speech_model,
+        prompt=prompt,
+        voice=TTS_VOICE,
+        language=lang_config["tts_language_code"],
+        config=minimal_config,
+    )
+    return prompt, minimal_config, key
 
-        # Get raw bytes
-        pcm_data = response.candidates[0].content.parts[0].inline_data.data
 
-        # Gemini TTS defaults: 24kHz, Mono, 16-bit PCM
-        # We must save this as a .wav for afplay to understand it
-        wav_path = output_path.with_suffix('.wav')
+def cleaned_audio_key(key: str) -> str:
+    """Cache key of the cleaned-up audio derived from the raw TTS response `key`."""
+    if audio_cleanup is None:
+        return key
+    return cache_key(kind="audio-cleanup", source=key, cleanup=audio_cleanup)
 
-        with wave.open(str(wav_path), "wb") as wf:
-            wf.setnchannels(1)          # Mono
-            wf.setsampwidth(2)          # 16-bit (2 bytes)
-            wf.setframerate(24000)      # 24kHz is standard for Gemini-TTS
-            wf.writeframes(pcm_data)
 
-        print(f"  Audio saved as WAV: {wav_path.name}")
-        return True
+def stream_speech(prompt: str, config: dict, wav_path: Path, formats: list[str]) -> int:
+    """
+    Stream a TTS response into wav_path (plus `formats`, encoded on the fly)
+    chunk by chunk, so memory stays flat however long the clip. Returns the
+    bytes received. A failed stream leaves nothing behind and is retried
+    from the start by the rate limiter like any other call.
+    """
+    with PcmStreamWriter(wav_path, TTS_SAMPLE_RATE, formats) as writer:
+        stream = get_client().models.generate_content_stream(model=speech_model, contents=prompt, config=config)
+        for chunk in stream:
+            for candidate in chunk.candidates or []:
+                for part in candidate.content.parts or []:
+                    if part.inline_data is not None and part.inline_data.data:
+                        writer.write(part.inline_data.data)
+    return writer.received
 
-    except Exception as e:
-        print(f"  Audio error: {e}")
-        return False
 
-def generate_image(sentence: str, word: str, output_path: Path, language: str) -> bool:
-    """Generate an image with a fallback strategy if the first attempt is blocked."""
-    global last_image_time
+def generate_audio_tts(text: str, output_path: Path, language: str, slow: bool = False) -> bool:
+    """
+    Safe version that saves PCM as a playable WAV file.
+
+    The raw response is cached under the request's key and the trimmed,
+    normalized clip under a key derived from it, so changing the cleanup
+    settings never costs another TTS call.
+
+    With stream_tts the response is written to disk as it arrives. Without
+    cleanup that is the final clip, and its compressed variants are encoded
+    during the transfer; with cleanup, the streamed (or cached raw) file is
+    cleaned chunk by chunk from disk, so memory stays flat either way.
+    """
+    prompt, minimal_config, key = tts_request(text, language, slow)
+
+    wav_path = output_path.with_suffix('.wav')
+    output_key = cleaned_audio_key(key)
+    with key_lock(output_key):
+        if asset_cache is not None and asset_cache.materialize(output_key, ".wav", wav_path):
+            log(f"  Audio from cache: {wav_path.name}")
+            return True
+
+        try:
+            raw_path = asset_cache.get_path(key, ".wav") if asset_cache is not None and output_key != key else None
+            if raw_path is None and stream_tts:
+                formats = audio_formats if audio_cleanup is None else []
+                rate_limiter.call(speech_model, stream_speech, prompt, minimal_config, wav_path, formats)
+                if asset_cache is not None:
+                    asset_cache.put_file(key, ".wav", wav_path)
+                if audio_cleanup is None:
+                    log(f"  Audio streamed to WAV: {wav_path.name}")
+                    return True
+                raw_path = wav_path
+            if raw_path is not None:
+                # Writes a new file: the raw one may be linked to the cache
+                clean_wav(raw_path, dest_path=wav_path, **audio_cleanup)
+                if asset_cache is not None:
+                    asset_cache.put_file(output_key, ".wav", wav_path)
+                log(f"  Audio saved as WAV: {wav_path.name}")
+                return True
+
+            response = rate_limiter.call(
+                speech_model,
+                get_client().models.generate_content,
+                model=speech_model,
+                contents=prompt,
+                config=minimal_config
+            )
+
+            # Get raw bytes
+            pcm_data = response.candidates[0].content.parts[0].inline_data.data
+            if asset_cache is not None and output_key != key:
+                asset_cache.put(key, ".wav", pcm_to_wav(pcm_data))
+
+            if audio_cleanup is not None:
+                pcm_data = clean_pcm_bytes(pcm_data, TTS_SAMPLE_RATE, **audio_cleanup)
+            write_asset(wav_path, pcm_to_wav(pcm_data), output_key)
+
+            log(f"  Audio saved as WAV: {wav_path.name}")
+            return True
+
+        except Exception as e:
+            log(f"  Audio error ({output_path.name}): {e}")
+            return False
+
+
+def generate_audio_pair(word: str, sentence: str, word_path: Path, sentence_path: Path, language: str) -> tuple[bool, bool]:
+    """
+    Generate the word and sentence audio with one TTS request: the word,
+    a long pause, then the sentence, cut in two at the longest pause.
+
+    Falls back to one request per clip when the clip doesn't split cleanly
+    (see split_at_pause()) or the "word" half comes out longer than the
+    sentence, and whenever either clip is already cached on its own.
+    Returns (word ok, sentence ok).
+    """
+    word_key = cleaned_audio_key(tts_request(word, language, slow=True)[2])
+    sentence_key = cleaned_audio_key(tts_request(sentence, language)[2])
+    if asset_cache is not None and (asset_cache.path(word_key, ".wav").exists() or asset_cache.path(sentence_key, ".wav").exists()):
+        return (
+            generate_audio_tts(word, word_path, language, slow=True),
+            generate_audio_tts(sentence, sentence_path, language),
+        )
 
     lang_config = LANGUAGE_CONFIG[language]
-    lang_context = lang_config["image_context"]
+    prompt = lang_config["tts_pair_prompt_template"].format(word=word, sentence=sentence)
+    minimal_config = tts_request(sentence, language)[1]
+    key = cache_key(kind="audio-pair", model=speech_model, prompt=prompt, voice=TTS_VOICE, config=minimal_config)
+    output_keys = [cache_key(kind="audio-split", source=key, part=part, cleanup=audio_cleanup) for part in ("word", "sentence")]
+    paths = [word_path.with_suffix(".wav"), sentence_path.with_suffix(".wav")]
+
+    with key_lock(key):
+        if asset_cache is not None and all(
+            asset_cache.materialize(output_key, ".wav", path) for output_key, path in zip(output_keys, paths)
+        ):
+            log(f"  [{word}] Word and sentence audio from cache")
+            return True, True
+
+        parts = None
+        try:
+            raw_path = asset_cache.get_path(key, ".wav") if asset_cache is not None else None
+            if raw_path is not None:
+                samples, _ = read_wav(raw_path)
+                pcm_data = samples.tobytes()
+            else:
+                response = rate_limiter.call(
+                    speech_model,
+                    get_client().models.generate_content,
+                    model=speech_model,
+                    contents=prompt,
+                    config=minimal_config
+                )
+                pcm_data = response.candidates[0].content.parts[0].inline_data.data
+                if asset_cache is not None:
+                    asset_cache.put(key, ".wav", pcm_to_wav(pcm_data))
+            parts = split_pcm_bytes(pcm_data, TTS_SAMPLE_RATE)
+            if parts is not None and len(parts[0]) >= len(parts[1]):
+                parts = None
+        except Exception as e:
+            log(f"  [{word}] Merged audio error: {e}")
+
+        if parts is None:
+            log(f"  [{word}] Merged audio didn't split cleanly, falling back to two requests")
+            return (
+                generate_audio_tts(word, word_path, language, slow=True),
+                generate_audio_tts(sentence, sentence_path, language),
+            )
+
+        for pcm_part, output_key, path in zip(parts, output_keys, paths):
+            if audio_cleanup is not None:
+                pcm_part = clean_pcm_bytes(pcm_part, TTS_SAMPLE_RATE, **audio_cleanup)
+            write_asset(path, pcm_to_wav(pcm_part), output_key)
+        log(f"  [{word}] Word and sentence audio saved from one request")
+        return True, True
 
-    # Rate limiting
-    if image_rate_limit > 0:
-        elapsed = time.time() - last_image_time
-        if elapsed < image_rate_limit:
-            wait_time = image_rate_limit - elapsed
-            print(f"    Rate limit: waiting {wait_time:.0f}s before image generation...")
-            time.sleep(wait_time)
+
+def image_request(sentence: str, word: str, language: str) -> tuple[list[str], dict, str]:
+    """Build the image prompts (in fallback order) and config, and their cache key."""
+    lang_config = LANGUAGE_CONFIG[language]
+    lang_context = lang_config["image_context"]
 
     # Use 'ALLOW_ALL' for person_generation to permit images of children
     image_config = {
@@ -261,45 +860,300 @@ def generate_image(sentence: str, word: str, output_path: Path, language: str) -
         f"A minimal abstract flat‑vector illustration that conveys the feeling of `{word}` ({lang_context}) or this concept: {sentence}. Use simple geometric shapes and bright colors to suggest the idea visually, on a clean, uncluttered background."
     ]
 
-    for attempt, prompt in enumerate(prompts_to_try):
+    key = cache_key(kind="image", model=image_model, prompts=prompts_to_try, config=image_config)
+    return prompts_to_try, image_config, key
+
+
+def generate_image(sentence: str, word: str, output_path: Path, language: str) -> bool:
+    """Generate an image with a fallback strategy if the first attempt is blocked."""
+    prompts_to_try, image_config, key = image_request(sentence, word, language)
+    with key_lock(key):
+        if asset_cache is not None and asset_cache.materialize(key, output_path.suffix, output_path):
+            log(f"    [{word}] Image from cache")
+            return True
+
+        for attempt, prompt in enumerate(prompts_to_try):
+            try:
+                log(f"    [{word}] Image attempt {attempt + 1}...")
+                response = rate_limiter.call(
+                    image_model,
+                    get_client().models.generate_images,
+                    model=image_model,
+                    prompt=prompt,
+                    config=image_config
+                )
+
+                if response.generated_images:
+                    image_bytes = response.generated_images[0].image.image_bytes
+                    write_asset(output_path, image_bytes, key)
+                    return True
+                else:
+                    log(f"    [{word}] Attempt {attempt + 1} was blocked by safety filters.")
+
+            except Exception as e:
+                log(f"    [{word}] Attempt {attempt + 1} error: {e}")
+                continue
+
+        # Level 3 Fallback: If both fail, you could copy a local 'placeholder.png' here
+        log(f"  CRITICAL: All image generation attempts failed for '{word}'.")
+        return False
+
+def submit_audio_encodes(entry: dict, audio_dir: Path, executor=None, refresh=()) -> dict:
+    """
+    Start encoding the entry's WAVs into the configured formats. The clips
+    in `refresh` (written by this run) are always re-encoded: one restored
+    from the cache keeps the blob's mtime, which can be older than variants
+    of a different clip. Without configured formats, they get the formats
+    their entry already lists, so those never go stale.
+    Returns {asset: (wav_path, future)}.
+    """
+    word = entry["text"]
+    wav_paths = {
+        "audioWord": audio_dir / f"{word}_word.wav",
+        "audioSentence": audio_dir / f"{word}_sentence.wav",
+    }
+    pending = {}
+    for asset, path in wav_paths.items():
+        formats = audio_formats
+        if not formats and asset in refresh:
+            formats = [fmt for fmt in entry.get("audioFormats", {}).get(asset, {}) if fmt != "wav"]
+        if formats and entry.get(asset) and path.exists():
+            pending[asset] = (path, submit_stage(executor, encode_wav, path, formats, asset in refresh))
+    return pending
+
+
+def collect_audio_encodes(entry: dict, week_path: str, pending: dict) -> None:
+    """
+    Record every available format of the entry's audio under
+    entry["audioFormats"], e.g. {"audioWord": {"opus": ..., "mp3": ...,
+    "wav": ...}}. The plain audioWord/audioSentence fields keep pointing at
+    the WAV.
+    """
+    formats = {}
+    for asset, (wav_path, future) in pending.items():
         try:
-            print(f"    Image attempt {attempt + 1}...")
-            last_image_time = time.time()  # Update before request
-            response = client.models.generate_images(
-                model=image_model,
-                prompt=prompt,
-                config=image_config
-            )
+            variants = future.result()
+        except Exception as e:
+            log(f"  [{entry['text']}] Audio encoding error ({wav_path.name}): {e}")
+            continue
+        urls = {fmt: asset_url(week_path, path) for fmt, path in variants.items()}
+        urls["wav"] = asset_url(week_path, wav_path)
+        formats[asset] = urls
+
+    if formats:
+        entry["audioFormats"] = {**entry.get("audioFormats", {}), **formats}
+
+
+def encode_audio_variants(entry: dict, week_path: str, audio_dir: Path, executor=None) -> None:
+    """Encode the entry's WAVs into the configured compressed formats."""
+    collect_audio_encodes(entry, week_path, submit_audio_encodes(entry, audio_dir, executor))
 
-            if response.generated_images:
-                image_bytes = response.generated_images[0].image.image_bytes
-                with open(output_path, "wb") as f:
-                    f.write(image_bytes)
-                return True
-            else:
-                print(f"    Attempt {attempt + 1} was blocked by safety filters.")
 
+def submit_speed_variants(entry: dict, audio_dir: Path, executor=None, refresh=()) -> dict:
+    """
+    Start time-stretching the entry's WAVs, always redoing the clips in
+    `refresh` (written by this run). Returns {asset: (wav_path, future)}.
+    """
+    word = entry["text"]
+    wav_paths = {
+        "audioWord": audio_dir / f"{word}_word.wav",
+        "audioSentence": audio_dir / f"{word}_sentence.wav",
+    }
+    if not audio_speeds:
+        return {}
+    return {
+        asset: (path, submit_stage(executor, stretch_wav, path, audio_speeds, audio_formats, asset in refresh))
+        for asset, path in wav_paths.items()
+        if entry.get(asset) and path.exists()
+    }
+
+
+def collect_speed_variants(entry: dict, week_path: str, pending: dict) -> None:
+    """
+    Record the entry's playback speeds under entry["audioSpeeds"], e.g.
+    {"audioWord": {"0.75": {"opus": ..., "wav": ...}, "1": {...}}}. Speed "1"
+    is the original clip, with the same formats as audioFormats.
+    """
+    speeds = {}
+    for asset, (wav_path, future) in pending.items():
+        try:
+            variants = future.result()
         except Exception as e:
-            print(f"    Attempt {attempt + 1} error: {e}")
+            log(f"  [{entry['text']}] Time-stretch error ({wav_path.name}): {e}")
             continue
+        urls = {
+            f"{speed:g}": {fmt: asset_url(week_path, path) for fmt, path in formats.items()}
+            for speed, formats in variants.items()
+        }
+        urls["1"] = entry.get("audioFormats", {}).get(asset) or {"wav": asset_url(week_path, wav_path)}
+        speeds[asset] = dict(sorted(urls.items(), key=lambda item: float(item[0])))
 
-    # Level 3 Fallback: If both fail, you could copy a local 'placeholder.png' here
-    print(f"  CRITICAL: All image generation attempts failed for '{word}'.")
-    return False
+    if speeds:
+        entry["audioSpeeds"] = speeds
+
+
+def submit_image_variants(entry: dict, images_dir: Path, executor=None, refresh: bool = False) -> Future | None:
+    """
+    Start resizing/encoding the entry's image, if it has one, into the
+    configured formats. A `refresh`ed image (written by this run) is always
+    resized again, since one restored from the cache can be older than the
+    variants on disk; without configured formats, it gets the formats and
+    widths its entry already lists.
+    """
+    image_path = images_dir / f"{entry['text']}.png"
+    formats, widths = image_formats, image_widths
+    if not formats and refresh:
+        srcset = entry.get("imageSrcset", {})
+        formats = list(srcset)
+        widths = sorted({int(width) for sizes in srcset.values() for width in sizes})
+    if not formats or not entry.get("image") or not image_path.exists():
+        return None
+    return submit_stage(executor, optimize_image, image_path, widths, formats, refresh)
+
+
+def collect_image_variants(entry: dict, week_path: str, future: Future | None) -> None:
+    """
+    Record the entry's image variants as a srcset-style map under
+    entry["imageSrcset"], e.g. {"webp": {"256": url, "512": url}}. The plain
+    image field keeps pointing at the PNG.
+    """
+    if future is None:
+        return
+    try:
+        variants = future.result()
+    except Exception as e:
+        log(f"  [{entry['text']}] Image optimization error: {e}")
+        return
+
+    entry["imageSrcset"] = {
+        fmt: {str(width): asset_url(week_path, path) for width, path in sizes.items()}
+        for fmt, sizes in variants.items()
+    }
+
+
+def submit_image_placeholder(entry: dict, images_dir: Path, executor=None, force: bool = False) -> Future | None:
+    """Start describing the entry's image, unless it already has a placeholder (and `force` is off)."""
+    image_path = images_dir / f"{entry['text']}.png"
+    if not entry.get("image") or not image_path.exists() or (entry.get("imagePlaceholder") and not force):
+        return None
+    return submit_stage(executor, image_placeholder, image_path)
+
+
+def collect_image_placeholder(entry: dict, week_path: str, future: Future | None) -> None:
+    """
+    Record the image's size, dominant colour and inline blurred preview
+    under entry["imagePlaceholder"], so the client can reserve its space
+    and paint it right away.
+    """
+    if future is None:
+        return
+    try:
+        entry["imagePlaceholder"] = future.result()
+    except Exception as e:
+        log(f"  [{entry['text']}] Image placeholder error: {e}")
+
+
+def build_week_sprite(week_path: str, words: list[dict], gap: float = SPRITE_GAP, reuse: bool = False) -> dict | None:
+    """
+    Pack every clip of the week into audio/week_sprite.wav (plus the
+    configured compressed formats), and record each clip's offsets in its
+    entry as spriteClips = {"audioWord": {"start": s, "duration": s}, ...}.
+    With `reuse`, a sprite newer than every clip, whose offsets the entries
+    already record for exactly these clips, is kept as it is. Each entry's
+    provenance["spriteClips"] records the provenance of the clips the sprite
+    was built from: a clip restored from the cache keeps the blob's older
+    mtime, so only that tells a different clip apart.
+
+    Returns the manifest's top-level "sprite" record, or None if the week
+    has no audio yet.
+    """
+    audio_dir = PUBLIC_DIR / week_path / "audio"
+    clips = []
+    for entry in words:
+        for asset, suffix in (("audioWord", "_word.wav"), ("audioSentence", "_sentence.wav")):
+            path = audio_dir / f"{entry['text']}{suffix}"
+            if entry.get(asset) and path.exists():
+                clips.append(((entry["text"], asset), path))
+    if not clips:
+        return None
+
+    sprite_path = audio_dir / SPRITE_NAME
+    recorded = {
+        (entry["text"], asset): clip
+        for entry in words
+        for asset, clip in entry.get("spriteClips", {}).items()
+    }
+    sources = {
+        (entry["text"], asset): (entry.get("provenance", {}).get("spriteClips", {}).get(asset), entry.get("provenance", {}).get(asset))
+        for entry in words
+        for asset in ("audioWord", "audioSentence")
+    }
+    reused = (
+        reuse and sprite_path.exists() and set(recorded) == {name for name, _ in clips}
+        and min(clip["start"] for clip in recorded.values()) == round(gap, 3)
+        and all(sources[name][0] == sources[name][1] for name in recorded)
+        and all(path.stat().st_mtime_ns <= sprite_path.stat().st_mtime_ns for _, path in clips)
+    )
+    offsets = recorded if reused else build_sprite(clips, sprite_path, gap)
+
+    for entry in words:
+        entry_clips = {
+            asset: offsets[(entry["text"], asset)]
+            for asset in ("audioWord", "audioSentence")
+            if (entry["text"], asset) in offsets
+        }
+        if entry_clips:
+            entry["spriteClips"] = entry_clips
+            provenance = entry.setdefault("provenance", {})
+            provenance["spriteClips"] = {asset: provenance.get(asset) for asset in entry_clips}
+        else:
+            entry.pop("spriteClips", None)
+            entry.get("provenance", {}).pop("spriteClips", None)
 
-def process_word(word: str, week_path: str, existing_data: dict | None, audio_dir: Path, images_dir: Path, language: str) -> dict:
-    """Process a single word and generate only missing assets."""
-    print(f"\nProcessing: {word}")
+    # Without configured formats, keep the variants the sprite already has in step
+    sprite_formats = audio_formats or [fmt for fmt in AUDIO_FORMATS if variant_path(sprite_path, fmt).exists()]
+    variants = encode_wav(sprite_path, sprite_formats, not reused) if sprite_formats else {}
+    formats = {fmt: asset_url(week_path, path) for fmt, path in variants.items()}
+    formats["wav"] = asset_url(week_path, sprite_path)
+
+    log(f"  Sprite: {len(offsets)} clips in {sprite_path.name}")
+    return {"formats": formats, "gap": gap}
+
+
+def process_word(word: str, week_path: str, existing_data: dict | None, audio_dir: Path, images_dir: Path, language: str, executor: ThreadPoolExecutor | None = None, batched_sentence: str | None = None, post_executor: ProcessPoolExecutor | None = None, journal: WeekJournal | None = None) -> dict:
+    """
+    Process a single word and generate only missing or stale assets.
+
+    Only the stale part of the dependency graph is rebuilt: a regenerated
+    or edited sentence invalidates the sentence audio and image, while the
+    word audio only depends on the word. Each asset's input hash is recorded
+    in the entry's "provenance" so the next run can tell what changed.
+
+    A sentence already produced by the batched request is used as-is;
+    otherwise the sentence is generated with a per-word request.
+
+    Independent stages run concurrently on `executor`: the word audio is
+    synthesized while the sentence is generated, then the sentence audio
+    and image (which both depend on the sentence) run side by side. With
+    merge_tts, word and sentence audio that are both needed come from one
+    request, after the sentence. CPU-bound
+    post-processing (audio encoding, image resizing) goes to `post_executor`.
+
+    Every completed sentence and asset is appended to the week's `journal`
+    right away, so an interrupted run can resume without paying for it again.
+    """
+    log(f"\nProcessing: {word}")
 
     lang_config = LANGUAGE_CONFIG[language]
 
-    # Check what already exists
-    needs = check_existing_assets(word, existing_data, audio_dir, images_dir)
+    # Check what already exists and is still up to date
+    needs = check_existing_assets(word, existing_data, audio_dir, images_dir, language)
+    provenance = dict((existing_data or {}).get("provenance", {}))
 
     # Start with existing data or create new
     if existing_data:
         result = existing_data.copy()
-        print(f"  Found existing data, checking for missing assets...")
+        log(f"  [{word}] Found existing data, checking for missing assets...")
     else:
         result = {
             "id": word,
@@ -310,133 +1164,252 @@ def process_word(word: str, week_path: str, existing_data: dict | None, audio_di
     skipped = []
     generated = []
 
+    # Word audio doesn't depend on the sentence, so start it first, unless
+    # it may be merged with the sentence audio into one request
+    word_audio_path = audio_dir / f"{word}_word.wav"
+    word_audio_future = None
+    if needs["audioWord"]:
+        if not merge_tts:
+            log(f"  [{word}] Generating word audio ({needs['audioWord']})...")
+            word_audio_future = submit_stage(executor, metrics.wrap(generate_audio_tts, "audioWord", word=word), word, word_audio_path, language, slow=True)
+    else:
+        result["audioWord"] = f"/{week_path}/audio/{word}_word.wav"
+        skipped.append("audioWord")
+
     # Generate sentence (only if needed)
-    if needs["sentence"]:
-        print(f"  Generating sentence...")
+    previous_sentence = result.get("sentence")
+    if needs["sentence"] and batched_sentence:
+        result["sentence"] = batched_sentence
+        provenance["sentenceText"] = text_hash(batched_sentence)
+        log(f"  [{word}] Sentence (batched): {batched_sentence}")
+        generated.append("sentence")
+    elif needs["sentence"]:
+        log(f"  [{word}] Generating sentence ({needs['sentence']})...")
         try:
-            sentence = generate_sentence(word, language)
+            with metrics.span("sentence", word=word):
+                sentence = generate_sentence(word, language)
             result["sentence"] = sentence
-            print(f"  Sentence: {sentence}")
+            provenance["sentenceText"] = text_hash(sentence)
+            log(f"  [{word}] Sentence: {sentence}")
             generated.append("sentence")
         except Exception as e:
-            print(f"  Error generating sentence: {e}")
+            log(f"  [{word}] Error generating sentence: {e}")
             result["sentence"] = lang_config["sentence_fallback"].format(word=word)
     else:
         skipped.append("sentence")
-        print(f"  Sentence exists: {result.get('sentence', 'N/A')}")
+        log(f"  [{word}] Sentence exists: {result.get('sentence', 'N/A')}")
+        if "sentenceText" not in provenance:
+            provenance["sentenceText"] = text_hash(result["sentence"])
+
+    current = asset_input_hashes(word, result["sentence"], language)
+    # Batched sentences were journaled as soon as the batch came back
+    if journal is not None and "sentence" in generated and not batched_sentence:
+        journal.record(
+            word,
+            {"sentence": result["sentence"]},
+            {"sentence": current["sentence"], "sentenceText": provenance["sentenceText"]},
+        )
 
-    # Generate word audio (only if needed)
-    word_audio_path = audio_dir / f"{word}_word.wav"
-    if needs["audioWord"]:
-        print(f"  Generating word audio...")
-        if generate_audio_tts(word, word_audio_path, language, slow=True):
-            result["audioWord"] = f"/{week_path}/audio/{word}_word.wav"
-            generated.append("audioWord")
-        else:
-            print(f"  Failed to generate word audio")
-    else:
-        result["audioWord"] = f"/{week_path}/audio/{word}_word.wav"
-        skipped.append("audioWord")
+    # A new sentence makes whatever was generated from the old one stale
+    if result["sentence"] != previous_sentence:
+        for asset in ("audioSentence", "image"):
+            needs[asset] = needs[asset] or "sentence changed"
 
-    # Generate sentence audio (only if needed)
+    # Sentence audio and image both only need the sentence
     sentence_audio_path = audio_dir / f"{word}_sentence.wav"
-    if needs["audioSentence"]:
-        print(f"  Generating sentence audio...")
-        if generate_audio_tts(result.get("sentence", word), sentence_audio_path, language):
-            result["audioSentence"] = f"/{week_path}/audio/{word}_sentence.wav"
-            generated.append("audioSentence")
-        else:
-            print(f"  Failed to generate sentence audio")
+    sentence_audio_future = None
+    pair_future = None
+    if needs["audioSentence"] and needs["audioWord"] and merge_tts:
+        log(f"  [{word}] Generating word and sentence audio in one request ({needs['audioWord']}, {needs['audioSentence']})...")
+        pair_future = submit_stage(executor, metrics.wrap(generate_audio_pair, "audioPair", word=word), word, result["sentence"], word_audio_path, sentence_audio_path, language)
+    elif needs["audioSentence"]:
+        log(f"  [{word}] Generating sentence audio ({needs['audioSentence']})...")
+        sentence_audio_future = submit_stage(executor, metrics.wrap(generate_audio_tts, "audioSentence", word=word), result.get("sentence", word), sentence_audio_path, language)
     else:
         result["audioSentence"] = f"/{week_path}/audio/{word}_sentence.wav"
         skipped.append("audioSentence")
 
-    # Generate image (only if needed)
+    if needs["audioWord"] and merge_tts and pair_future is None:
+        log(f"  [{word}] Generating word audio ({needs['audioWord']})...")
+        word_audio_future = submit_stage(executor, metrics.wrap(generate_audio_tts, "audioWord", word=word), word, word_audio_path, language, slow=True)
+
     image_path = images_dir / f"{word}.png"
+    image_future = None
     if needs["image"]:
-        print(f"  Generating image...")
-        if generate_image(result.get("sentence", word), word, image_path, language):
-            result["image"] = f"/{week_path}/images/{word}.png"
-            generated.append("image")
-        else:
-            print(f"  Failed to generate image (continuing without it)")
+        log(f"  [{word}] Generating image ({needs['image']})...")
+        image_future = submit_stage(executor, metrics.wrap(generate_image, "image", word=word), result.get("sentence", word), word, image_path, language)
     else:
         result["image"] = f"/{week_path}/images/{word}.png"
         skipped.append("image")
 
-    # Summary
-    if skipped:
-        print(f"  Skipped (already exist): {', '.join(skipped)}")
-    if generated:
-        print(f"  Generated: {', '.join(generated)}")
-    if not generated:
-        print(f"  All assets already exist!")
+    # Collect results
+    audio_ok = {}
+    if pair_future is not None:
+        audio_ok["audioWord"], audio_ok["audioSentence"] = pair_future.result()
+    if word_audio_future is not None:
+        audio_ok["audioWord"] = word_audio_future.result()
+    if sentence_audio_future is not None:
+        audio_ok["audioSentence"] = sentence_audio_future.result()
+
+    finished = []
+    for asset, suffix, label in (("audioWord", "_word.wav", "word audio"), ("audioSentence", "_sentence.wav", "sentence audio")):
+        if asset not in audio_ok:
+            continue
+        if audio_ok[asset]:
+            result[asset] = f"/{week_path}/audio/{word}{suffix}"
+            finished.append(asset)
+        else:
+            log(f"  [{word}] Failed to generate {label}")
+
+    if image_future is not None:
+        if image_future.result():
+            result["image"] = f"/{week_path}/images/{word}.png"
+            finished.append("image")
+        else:
+            log(f"  [{word}] Failed to generate image (continuing without it)")
+
+    generated.extend(finished)
+    if journal is not None and finished:
+        journal.record(
+            word,
+            {asset: result[asset] for asset in finished},
+            {asset: current[asset] for asset in finished},
+        )
+
+    # Compressed audio, speed variants and resized images from whatever we now have
+    with metrics.span("post-processing", word=word):
+        audio_encodes = submit_audio_encodes(result, audio_dir, post_executor, refresh=finished)
+        speed_variants = submit_speed_variants(result, audio_dir, post_executor, refresh=finished)
+        image_variants = submit_image_variants(result, images_dir, post_executor, refresh="image" in finished)
+        placeholder = submit_image_placeholder(result, images_dir, post_executor, force="image" in generated)
+        collect_audio_encodes(result, week_path, audio_encodes)
+        collect_speed_variants(result, week_path, speed_variants)
+        collect_image_variants(result, week_path, image_variants)
+        collect_image_placeholder(result, week_path, placeholder)
+
+    # Record input hashes for every asset that is now up to date; failed
+    # assets keep their old hash so the next run retries them
+    for asset in ("sentence", "audioWord", "audioSentence", "image"):
+        if asset in skipped or asset in generated:
+            provenance[asset] = current[asset]
+    result["provenance"] = provenance
+
+    # Summary
+    if skipped:
+        log(f"  [{word}] Skipped (already exist): {', '.join(skipped)}")
+    if generated:
+        log(f"  [{word}] Generated: {', '.join(generated)}")
+    if not generated:
+        log(f"  [{word}] All assets already exist!")
 
     return result
 
 
-def update_metadata(sounds: str, week_path: str, week_start: str, week_end: str, language: str) -> None:
-    """Append or update an entry in metadata.yaml."""
-    # Load existing metadata
-    if METADATA_FILE.exists():
-        with open(METADATA_FILE, "r", encoding="utf-8") as f:
-            raw = yaml.safe_load(f) or {}
-    else:
-        raw = {}
-
-    weeks = raw.get("dictee", [])
-    if not isinstance(weeks, list):
-        # Backward compat: convert old single-object format
-        weeks = [weeks] if weeks else []
-
-    entry = {
-        "sounds": sounds,
-        "path": week_path,
-        "week_start": week_start,
-        "week_end": week_end,
-        "date_of_generation": date.today().isoformat(),
-        "source": "words_of_week.txt",
-        "language": language,
+def load_metadata() -> dict:
+    """metadata.yaml (via the registry), with `dictee` normalized to a list of week entries."""
+    return get_registry().metadata(METADATA_FILE)
+
+
+def update_metadata(weeks: list[dict]) -> None:
+    """
+    Append or update week entries in the registry and export metadata.yaml,
+    in one transaction, so concurrent runs don't drop each other's weeks.
+
+    A week this run generated nothing for keeps its date_of_generation, so
+    an up-to-date week leaves metadata.yaml untouched.
+    """
+    generated_on = {
+        (entry.get("sounds"), str(entry.get("week_start"))): entry.get("date_of_generation")
+        for entry in load_metadata()["dictee"]
     }
+    entries = [
+        {
+            "sounds": week["sounds"],
+            "path": week["path"],
+            "week_start": week["week_start"],
+            "week_end": week["week_end"],
+            "date_of_generation": (
+                generated_on.get((week["sounds"], str(week["week_start"])))
+                if not (week.get("new") or week.get("updated")) else None
+            ) or date.today().isoformat(),
+            "source": "words_of_week.txt",
+            "language": week["language"],
+        }
+        for week in weeks
+    ]
 
-    # Replace existing entry with same sounds+week_start, or append
-    replaced = False
-    for i, existing in enumerate(weeks):
-        if existing.get("sounds") == sounds and existing.get("week_start") == week_start:
-            weeks[i] = entry
-            replaced = True
-            break
+    # Replaces the entry with the same sounds+week_start, or appends
+    replaced = get_registry().update_metadata(METADATA_FILE, entries)
+    for week, was_replaced in zip(weeks, replaced):
+        if was_replaced is not None:
+            print(f"{'Updated' if was_replaced else 'Added'} metadata entry for {week['path']}")
 
-    if not replaced:
-        weeks.append(entry)
+    if any(was_replaced is not None for was_replaced in replaced):
+        print(f"Metadata written to: {METADATA_FILE}")
+    else:
+        print(f"Metadata unchanged: {METADATA_FILE}")
 
-    raw["dictee"] = weeks
 
-    with open(METADATA_FILE, "w", encoding="utf-8") as f:
-        yaml.dump(raw, f, default_flow_style=False, allow_unicode=True)
+def select_weeks(args: argparse.Namespace, need_dates: bool = True) -> list[dict]:
+    """
+    The weeks a generate run covers, as metadata-style entries (sounds,
+    path, week_start, week_end, language).
 
-    print(f"\n{'Updated' if replaced else 'Added'} metadata entry in: {METADATA_FILE}")
+    --all and --weeks read the `dictee:` entries of metadata.yaml, plus any
+    public/*/words_of_week.txt without one (those have no dates, so their
+    metadata entry is left alone). Otherwise the week comes from --sounds,
+    which only needs --week-start/--week-end if `need_dates`.
+    """
+    if not (args.all or args.weeks):
+        if not args.sounds or (need_dates and not (args.week_start and args.week_end)):
+            raise SystemExit("error: --sounds, --week-start and --week-end are required (or use --all / --weeks)")
+        return [{
+            "sounds": args.sounds,
+            "path": args.path or args.sounds,
+            "week_start": args.week_start,
+            "week_end": args.week_end,
+            "language": args.language,
+        }]
+
+    weeks = {}
+    for entry in load_metadata()["dictee"]:
+        path = entry.get("path") or entry.get("sounds")
+        if path and path not in weeks:
+            weeks[path] = {
+                "sounds": entry.get("sounds", path),
+                "path": path,
+                "week_start": entry.get("week_start"),
+                "week_end": entry.get("week_end"),
+                "language": entry.get("language", args.language),
+            }
+    for path in list_week_paths():
+        if path not in weeks and (PUBLIC_DIR / path / "words_of_week.txt").exists():
+            weeks[path] = {"sounds": path, "path": path, "week_start": None, "week_end": None, "language": args.language}
 
+    if args.weeks:
+        wanted = [w.strip() for w in args.weeks.split(",") if w.strip()]
+        unknown = [w for w in wanted if w not in weeks]
+        if unknown:
+            raise SystemExit(f"error: unknown week(s): {', '.join(unknown)}")
+        return [weeks[w] for w in wanted]
+    return list(weeks.values())
 
-def main():
-    """Main function to generate all assets."""
-    global image_rate_limit
 
-    # Parse command line arguments
-    parser = argparse.ArgumentParser(description="Generate assets for the Dictée app")
+def add_week_arguments(parser: argparse.ArgumentParser) -> None:
+    """Which week(s) a command works on: --sounds/--path, or --all/--weeks."""
     parser.add_argument(
         "--sounds",
-        required=True,
+        default=None,
         help="Sound theme for this week's words (se.g., ez, ou)"
     )
     parser.add_argument(
         "--week-start",
-        required=True,
+        default=None,
         help="Start date of the week (YYYY-MM-DD)"
     )
     parser.add_argument(
         "--week-end",
-        required=True,
+        default=None,
         help="End date of the week (YYYY-MM-DD)"
     )
     parser.add_argument(
@@ -444,104 +1417,1332 @@ def main():
         default=None,
         help="Subdirectory name (defaults to --sounds value)"
     )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Generate every week in metadata.yaml (and every public/*/words_of_week.txt) as one job"
+    )
+    parser.add_argument(
+        "--weeks",
+        default=None,
+        help="Generate these comma-separated week paths as one job (instead of --sounds)"
+    )
     parser.add_argument(
         "--language",
         default="fr",
         choices=list(LANGUAGE_CONFIG.keys()),
-        help="Language for sentence/audio generation (default: fr)"
+        help="Language for sentence/audio generation (default: fr; with --all/--weeks, for weeks without one in metadata.yaml)"
+    )
+
+
+def add_scheduling_arguments(parser: argparse.ArgumentParser) -> None:
+    """Rate limits, batching, concurrency and cache: what a run costs and how long it takes."""
+    parser.add_argument(
+        "--text-rpm",
+        type=float,
+        default=RATE_LIMITS[language_model],
+        help=f"Max requests per minute to {language_model} (default: {RATE_LIMITS[language_model]}, 0 = unlimited)"
+    )
+    parser.add_argument(
+        "--speech-rpm",
+        type=float,
+        default=RATE_LIMITS[speech_model],
+        help=f"Max requests per minute to {speech_model} (default: {RATE_LIMITS[speech_model]}, 0 = unlimited)"
+    )
+    parser.add_argument(
+        "--image-rpm",
+        type=float,
+        default=RATE_LIMITS[image_model],
+        help=f"Max requests per minute to {image_model} (default: {RATE_LIMITS[image_model]}, 0 = unlimited)"
     )
     parser.add_argument(
         "--image-rate-limit",
         type=int,
-        default=60,
-        help="Seconds between image generation requests (default: 60, set to 0 to disable)"
+        default=None,
+        help="Legacy: seconds between image requests, overrides --image-rpm (0 = unlimited)"
+    )
+    parser.add_argument(
+        "--batch-sentences",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Generate missing sentences with one structured request per week (default: on)"
+    )
+    parser.add_argument(
+        "--merge-tts",
+        action="store_true",
+        help="Get the word and sentence audio from one TTS request, split at the pause between them (falls back to two requests if the split looks wrong)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Number of words processed in parallel (default: {DEFAULT_CONCURRENCY}, 1 = sequential)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Generation cache shared across weeks (default: {DEFAULT_CACHE_DIR}, or $DICTEE_CACHE_DIR)"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_CACHE_MAX_MB,
+        help=f"Evict least recently used cache entries above this size (default: {DEFAULT_CACHE_MAX_MB})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read from or write to the generation cache"
     )
-    args = parser.parse_args()
 
-    image_rate_limit = args.image_rate_limit
-    sounds = args.sounds
-    week_path = args.path or sounds
-    week_start = args.week_start
-    week_end = args.week_end
-    language = args.language
 
-    # Compute output paths
-    week_dir = PUBLIC_DIR / week_path
-    audio_dir = week_dir / "audio"
-    images_dir = week_dir / "images"
-    words_file = week_dir / "words_of_week.txt"
-    manifest_file = week_dir / "manifest.json"
+def add_generate_arguments(parser: argparse.ArgumentParser, watch: bool = False) -> None:
+    """Arguments of the default `generate` command (and of `watch`, which has no --plan or --trace)."""
+    add_week_arguments(parser)
+    add_scheduling_arguments(parser)
+    if not watch:
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Same as the `plan` command: list what would be regenerated and why, then exit"
+        )
+        parser.add_argument(
+            "--trace",
+            type=Path,
+            default=None,
+            help="Write stage timings and API calls to this file: .json for a Chrome trace (chrome://tracing, Perfetto), otherwise JSON lines"
+        )
+    add_output_arguments(parser)
 
-    # Ensure directories exist
-    audio_dir.mkdir(parents=True, exist_ok=True)
-    images_dir.mkdir(parents=True, exist_ok=True)
 
-    print("=" * 50)
-    print("Dictée Asset Generator (Incremental)")
-    print("=" * 50)
-    print(f"Sound theme: {sounds}")
-    print(f"Week path: {week_path}")
-    print(f"Week: {week_start} to {week_end}")
-    print(f"Language: {language}")
-    if image_rate_limit > 0:
-        print(f"Image rate limit: {image_rate_limit}s between requests")
-
-    # Load existing manifest
-    existing_manifest = load_existing_manifest(manifest_file)
-    if existing_manifest:
-        print(f"\nFound existing manifest with {len(existing_manifest)} words")
-    else:
-        print("\nNo existing manifest found, generating all assets")
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    """What a generate run writes besides the assets themselves, and with which client."""
+    parser.add_argument(
+        "--sprite",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Pack all of the week's clips into one audio sprite (default: only if the week already has one)"
+    )
+    parser.add_argument(
+        "--similarity",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Refresh every word's confusables and letter blanks across weeks after the run (default: only if the manifests already have them)"
+    )
+    parser.add_argument(
+        "--catalog",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Refresh public/catalog.json and its fingerprinted assets after the run (default: only if it already exists)"
+    )
+    parser.add_argument(
+        "--client",
+        choices=CLIENT_BACKENDS,
+        default=CLIENT_BACKEND,
+        help=f"API backend: Vertex AI, or an offline fake with synthetic text/audio/images (default: {CLIENT_BACKEND}, or $DICTEE_CLIENT)"
+    )
+    parser.add_argument(
+        "--stream-tts",
+        action="store_true",
+        help="Write TTS audio to disk as the response streams in, so memory stays flat (with --audio-cleanup, cleanup then runs chunk by chunk on the file); otherwise compressed variants are encoded during the transfer"
+    )
+    add_audio_format_argument(parser, default=[])
+    add_speeds_argument(parser, default=[])
+    add_audio_cleanup_arguments(parser, toggle=True)
+    add_image_arguments(parser, default=[])
+
+
+def add_audio_cleanup_arguments(parser: argparse.ArgumentParser, toggle: bool = False) -> None:
+    if toggle:
+        parser.add_argument(
+            "--audio-cleanup",
+            action=argparse.BooleanOptionalAction,
+            default=False,
+            help="Trim silence, normalize loudness and fade newly generated TTS audio before writing it (default: off; existing clips are left as they are, see clean-audio)"
+        )
+    parser.add_argument(
+        "--trim-threshold-db",
+        type=float,
+        default=TRIM_THRESHOLD_DB,
+        help=f"Treat audio this many dB below the loudest frame as silence (default: {TRIM_THRESHOLD_DB})"
+    )
+    parser.add_argument(
+        "--target-loudness-db",
+        type=float,
+        default=TARGET_LOUDNESS_DB,
+        help=f"RMS loudness of speech after normalization, in dBFS (default: {TARGET_LOUDNESS_DB})"
+    )
 
-    # Read words
-    words = read_words(words_file)
-    print(f"\nFound {len(words)} words in {words_file.name}:")
-    for word in words:
-        status = "✓ exists" if word in existing_manifest else "○ new"
-        print(f"  - {word} ({status})")
 
-    # Process each word (with existing data if available)
-    results = []
-    new_count = 0
-    updated_count = 0
-    skipped_count = 0
+def configure_audio_cleanup(args: argparse.Namespace) -> None:
+    global audio_cleanup
+
+    if not getattr(args, "audio_cleanup", True):
+        audio_cleanup = None
+        return
+    audio_cleanup = {
+        "threshold_db": args.trim_threshold_db,
+        "target_db": args.target_loudness_db,
+    }
+
+
+def add_audio_format_argument(parser: argparse.ArgumentParser, default: list[str] = DEFAULT_AUDIO_FORMATS) -> None:
+    shown = ",".join(default) or "none"
+    parser.add_argument(
+        "--audio-formats",
+        type=parse_formats,
+        default=default,
+        help=f"Comma-separated compressed audio variants to write next to each WAV, or 'none' (default: {shown})"
+    )
+
+
+def configure_audio_formats(formats: list[str]) -> None:
+    global audio_formats
+
+    if formats and not encoder_available():
+        print("Warning: soundfile with Opus/MP3 support is not installed, skipping compressed audio")
+        formats = []
+    audio_formats = formats
+
+
+def add_speeds_argument(parser: argparse.ArgumentParser, default: list[float]) -> None:
+    shown = ",".join(f"{speed:g}" for speed in default) or "none"
+    parser.add_argument(
+        "--speeds",
+        type=parse_speeds,
+        default=default,
+        help=f"Comma-separated playback speeds derived locally from each clip, e.g. 0.75,1.25 (default: {shown})"
+    )
+
+
+def configure_rate_limits(args: argparse.Namespace) -> None:
+    image_rpm = args.image_rpm
+    if args.image_rate_limit is not None:
+        image_rpm = 60 / args.image_rate_limit if args.image_rate_limit > 0 else 0
+    rate_limiter.configure({
+        language_model: args.text_rpm,
+        speech_model: args.speech_rpm,
+        image_model: image_rpm,
+    })
+
+
+def configure_merge_tts(enabled: bool) -> None:
+    global merge_tts
+
+    merge_tts = enabled
+
+
+def configure_stream_tts(enabled: bool) -> None:
+    global stream_tts
+
+    stream_tts = enabled
+
+
+def configure_client(backend: str) -> None:
+    global CLIENT_BACKEND, client
+
+    if backend != CLIENT_BACKEND:
+        CLIENT_BACKEND = backend
+        client = None
+
+
+def configure_audio_speeds(speeds: list[float]) -> None:
+    global audio_speeds
+
+    audio_speeds = speeds
+
+
+def add_image_arguments(parser: argparse.ArgumentParser, default: list[str] = DEFAULT_IMAGE_FORMATS) -> None:
+    shown = ",".join(default) or "none"
+    parser.add_argument(
+        "--image-formats",
+        type=parse_image_formats,
+        default=default,
+        help=f"Comma-separated resized image variants to write next to each PNG, or 'none' (default: {shown})"
+    )
+    parser.add_argument(
+        "--image-widths",
+        type=parse_widths,
+        default=IMAGE_WIDTHS,
+        help=f"Comma-separated widths of the image variants in pixels (default: {','.join(map(str, IMAGE_WIDTHS))})"
+    )
+
+
+def configure_image_formats(formats: list[str], widths: list[int]) -> None:
+    global image_formats, image_widths
+
+    available = available_image_formats(formats)
+    for fmt in formats:
+        if fmt not in available:
+            print(f"Warning: this Pillow can't write {fmt.upper()}, skipping it")
+    image_formats = available
+    image_widths = widths
+
+
+def load_week(week: dict, quiet: bool = False) -> dict:
+    """Read a week's word list and manifest, and work out what it needs."""
+    week_dir = PUBLIC_DIR / week["path"]
+    state = {
+        **week,
+        "audio_dir": week_dir / "audio",
+        "images_dir": week_dir / "images",
+        "manifest_file": week_dir / "manifest.json",
+        "new": 0,
+        "updated": 0,
+        "skipped": 0,
+        "missing_sentences": [],
+        "needs": {},
+    }
+
+    words_file = week_dir / "words_of_week.txt"
+    existing_manifest = load_existing_manifest(state["manifest_file"])
+    words = read_words(words_file)
+    journal = WeekJournal(week_dir)
+    state["existing"] = existing_manifest
+    state["words"] = words
+    state["journal"] = journal
+
+    replayed = journal.replay(existing_manifest)
+    if not quiet:
+        print(f"\n{week['path']} ({week['sounds']}, {week['week_start'] or '?'} to {week['week_end'] or '?'}, {week['language']})")
+        if replayed:
+            print(f"Resuming an interrupted run: replayed {replayed} completed steps from {journal.path.name}")
+        if existing_manifest:
+            print(f"Found existing manifest with {len(existing_manifest)} words")
+        else:
+            print("No existing manifest found, generating all assets")
+        print(f"Found {len(words)} words in {words_file.name}:")
+        for word in words:
+            status = "✓ exists" if word in existing_manifest else "○ new"
+            print(f"  - {word} ({status})")
 
     for word in words:
         existing_data = existing_manifest.get(word)
-        result = process_word(word, week_path, existing_data, audio_dir, images_dir, language)
-        results.append(result)
-
-        # Track stats
-        needs = check_existing_assets(word, existing_data, audio_dir, images_dir)
+        needs = check_existing_assets(word, existing_data, state["audio_dir"], state["images_dir"], week["language"])
+        state["needs"][word] = needs
+        if needs["sentence"]:
+            state["missing_sentences"].append(word)
         if any(needs.values()):
-            if existing_data:
-                updated_count += 1
-            else:
-                new_count += 1
+            state["updated" if existing_data else "new"] += 1
         else:
-            skipped_count += 1
+            state["skipped"] += 1
+    return state
 
-    # Generate manifest
-    manifest = {
-        "generatedAt": datetime.now().isoformat(),
-        "words": results
+
+def finish_week(state: dict, results: list[dict], sprite_option: bool | None) -> None:
+    """Write a week's sprite (if any) and manifest once all its words are done."""
+    audio_dir = state["audio_dir"]
+
+    # Rebuild the sprite from the final clips so offsets match the files
+    sprite = None
+    build_sprite_now = sprite_option if sprite_option is not None else (audio_dir / SPRITE_NAME).exists()
+    if build_sprite_now:
+        with metrics.span("sprite", week=state["path"]):
+            sprite = build_week_sprite(state["path"], results, reuse=True)
+    else:
+        for entry in results:
+            entry.pop("spriteClips", None)
+            entry.get("provenance", {}).pop("spriteClips", None)
+
+    listed = set(state["words"])
+    removed = [word for word in state["existing"] if word not in listed]
+    write_manifest(state["manifest_file"], results, removed=removed, sprite=sprite)
+    words = set(state["words"])
+    timings = {}
+    for (word, stage), seconds in metrics.word_timings(("sentence", "audioWord", "audioSentence", "image", "audioPair")).items():
+        if word in words:
+            # One merged TTS request produced both clips
+            for asset in (("audioWord", "audioSentence") if stage == "audioPair" else (stage,)):
+                timings[(word, asset)] = seconds
+    get_registry().record_timings(state["path"], timings)
+    state["journal"].clear()
+    log(f"Generated manifest: {state['manifest_file']}")
+
+
+def estimate_api_calls(states: list[dict], batch_sentences: bool, cache_dir: Path | None, merge: bool = False) -> dict[str, int]:
+    """
+    API calls a run over the loaded weeks would make, per model. Assets the
+    cache can already answer don't count, and assets shared by several
+    weeks count once. Assets that depend on a sentence that isn't known yet
+    (not generated, not cached) can't be looked up, so they always count.
+    With `merge`, a word needing both clips costs one speech call (assuming
+    the merged clip splits cleanly).
+    """
+    def cached(key: str, suffix: str) -> bool:
+        return cache_dir is not None and (cache_dir / key[:2] / f"{key}{suffix}").exists()
+
+    def cached_text(key: str) -> str | None:
+        if not cached(key, ".txt"):
+            return None
+        return (cache_dir / key[:2] / f"{key}.txt").read_text(encoding="utf-8")
+
+    sentences = {}  # {language: words}
+    pending = {speech_model: set(), image_model: set()}
+    merged = 0
+    for state in states:
+        language = state["language"]
+        for word in state["words"]:
+            needs = state["needs"][word]
+            sentence = state["existing"].get(word, {}).get("sentence")
+            if needs["sentence"]:
+                sentence = cached_text(sentence_cache_key(word, language))
+                if sentence is None:
+                    sentences.setdefault(language, set()).add(word)
+            if merge and needs["audioWord"] and needs["audioSentence"]:
+                merged += 1
+            if needs["audioWord"]:
+                key = tts_request(word, language, slow=True)[2]
+                if not cached(key, ".wav"):
+                    pending[speech_model].add(key)
+            for asset in ("audioSentence", "image"):
+                if not needs[asset]:
+                    continue
+                if sentence is None:
+                    pending[speech_model if asset == "audioSentence" else image_model].add((language, word, asset))
+                elif asset == "audioSentence":
+                    key = tts_request(sentence, language)[2]
+                    if not cached(key, ".wav"):
+                        pending[speech_model].add(key)
+                else:
+                    key = image_request(sentence, word, language)[2]
+                    if not cached(key, ".png"):
+                        pending[image_model].add(key)
+
+    if batch_sentences:
+        text_calls = sum(math.ceil(len(words) / SENTENCE_BATCH_SIZE) if len(words) > 1 else len(words) for words in sentences.values())
+    else:
+        text_calls = sum(len(words) for words in sentences.values())
+    return {
+        language_model: text_calls,
+        speech_model: len(pending[speech_model]) - merged,
+        image_model: len(pending[image_model]),
     }
 
-    with open(manifest_file, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+def print_estimate(states: list[dict], args: argparse.Namespace) -> None:
+    """
+    Print the estimated API calls and wall time of a run. Each model is
+    bounded by its rate limit or by `--concurrency` calls of
+    ESTIMATED_LATENCY in flight; sentences come first, then speech and
+    images run side by side.
+    """
+    cache_dir = None if args.no_cache else args.cache_dir
+    calls = estimate_api_calls(states, args.batch_sentences, cache_dir, args.merge_tts)
+    concurrency = max(1, args.concurrency)
+
+    seconds = {}
+    for model, count in calls.items():
+        rpm = rate_limiter.bucket(model).max_rpm
+        rate_bound = count * 60 / rpm if rpm else 0.0
+        latency_bound = math.ceil(count / concurrency) * ESTIMATED_LATENCY[model]
+        seconds[model] = max(rate_bound, latency_bound)
+    total = seconds[language_model] + max(seconds[speech_model], seconds[image_model])
+    bottleneck = max(seconds, key=seconds.get)
+
+    words = sum(len(state["words"]) for state in states)
+    print(f"\nEstimate for {words} words in {len(states)} week(s){'' if cache_dir else ' (cache disabled)'}:")
+    for model, count in calls.items():
+        print(f"  {model}: {count} calls, ~{seconds[model]:.0f}s ({rate_limiter.bucket(model).describe()})")
+    if total:
+        print(f"  Wall time: ~{int(total // 60)}m{int(total % 60):02d}s, bound by {bottleneck}")
+    else:
+        print("  Nothing to call: everything is up to date or cached")
+
+
+def run_plan(args: argparse.Namespace) -> None:
+    """Report missing/stale assets and the estimated cost of generating them, without any API call or write."""
+    global registry_readonly
+
+    registry_readonly = True
+    configure_rate_limits(args)
+    states = [load_week(week, quiet=True) for week in select_weeks(args, need_dates=False)]
+    for state in states:
+        print_plan(state)
+    print_estimate(states, args)
+
+
+def configure_generation(args: argparse.Namespace) -> None:
+    """Apply the options shared by `generate` and `watch`: limits, client, output formats, cache."""
+    global asset_cache
+
+    configure_rate_limits(args)
+    rate_limiter.observer = observe_api_call
+    rate_limiter.log = log
+    configure_client(args.client)
+    configure_audio_formats(args.audio_formats)
+    configure_audio_speeds(args.speeds)
+    configure_audio_cleanup(args)
+    configure_merge_tts(args.merge_tts)
+    configure_stream_tts(args.stream_tts)
+    configure_image_formats(args.image_formats, args.image_widths)
+
+    if not args.no_cache and not getattr(args, "plan", False):
+        asset_cache = AssetCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 ** 2)
+
+
+def run_generate(args: argparse.Namespace) -> None:
+    """
+    Generate all missing or stale assets for one week, or for many weeks
+    (--all / --weeks) as one job: every word of every week goes through
+    the same pools and rate limiter, and metadata.yaml is written once.
+    """
+    global registry_readonly
+
+    registry_readonly = args.plan
+    configure_generation(args)
+    weeks = select_weeks(args, need_dates=not args.plan)
+    concurrency = max(1, args.concurrency)
+
+    print("=" * 50)
+    print("Dictée Asset Generator (Incremental)")
+    print("=" * 50)
+    if len(weeks) == 1:
+        week = weeks[0]
+        print(f"Sound theme: {week['sounds']}")
+        print(f"Week path: {week['path']}")
+        print(f"Week: {week['week_start']} to {week['week_end']}")
+        print(f"Language: {week['language']}")
+    else:
+        print(f"Weeks: {len(weeks)} ({', '.join(week['path'] for week in weeks)})")
+    print("Rate limits:")
+    for model in (language_model, speech_model, image_model):
+        print(f"  {model}: {rate_limiter.bucket(model).describe()}")
+    print(f"Concurrency: {concurrency} word(s) in parallel")
+    print(f"Cache: {asset_cache.root if asset_cache else 'disabled'}")
+    print(f"Audio formats: wav{''.join(', ' + f for f in audio_formats)}")
+    if audio_speeds:
+        print(f"Audio speeds: {', '.join(f'{speed:g}x' for speed in audio_speeds)}")
+    if audio_cleanup is not None:
+        print(f"Audio cleanup: trim below {audio_cleanup['threshold_db']:g} dB, normalize to {audio_cleanup['target_db']:g} dBFS")
+    print(f"Image formats: png{''.join(', ' + f for f in image_formats)}")
+
+    started = metrics.now()
+    states = [load_week(week) for week in weeks]
+
+    if args.plan:
+        for state in states:
+            print_plan(state)
+        print_estimate(states, args)
+        return
+
+    # Fail before any work if the client can't be created (e.g. no project)
+    get_client()
+
+    # Ensure directories exist
+    for state in states:
+        state["audio_dir"].mkdir(parents=True, exist_ok=True)
+        state["images_dir"].mkdir(parents=True, exist_ok=True)
+
+    # One request per SENTENCE_BATCH_SIZE missing sentences across all
+    # weeks of a language; anything it misses or gets wrong falls back to
+    # the per-word request inside process_word()
+    batched_sentences = {}
+    if args.batch_sentences:
+        for language in dict.fromkeys(state["language"] for state in states):
+            missing = list(dict.fromkeys(
+                word for state in states if state["language"] == language for word in state["missing_sentences"]
+            ))
+            if len(missing) > 1:
+                print(f"\nGenerating {len(missing)} {language} sentences in batch...")
+                with metrics.span("sentenceBatch", language=language, words=len(missing)):
+                    batched_sentences[language] = generate_sentences_batch(missing, language)
+                fallback = len(missing) - len(batched_sentences[language])
+                print(f"  Batched: {len(batched_sentences[language])}, falling back to per-word: {fallback}")
+
+        # Journal them now: a word may wait in the queue for a long time
+        for state in states:
+            for word in state["missing_sentences"]:
+                sentence = batched_sentences.get(state["language"], {}).get(word)
+                if sentence:
+                    state["journal"].record(
+                        word,
+                        {"sentence": sentence},
+                        {"sentence": sentence_cache_key(word, state["language"])[:16], "sentenceText": text_hash(sentence)},
+                    )
+
+    # Every word of every week goes into one queue. Stages within a word
+    # get their own pool so a word waiting on its sentence never blocks the
+    # pool its own sub-tasks need.
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="word") as word_pool, \
+            ThreadPoolExecutor(max_workers=concurrency * 2, thread_name_prefix="stage") as stage_pool, \
+            ProcessPoolExecutor() as post_pool:
+        pending = [
+            [
+                word_pool.submit(
+                    metrics.wrap(process_word, "word", week=state["path"], word=word), word, state["path"], state["existing"].get(word),
+                    state["audio_dir"], state["images_dir"], state["language"], stage_pool,
+                    batched_sentences.get(state["language"], {}).get(word), post_pool,
+                    state["journal"],
+                )
+                for word in state["words"]
+            ]
+            for state in states
+        ]
+        # Weeks finish in submission order; words are collected in
+        # words_of_week.txt order, regardless of completion order
+        try:
+            for state, futures in zip(states, pending):
+                finish_week(state, [future.result() for future in futures], args.sprite)
+        except KeyboardInterrupt:
+            # Drop queued words; the ones in flight finish and are journaled
+            for pool in (word_pool, stage_pool, post_pool):
+                pool.shutdown(wait=False, cancel_futures=True)
+            print("\nInterrupted: completed steps are in each week's journal, re-run to resume")
+            raise
 
     # Update metadata.yaml (append/update, not overwrite)
-    update_metadata(sounds, week_path, week_start, week_end, language)
+    dated = [state for state in states if state["week_start"] and state["week_end"]]
+    if dated:
+        print()
+        update_metadata(dated)
+
+    if args.similarity is not False:
+        with metrics.span("similarity"):
+            write_similarity(args.language, only_if_indexed=args.similarity is None)
+    if args.catalog if args.catalog is not None else (PUBLIC_DIR / CATALOG_NAME).exists():
+        with metrics.span("catalog"):
+            write_catalog()
 
     print("\n" + "=" * 50)
-    print(f"Generated manifest: {manifest_file}")
     print(f"Summary:")
-    print(f"  - New words: {new_count}")
-    print(f"  - Updated words: {updated_count}")
-    print(f"  - Skipped (complete): {skipped_count}")
-    print(f"  - Total in manifest: {len(results)}")
+    if len(states) > 1:
+        print(f"  - Weeks: {len(states)}")
+    print(f"  - New words: {sum(state['new'] for state in states)}")
+    print(f"  - Updated words: {sum(state['updated'] for state in states)}")
+    print(f"  - Skipped (complete): {sum(state['skipped'] for state in states)}")
+    print(f"  - Total in manifest{'s' if len(states) > 1 else ''}: {sum(len(state['words']) for state in states)}")
+    if asset_cache is not None:
+        print(f"Cache: {asset_cache.summary()}")
+    usage = rate_limiter.summary()
+    if usage:
+        print("API usage:")
+        for line in usage:
+            print(f"  - {line}")
+    timings = metrics.summary()
+    if timings:
+        print("Timings:")
+        for line in timings:
+            print(f"  - {line}")
+    elapsed = metrics.now() - started
+    total_words = sum(len(state["words"]) for state in states)
+    print(f"Throughput: {total_words} words in {elapsed:.1f}s ({total_words / max(elapsed, 1e-9) * 60:.1f} words/min)")
+    if args.trace:
+        metrics.write_trace(args.trace)
+        print(f"Trace written to: {args.trace}")
     print("=" * 50)
 
 
+def watch_stamps(weeks: dict[str, dict]) -> dict:
+    """(size, mtime_ns) of metadata.yaml and of each week's words_of_week.txt (None if absent), by week path."""
+    stamps = {}
+    files = {None: METADATA_FILE, **{path: PUBLIC_DIR / path / "words_of_week.txt" for path in weeks}}
+    for key, path in files.items():
+        try:
+            st = path.stat()
+            stamps[key] = (st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            stamps[key] = None
+    return stamps
+
+
+def refresh_week(week: dict, full: bool, pools: tuple, args: argparse.Namespace) -> None:
+    """
+    Bring a week's manifest in line with its words_of_week.txt: generate
+    the words it doesn't have yet, drop the words no longer listed (and
+    their files), and keep every other entry as it is, without checking its
+    files. With `full` (the week's language changed) every word is checked
+    for stale assets, as `generate` does.
+    """
+    word_pool, stage_pool, post_pool = pools
+    week_path = week["path"]
+    week_dir = PUBLIC_DIR / week_path
+    words_file = week_dir / "words_of_week.txt"
+    if not words_file.exists():
+        return
+
+    manifest_file = week_dir / "manifest.json"
+    existing = load_existing_manifest(manifest_file)
+    words = read_words(words_file)
+    journal = WeekJournal(week_dir)
+    journal.replay(existing)
+    added = [word for word in words if word not in existing]
+    removed = [word for word in existing if word not in words]
+    redo = words if full else added
+    if not redo and not removed and list(existing) == words:
+        return
+
+    started = metrics.now()
+    print(f"\n{week_path}: +{len(added)} -{len(removed)} word(s){', checking every word' if full else ''}")
+    audio_dir = week_dir / "audio"
+    images_dir = week_dir / "images"
+    audio_dir.mkdir(parents=True, exist_ok=True)
+    images_dir.mkdir(parents=True, exist_ok=True)
+
+    batched = {}
+    missing_sentences = [word for word in redo if not (existing.get(word) or {}).get("sentence")]
+    if args.batch_sentences and len(missing_sentences) > 1:
+        with metrics.span("sentenceBatch", language=week["language"], words=len(missing_sentences)):
+            batched = generate_sentences_batch(missing_sentences, week["language"])
+
+    futures = {
+        word: word_pool.submit(
+            metrics.wrap(process_word, "word", week=week_path, word=word), word, week_path, existing.get(word),
+            audio_dir, images_dir, week["language"], stage_pool, batched.get(word), post_pool, journal,
+        )
+        for word in redo
+    }
+    results = [futures[word].result() if word in futures else existing[word] for word in words]
+    state = {"path": week_path, "audio_dir": audio_dir, "manifest_file": manifest_file, "words": words, "existing": existing, "journal": journal}
+    finish_week(state, results, args.sprite)
+
+    # Files only the dropped words used (their cache copies stay, should they come back)
+    kept = manifest_references({"words": results})
+    dropped = manifest_references({"words": [existing[word] for word in removed]})
+    for url in dropped.keys() - kept.keys():
+        if url.startswith(f"/{week_path}/"):
+            (PUBLIC_DIR / url.lstrip("/")).unlink(missing_ok=True)
+    print(f"{week_path}: manifest updated in {metrics.now() - started:.1f}s")
+
+
+def run_watch(args: argparse.Namespace) -> None:
+    """
+    Stay running with the client, cache, registry and worker pools warm,
+    and poll metadata.yaml and every watched week's words_of_week.txt.
+    Once a list has stopped changing for --debounce seconds, only its added
+    and removed words are processed and its manifest.json is updated. The
+    first pass does the same for every week, to catch edits made while not
+    watching. metadata.yaml is not written: dates and new weeks still go
+    through `generate`.
+    """
+    global metrics
+
+    if not (args.all or args.weeks or args.sounds):
+        args.all = True
+    configure_generation(args)
+    get_client()
+    concurrency = max(1, args.concurrency)
+
+    weeks = {week["path"]: week for week in select_weeks(args, need_dates=False)}
+    stamps = watch_stamps(weeks)
+    dirty = dict.fromkeys(weeks, False)  # {week path: check every word}
+    settle_at = 0.0
+    print(f"Watching {len(weeks)} week(s) under {PUBLIC_DIR} (Ctrl-C to stop)")
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="word") as word_pool, \
+            ThreadPoolExecutor(max_workers=concurrency * 2, thread_name_prefix="stage") as stage_pool, \
+            ProcessPoolExecutor() as post_pool:
+        pools = (word_pool, stage_pool, post_pool)
+        try:
+            while True:
+                if dirty and time.monotonic() >= settle_at:
+                    metrics = Metrics()
+                    for path, full in dirty.items():
+                        if path in weeks:
+                            refresh_week(weeks[path], full, pools, args)
+                    dirty = {}
+                    if args.similarity is not False:
+                        write_similarity(args.language, only_if_indexed=args.similarity is None)
+                    if args.catalog if args.catalog is not None else (PUBLIC_DIR / CATALOG_NAME).exists():
+                        write_catalog()
+                    usage = rate_limiter.summary()
+                    if usage:
+                        print(f"API usage: {'; '.join(usage)}")
+
+                time.sleep(args.interval)
+                current_weeks = {week["path"]: week for week in select_weeks(args, need_dates=False)}
+                current = watch_stamps(current_weeks)
+                if current == stamps and current_weeks == weeks:
+                    continue
+
+                # A new or edited list needs its added/removed words; a
+                # week whose language changed needs every word redone
+                for path, week in current_weeks.items():
+                    if current.get(path) != stamps.get(path) or path not in weeks:
+                        dirty.setdefault(path, False)
+                    elif week["language"] != weeks[path]["language"]:
+                        dirty[path] = True
+                weeks, stamps = current_weeks, current
+                settle_at = time.monotonic() + args.debounce
+        except KeyboardInterrupt:
+            for pool in pools:
+                pool.shutdown(wait=False, cancel_futures=True)
+            print("\nStopped watching: completed steps are in each week's journal")
+
+
+def backfill_weeks(week_paths: list[str], workers: int | None, submit, collect, label: str) -> None:
+    """
+    Run a post-processing stage over every entry of existing week manifests.
+
+    submit(entry, week_dir, pool) starts the work and returns a pending
+    handle; collect(entry, week_path, pending) records the results in the
+    entry. Everything is submitted up front so every file of every week is
+    spread over the process pool, then each manifest is rewritten in place.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        weeks = []
+        for week_path in week_paths:
+            manifest_file = PUBLIC_DIR / week_path / "manifest.json"
+            if not manifest_file.exists():
+                print(f"  {week_path}: no manifest.json, skipping")
+                continue
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+
+            week_dir = PUBLIC_DIR / week_path
+            pending = [(entry, submit(entry, week_dir, pool)) for entry in manifest.get("words", [])]
+            weeks.append((week_path, manifest_file, manifest, pending))
+
+        for week_path, manifest_file, manifest, pending in weeks:
+            for entry, handle in pending:
+                collect(entry, week_path, handle)
+            extra = {key: value for key, value in manifest.items() if key not in ("generatedAt", "words")}
+            write_manifest(manifest_file, manifest.get("words", []), manifest.get("generatedAt"), **extra)
+            print(f"  {week_path}: {len(pending)} words {label}")
+
+
+def run_encode(args: argparse.Namespace) -> None:
+    """Backfill compressed audio variants for existing weeks (no API calls)."""
+    configure_audio_formats(args.audio_formats)
+    if not audio_formats:
+        print("No audio formats to encode")
+        return
+
+    week_paths = list_week_paths(args.weeks)
+    print(f"Encoding {', '.join(audio_formats)} for {len(week_paths)} week(s)")
+    backfill_weeks(
+        week_paths, args.workers,
+        lambda entry, week_dir, pool: submit_audio_encodes(entry, week_dir / "audio", pool),
+        collect_audio_encodes,
+        "encoded",
+    )
+
+
+def run_speeds(args: argparse.Namespace) -> None:
+    """Backfill slower/faster copies of existing clips (no API calls)."""
+    configure_audio_formats(args.audio_formats)
+    configure_audio_speeds(args.speeds)
+    if not audio_speeds:
+        print("No speeds to write")
+        return
+
+    week_paths = list_week_paths(args.weeks)
+    print(f"Time-stretching to {', '.join(f'{speed:g}x' for speed in audio_speeds)} for {len(week_paths)} week(s)")
+    backfill_weeks(
+        week_paths, args.workers,
+        lambda entry, week_dir, pool: submit_speed_variants(entry, week_dir / "audio", pool),
+        collect_speed_variants,
+        "stretched",
+    )
+
+
+def run_images(args: argparse.Namespace) -> None:
+    """Backfill resized WebP/AVIF image variants for existing weeks (no API calls)."""
+    configure_image_formats(args.image_formats, args.image_widths)
+    if not image_formats:
+        print("No image formats to write")
+        return
+
+    week_paths = list_week_paths(args.weeks)
+    widths = ", ".join(str(w) for w in image_widths)
+    print(f"Writing {', '.join(image_formats)} at {widths}px for {len(week_paths)} week(s)")
+    backfill_weeks(
+        week_paths, args.workers,
+        lambda entry, week_dir, pool: submit_image_variants(entry, week_dir / "images", pool),
+        collect_image_variants,
+        "optimized",
+    )
+
+
+def run_placeholders(args: argparse.Namespace) -> None:
+    """Backfill image sizes, dominant colours and inline previews for existing weeks (no API calls)."""
+    week_paths = list_week_paths(args.weeks)
+    print(f"Describing images of {len(week_paths)} week(s)")
+    backfill_weeks(
+        week_paths, args.workers,
+        lambda entry, week_dir, pool: submit_image_placeholder(entry, week_dir / "images", pool, force=True),
+        collect_image_placeholder,
+        "described",
+    )
+
+
+def run_sprite(args: argparse.Namespace) -> None:
+    """Build (or rebuild) the audio sprite for existing weeks (no API calls)."""
+    configure_audio_formats(args.audio_formats)
+    for week_path in list_week_paths(args.weeks):
+        manifest_file = PUBLIC_DIR / week_path / "manifest.json"
+        if not manifest_file.exists():
+            print(f"  {week_path}: no manifest.json, skipping")
+            continue
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        words = manifest.get("words", [])
+        manifest["sprite"] = build_week_sprite(week_path, words, args.gap)
+        extra = {key: value for key, value in manifest.items() if key not in ("generatedAt", "words")}
+        write_manifest(manifest_file, words, manifest.get("generatedAt"), **extra)
+        print(f"  {week_path}: sprite written")
+
+
+def run_clean_audio(args: argparse.Namespace) -> None:
+    """
+    Trim and normalize every existing clip (no API calls), then refresh the
+    compressed variants and any sprite, whose offsets change with the trim.
+    """
+    configure_audio_formats(args.audio_formats)
+    week_paths = list_week_paths(args.weeks)
+    wav_paths = [
+        path
+        for week_path in week_paths
+        for path in sorted((PUBLIC_DIR / week_path / "audio").glob("*.wav"))
+        if path.name != SPRITE_NAME and not is_speed_variant(path)
+    ]
+    print(f"Cleaning {len(wav_paths)} clips in {len(week_paths)} week(s)")
+
+    before = after = 0.0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(clean_wav, path, args.trim_threshold_db, args.target_loudness_db)
+            for path in wav_paths
+        ]
+        for path, future in zip(wav_paths, futures):
+            try:
+                old, new = future.result()
+            except Exception as e:
+                print(f"  Error cleaning {path.name}: {e}")
+                continue
+            before += old
+            after += new
+    print(f"  Audio trimmed from {before:.1f}s to {after:.1f}s")
+
+    if audio_formats:
+        backfill_weeks(
+            week_paths, args.workers,
+            lambda entry, week_dir, pool: submit_audio_encodes(entry, week_dir / "audio", pool),
+            collect_audio_encodes,
+            "re-encoded",
+        )
+
+    # Speed variants are derived from the clips, so re-derive the ones that exist
+    speed_files = [
+        path
+        for week_path in week_paths
+        for path in (PUBLIC_DIR / week_path / "audio").glob("*x.wav")
+        if is_speed_variant(path)
+    ]
+    if speed_files:
+        speed_weeks = sorted({path.parent.parent.name for path in speed_files})
+        configure_audio_speeds(sorted({float(path.stem.rsplit("_", 1)[1][:-1]) for path in speed_files}))
+        backfill_weeks(
+            speed_weeks, args.workers,
+            lambda entry, week_dir, pool: submit_speed_variants(entry, week_dir / "audio", pool),
+            collect_speed_variants,
+            "re-stretched",
+        )
+
+    sprite_weeks = [w for w in week_paths if (PUBLIC_DIR / w / "audio" / SPRITE_NAME).exists()]
+    if sprite_weeks:
+        args.weeks = ",".join(sprite_weeks)
+        args.gap = SPRITE_GAP
+        run_sprite(args)
+
+
+def catalog_weeks() -> list[dict]:
+    """Weeks for the catalog: metadata.yaml order, then weeks it doesn't list."""
+    weeks = {}
+    for entry in load_metadata()["dictee"]:
+        path = entry.get("path") or entry.get("sounds")
+        if path and path not in weeks:
+            weeks[path] = {**entry, "path": path}
+    for path in list_week_paths():
+        weeks.setdefault(path, {"sounds": path, "path": path})
+    return list(weeks.values())
+
+
+def write_catalog() -> None:
+    """Rebuild catalog.json, its fingerprinted assets and precache.json."""
+    stats = build_catalog(PUBLIC_DIR, catalog_weeks())
+    compressed = f"{stats['gzip_bytes'] / 1024:.0f} KB gzip"
+    if stats["brotli_bytes"] is not None:
+        compressed += f", {stats['brotli_bytes'] / 1024:.0f} KB brotli"
+    print(
+        f"Catalog {stats['version']}: {stats['weeks']} week(s), {stats['assets']} assets "
+        f"({stats['hashed']} hashed, {stats['linked']} linked, {stats['removed']} removed), "
+        f"{stats['bytes'] / 1024:.0f} KB ({compressed})"
+    )
+    if stats["brotli_bytes"] is None:
+        print(f"  Install `brotli` to also write {CATALOG_NAME}.br")
+    for url in stats["missing"]:
+        print(f"  Warning: {url} is referenced but missing, left unfingerprinted")
+
+
+def write_similarity(default_language: str = "fr", only_if_indexed: bool = False) -> None:
+    """
+    Recompute every word's confusables and blanks across all weeks of its
+    language and update the manifests whose entries changed. With
+    `only_if_indexed`, do nothing unless a manifest already has them.
+    """
+    weeks = []
+    manifests = {}
+    for week in catalog_weeks():
+        manifest_file = PUBLIC_DIR / week["path"] / "manifest.json"
+        if not manifest_file.exists():
+            continue
+        get_registry().sync_manifest(manifest_file)
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifests[week["path"]] = (manifest_file, manifest)
+        weeks.append({
+            "path": week["path"],
+            "sounds": week.get("sounds") or week["path"],
+            "language": week.get("language") or default_language,
+            "words": [entry["text"] for entry in manifest.get("words", [])],
+        })
+    if only_if_indexed and not any(
+        "confusables" in entry for _, manifest in manifests.values() for entry in manifest.get("words", [])
+    ):
+        return
+
+    index = index_weeks(weeks)
+    updated = 0
+    for week_path, (manifest_file, manifest) in manifests.items():
+        words = manifest.get("words", [])
+        changed = False
+        for entry in words:
+            fields = index[week_path][entry["text"]]
+            if any(entry.get(key) != value for key, value in fields.items()):
+                entry.update(fields)
+                changed = True
+        if changed:
+            extra = {key: value for key, value in manifest.items() if key not in ("generatedAt", "words")}
+            write_manifest(manifest_file, words, manifest.get("generatedAt"), **extra)
+            updated += 1
+    total = sum(len(week["words"]) for week in weeks)
+    print(f"Similarity index: {total} words in {len(weeks)} week(s), {updated} manifest(s) updated")
+
+
+def run_similarity(args: argparse.Namespace) -> None:
+    """Write confusable words and letter blanks into every manifest (no API calls)."""
+    write_similarity(args.language)
+
+
+def run_catalog(args: argparse.Namespace) -> None:
+    """Write the client catalog, fingerprinted assets and precache list (no API calls)."""
+    write_catalog()
+
+
+def run_status(args: argparse.Namespace) -> None:
+    """Summarize every week from the registry: generated vs missing assets, sizes, timings."""
+    global registry_readonly
+
+    registry_readonly = True
+    week_paths = list_week_paths(args.weeks)
+    if get_registry().empty:
+        print(f"No registry yet at {get_registry().path}: run generate first")
+        return
+
+    weeks = {}
+    for row in get_registry().status():
+        if row["week"] in week_paths:
+            weeks.setdefault(row["week"], []).append(row)
+    for week_path, rows in weeks.items():
+        size = sum(row["bytes"] for row in rows)
+        counts = ", ".join(f"{row['asset']} {row['present']}/{row['words']}" for row in rows)
+        timed = [f"{row['asset']} {row['seconds']:.1f}s" for row in rows if row["seconds"] is not None]
+        print(f"  {week_path}: {counts}, {size / 1024 ** 2:.1f} MB" + (f" (mean {', '.join(timed)})" if timed else ""))
+
+    missing = [row for row in get_registry().missing() if row[0] in week_paths]
+    print(f"{len(missing)} asset(s) missing in {len(weeks)} week(s)")
+    if args.missing:
+        for week_path, word, asset in missing:
+            print(f"  {week_path}: {word} {asset}")
+
+
+def print_verify_report(report: dict) -> None:
+    problems = len(report["broken"]) + len(report["missing"]) + len(report["orphans"])
+    problems += len(report["unlisted"]) + len(report["dropped"])
+    if not problems:
+        print(f"  {report['week']}: {report['files']} files OK")
+        return
+
+    counts = [
+        f"{len(report[key])} {label}"
+        for key, label in (
+            ("broken", "broken"), ("missing", "missing"), ("orphans", "orphaned"),
+            ("unlisted", "not generated"), ("dropped", "no longer listed"),
+        )
+        if report[key]
+    ]
+    print(f"  {report['week']}: {report['files']} files, {', '.join(counts)}")
+    for path, problem in report["broken"].items():
+        print(f"    broken   {path}: {problem}")
+    for path, where in report["missing"].items():
+        print(f"    missing  {path} ({where})")
+    for path in report["orphans"]:
+        print(f"    orphan   {path}")
+    if report["unlisted"]:
+        print(f"    not generated: {', '.join(report['unlisted'])}")
+    if report["dropped"]:
+        print(f"    in manifest but not in words_of_week.txt: {', '.join(report['dropped'])}")
+
+
+def run_verify(args: argparse.Namespace) -> None:
+    """
+    Check every file of every week (headers and lengths only, no decoding)
+    and cross-check manifest.json against disk, weeks in parallel. With
+    --repair, broken files are deleted (with their cache blobs) and the
+    affected weeks are regenerated with the generate options verify was
+    given, which only redoes what is now missing.
+    Exits with status 1 if problems remain.
+    """
+    week_paths = list_week_paths(args.weeks)
+    print(f"Verifying {len(week_paths)} week(s)")
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        reports = list(pool.map(verify_week, [PUBLIC_DIR] * len(week_paths), week_paths))
+
+    for report in reports:
+        print_verify_report(report)
+    checked = sum(report["files"] for report in reports)
+    broken = sum(len(report["broken"]) for report in reports)
+    missing = sum(len(report["missing"]) for report in reports)
+    orphans = sum(len(report["orphans"]) for report in reports)
+    print(f"{checked} files checked: {broken} broken, {missing} missing, {orphans} orphaned")
+
+    if args.remove_orphans and orphans:
+        for report in reports:
+            for path in report["orphans"]:
+                (PUBLIC_DIR / report["week"] / path).unlink(missing_ok=True)
+        print(f"Removed {orphans} orphaned file(s)")
+        orphans = 0
+
+    repair_weeks = [
+        report["week"] for report in reports
+        if report["broken"] or report["missing"] or report["unlisted"]
+    ]
+    if not args.repair or not repair_weeks:
+        if broken or missing or orphans or any(report["unlisted"] for report in reports):
+            sys.exit(1)
+        return
+
+    broken_files = [
+        PUBLIC_DIR / report["week"] / path
+        for report in reports
+        for path in report["broken"]
+        if path != "manifest.json"
+    ]
+    if broken_files and not args.no_cache:
+        dropped = AssetCache(args.cache_dir).discard_copies(broken_files)
+        if dropped:
+            print(f"Dropped {dropped} corrupt blob(s) from the cache")
+    for path in broken_files:
+        path.unlink(missing_ok=True)
+
+    words = sum(len(report["repair"]) + len(report["unlisted"]) for report in reports)
+    print(f"Repairing {len(repair_weeks)} week(s), {words} word(s) with a broken or missing source file")
+    # Same options as the verify command line, so the repair writes what the original run did
+    run_generate(argparse.Namespace(**{
+        **vars(args),
+        "weeks": ",".join(repair_weeks), "all": False, "sounds": None, "path": None,
+        "week_start": None, "week_end": None, "plan": False, "trace": None,
+    }))
+
+
+COMMANDS = ("generate", "watch", "plan", "encode", "speeds", "images", "placeholders", "sprite", "clean-audio", "verify", "similarity", "catalog", "status")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Generate assets for the Dictée app",
+        epilog="Without a command, `generate` is assumed."
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    generate_parser = subparsers.add_parser("generate", help="Generate missing or stale assets for a week (default)")
+    add_generate_arguments(generate_parser)
+    generate_parser.set_defaults(func=run_generate)
+
+    watch_parser = subparsers.add_parser("watch", help="Keep running and generate words as they are added to a week's list")
+    add_generate_arguments(watch_parser, watch=True)
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_INTERVAL,
+        help=f"Seconds between checks of the word lists and metadata.yaml (default: {WATCH_INTERVAL:g})"
+    )
+    watch_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=WATCH_DEBOUNCE,
+        help=f"Seconds a list must stay unchanged before it is generated (default: {WATCH_DEBOUNCE:g})"
+    )
+    watch_parser.set_defaults(func=run_watch)
+
+    plan_parser = subparsers.add_parser("plan", help="Report missing or stale assets and the estimated API calls and time, without API calls")
+    add_week_arguments(plan_parser)
+    add_scheduling_arguments(plan_parser)
+    plan_parser.set_defaults(func=run_plan)
+
+    encode_parser = subparsers.add_parser("encode", help="Backfill compressed audio for existing weeks, without API calls")
+    encode_parser.add_argument(
+        "--weeks",
+        default=None,
+        help="Comma-separated week paths (default: every week under public/)"
+    )
+    encode_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Encoder processes (default: one per CPU)"
+    )
+    add_audio_format_argument(encode_parser)
+    encode_parser.set_defaults(func=run_encode)
+
+    speeds_parser = subparsers.add_parser("speeds", help="Derive slower/faster copies of existing clips, without API calls")
+    speeds_parser.add_argument(
+        "--weeks",
+        default=None,
+        help="Comma-separated week paths (default: every week under public/)"
+    )
+    speeds_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU)"
+    )
+    add_speeds_argument(speeds_parser, default=DEFAULT_SPEEDS)
+    add_audio_format_argument(speeds_parser)
+    speeds_parser.set_defaults(func=run_speeds)
+
+    images_parser = subparsers.add_parser("images", help="Backfill resized WebP/AVIF images for existing weeks, without API calls")
+    images_parser.add_argument(
+        "--weeks",
+        default=None,
+        help="Comma-separated week paths (default: every week under public/)"
+    )
+    images_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Encoder processes (default: one per CPU)"
+    )
+    add_image_arguments(images_parser)
+    images_parser.set_defaults(func=run_images)
+
+    placeholders_parser = subparsers.add_parser("placeholders", help="Backfill image sizes, dominant colours and inline previews for existing weeks, without API calls")
+    placeholders_parser.add_argument(
+        "--weeks",
+        default=None,
+        help="Comma-separated week paths (default: every week under public/)"
+    )
+    placeholders_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU)"
+    )
+    placeholders_parser.set_defaults(func=run_placeholders)
+
+    sprite_parser = subparsers.add_parser("sprite", help="Pack each existing week's clips into one audio sprite, without API calls")
+    sprite_parser.add_argument(
+        "--weeks",
+        default=None,
+        help="Comma-separated week paths (default: every week under public/)"
+    )
+    sprite_parser.add_argument(
+        "--gap",
+        type=float,
+        default=SPRITE_GAP,
+        help=f"Seconds of silence around each clip (default: {SPRITE_GAP})"
+    )
+    add_audio_format_argument(sprite_parser)
+    sprite_parser.set_defaults(func=run_sprite)
+
+    clean_parser = subparsers.add_parser("clean-audio", help="Trim silence and normalize loudness of existing clips, without API calls")
+    clean_parser.add_argument(
+        "--weeks",
+        default=None,
+        help="Comma-separated week paths (default: every week under public/)"
+    )
+    clean_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU)"
+    )
+    add_audio_cleanup_arguments(clean_parser)
+    add_audio_format_argument(clean_parser)
+    clean_parser.set_defaults(func=run_clean_audio)
+
+    verify_parser = subparsers.add_parser("verify", help="Check existing files (headers and lengths) and manifests against disk, without API calls")
+    verify_parser.add_argument(
+        "--weeks",
+        default=None,
+        help="Comma-separated week paths (default: every week under public/)"
+    )
+    verify_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Weeks checked in parallel (default: one per CPU)"
+    )
+    verify_parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Delete broken files and regenerate only what is broken or missing (calls the API)"
+    )
+    verify_parser.add_argument(
+        "--remove-orphans",
+        action="store_true",
+        help="Delete files that no manifest references"
+    )
+    # --repair runs `generate` on the affected weeks with these options
+    verify_parser.add_argument(
+        "--language",
+        default="fr",
+        choices=list(LANGUAGE_CONFIG.keys()),
+        help="Language for regenerated sentences/audio of weeks without one in metadata.yaml (default: fr)"
+    )
+    add_scheduling_arguments(verify_parser)
+    add_output_arguments(verify_parser)
+    verify_parser.set_defaults(func=run_verify)
+
+    similarity_parser = subparsers.add_parser("similarity", help="Write each word's most confusable words and letters to blank into the manifests, without API calls")
+    similarity_parser.add_argument(
+        "--language",
+        default="fr",
+        choices=list(LANGUAGE_CONFIG.keys()),
+        help="Language of weeks without one in metadata.yaml (default: fr)"
+    )
+    similarity_parser.set_defaults(func=run_similarity)
+
+    catalog_parser = subparsers.add_parser("catalog", help="Write catalog.json, content-hashed asset copies and precache.json for the app, without API calls")
+    catalog_parser.set_defaults(func=run_catalog)
+
+    status_parser = subparsers.add_parser("status", help="Summarize generated and missing assets from the registry, without API calls")
+    status_parser.add_argument(
+        "--weeks",
+        default=None,
+        help="Comma-separated week paths (default: every week under public/)"
+    )
+    status_parser.add_argument(
+        "--missing",
+        action="store_true",
+        help="List every missing asset"
+    )
+    status_parser.set_defaults(func=run_status)
+
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    """Dispatch to a command; plain option lists run `generate` for compatibility."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv = ["generate", *argv]
+
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Image post-processing for the Dictée asset generator.
+
+Imagen returns ~1-2 MB PNGs at 1024x1024, while the app shows them at
+phone/tablet card sizes. This module derives resized WebP (and AVIF, when
+the installed Pillow can write it) variants from the PNG, which stays the
+source of truth. Variants are rebuilt whenever the PNG is newer. It also
+describes each image in a few hundred bytes (size, dominant colour and a
+tiny blurred WebP) so the client can paint something before it loads.
+
+Functions here run in worker processes, so they only take and return
+picklable values.
+"""
+
+import base64
+import io
+import os
+from pathlib import Path
+
+
+IMAGE_WIDTHS = [256, 512, 1024]
+
+# Encoder settings, in the order the client should prefer them
+IMAGE_FORMATS = {
+    "avif": {"pil_format": "AVIF", "options": {"quality": 60}},
+    "webp": {"pil_format": "WEBP", "options": {"quality": 80, "method": 6}},
+}
+DEFAULT_IMAGE_FORMATS = ["avif", "webp"]
+
+# Inline placeholder: longest side in pixels and WebP quality
+PLACEHOLDER_SIZE = 32
+PLACEHOLDER_QUALITY = 40
+
+
+def parse_image_formats(value: str) -> list[str]:
+    """Parse a comma-separated --image-formats value ("" or "none" disables)."""
+    formats = [f.strip().lower() for f in value.split(",") if f.strip()]
+    if formats == ["none"]:
+        return []
+    unknown = [f for f in formats if f not in IMAGE_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown image format(s): {', '.join(unknown)} (choose from {', '.join(IMAGE_FORMATS)})")
+    return formats
+
+
+def parse_widths(value: str) -> list[int]:
+    return sorted({int(w) for w in value.split(",") if w.strip()})
+
+
+def available_image_formats(formats: list[str]) -> list[str]:
+    """Drop formats the installed Pillow can't encode (AVIF needs Pillow >= 11.3)."""
+    from PIL import features
+
+    return [f for f in formats if features.check(f)]
+
+
+def variant_path(src_path: Path, width: int, fmt: str) -> Path:
+    return src_path.with_name(f"{src_path.stem}_{width}.{fmt}")
+
+
+def optimize_image(src_path: Path, widths: list[int], formats: list[str], force: bool = False) -> dict[str, dict[int, Path]]:
+    """
+    Write a resized variant of the image for every width and format.
+
+    Widths larger than the source are skipped (the source width is used
+    instead if every width is too large). Returns {format: {width: path}}.
+    """
+    from PIL import Image
+
+    src_path = Path(src_path)
+    src_mtime = src_path.stat().st_mtime
+    variants = {fmt: {} for fmt in formats}
+
+    with Image.open(src_path) as image:
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        targets = [w for w in widths if w <= image.width] or [image.width]
+
+        for width in targets:
+            resized = None
+            for fmt in formats:
+                out_path = variant_path(src_path, width, fmt)
+                variants[fmt][width] = out_path
+                if not force and out_path.exists() and out_path.stat().st_mtime >= src_mtime:
+                    continue
+
+                if resized is None:
+                    height = round(image.height * width / image.width)
+                    resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+                spec = IMAGE_FORMATS[fmt]
+                tmp_path = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+                resized.save(tmp_path, format=spec["pil_format"], **spec["options"])
+                os.replace(tmp_path, out_path)
+
+    return variants
+
+
+def image_placeholder(src_path: Path) -> dict:
+    """
+    What the client needs to lay out and paint the image before it loads:
+    {"width", "height", "color" (dominant, "#rrggbb"), "src" (a
+    PLACEHOLDER_SIZE px WebP as a data: URL, a few hundred bytes)}.
+    """
+    from PIL import Image
+
+    with Image.open(src_path) as image:
+        width, height = image.size
+        image.draft("RGB", (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        thumb = image.convert("RGB")
+    thumb.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.LANCZOS)
+
+    # Most common colour of a small palette, so a big flat area wins over an average
+    palette = thumb.quantize(colors=4)
+    count, index = max(palette.getcolors())
+    red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+
+    buffer = io.BytesIO()
+    thumb.save(buffer, format="WEBP", quality=PLACEHOLDER_QUALITY, method=6)
+    return {
+        "width": width,
+        "height": height,
+        "color": f"#{red:02x}{green:02x}{blue:02x}",
+        "src": "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii"),
+    }
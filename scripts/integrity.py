@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Integrity checks for the Dictée asset generator's output.
+
+generate only checks that an asset exists, so a truncated WAV or a
+zero-byte PNG left by a failed run is never regenerated. The checks here
+read only headers and chunk/page/box lengths through mmap, never decode
+audio or pixels, so a full scan of public/ takes well under a second per
+week:
+
+    .wav          RIFF/WAVE header, data chunk vs file size, whole frames
+    .png          signature, IHDR (with CRC), chunk walk up to IEND
+    .webp         RIFF size vs file size, VP8/VP8L/VP8X header
+    .avif         ISO BMFF box walk from ftyp to the end of the file
+    .opus         Ogg pages at both ends, last page complete with EOS flag
+    .mp3          ID3 tag, then a walk over the Layer III frames
+
+verify_week() also cross-checks a week's manifest.json against its audio/
+and images/ directories. Functions here run in worker processes, so they
+only take and return picklable values.
+"""
+
+import json
+import mmap
+import struct
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+OGG_MAX_PAGE = 27 + 255 + 255 * 255  # header + segment table + payload
+
+# MPEG Layer III frame header tables: kbps by [MPEG-1?][index], Hz by [version][index]
+MP3_BITRATES = {
+    True: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+# Manifest fields that name a word's generated source files
+SOURCE_FIELDS = ("audioWord", "audioSentence", "image")
+
+
+@contextmanager
+def mapped(path: Path):
+    """The file's bytes as a read-only mmap (the file must not be empty)."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def check_wav(data) -> str | None:
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return "not a RIFF/WAVE file"
+    riff_size = struct.unpack_from("<I", data, 4)[0]
+    if riff_size + 8 > len(data):
+        return f"truncated ({len(data)} of {riff_size + 8} bytes)"
+
+    block_align = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk, size = struct.unpack_from("<4sI", data, pos)
+        if chunk == b"fmt ":
+            block_align = struct.unpack_from("<H", data, pos + 20)[0]
+        elif chunk == b"data":
+            if block_align is None:
+                return "data chunk before fmt chunk"
+            if pos + 8 + size > len(data):
+                return f"truncated (data chunk of {size} bytes, {len(data) - pos - 8} present)"
+            if not block_align or size % block_align:
+                return "partial audio frame"
+            if size == 0:
+                return "no audio frames"
+            return None
+        pos += 8 + size + size % 2
+    return "no data chunk"
+
+
+def check_png(data) -> str | None:
+    if data[:8] != PNG_SIGNATURE:
+        return "not a PNG file"
+    length, chunk = struct.unpack_from(">I4s", data, 8)
+    if chunk != b"IHDR" or length != 13 or len(data) < 33:
+        return "missing IHDR chunk"
+    if zlib.crc32(data[12:29]) != struct.unpack_from(">I", data, 29)[0]:
+        return "corrupt IHDR chunk"
+    width, height = struct.unpack_from(">II", data, 16)
+    if not width or not height:
+        return "zero image size"
+
+    pos = 8
+    while pos + 8 <= len(data):
+        length, chunk = struct.unpack_from(">I4s", data, pos)
+        pos += 12 + length
+        if chunk == b"IEND":
+            return None if pos <= len(data) else "truncated IEND chunk"
+    return f"truncated (no IEND chunk in {len(data)} bytes)"
+
+
+def check_webp(data) -> str | None:
+    if data[:4] != b"RIFF" or data[8:12] != b"WEBP":
+        return "not a WebP file"
+    riff_size = struct.unpack_from("<I", data, 4)[0]
+    if riff_size + 8 > len(data):
+        return f"truncated ({len(data)} of {riff_size + 8} bytes)"
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        ok = data[23:26] == b"\x9d\x01\x2a" and struct.unpack_from("<H", data, 26)[0] & 0x3FFF
+    elif chunk == b"VP8L":
+        ok = data[20] == 0x2F
+    elif chunk == b"VP8X":
+        ok = len(data) >= 30
+    else:
+        return f"unknown WebP chunk {bytes(chunk)!r}"
+    return None if ok else "corrupt WebP header"
+
+
+def check_avif(data) -> str | None:
+    if data[4:8] != b"ftyp":
+        return "not an AVIF file"
+    pos = 0
+    while pos < len(data):
+        if pos + 8 > len(data):
+            return "truncated box header"
+        size = struct.unpack_from(">I", data, pos)[0]
+        if size == 1:
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+        elif size == 0:
+            size = len(data) - pos
+        if size < 8 or pos + size > len(data):
+            return f"truncated ({bytes(data[pos + 4:pos + 8]).decode('latin-1')} box)"
+        pos += size
+    return None
+
+
+def check_ogg(data) -> str | None:
+    if data[:4] != b"OggS":
+        return "not an Ogg file"
+    last = data.rfind(b"OggS", max(0, len(data) - OGG_MAX_PAGE))
+    if last < 0 or last + 27 > len(data):
+        return "truncated last page"
+    segments = data[last + 26]
+    if last + 27 + segments > len(data):
+        return "truncated last page"
+    page_size = 27 + segments + sum(data[last + 27:last + 27 + segments])
+    if last + page_size != len(data):
+        return "truncated last page"
+    if not data[last + 5] & 0x04:
+        return "no end-of-stream page (truncated)"
+    return None
+
+
+def check_mp3(data) -> str | None:
+    pos = 0
+    if data[:3] == b"ID3":
+        size = data[6:10]
+        pos = 10 + ((size[0] << 21) | (size[1] << 14) | (size[2] << 7) | size[3])
+    end = len(data) - 128 if data[-128:-125] == b"TAG" else len(data)
+    if pos + 4 > end or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return "no MPEG frame"
+
+    # Walk the Layer III frames by their header-computed lengths
+    while pos + 4 <= end:
+        if data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+            return f"lost frame sync at byte {pos}"
+        version = (data[pos + 1] >> 3) & 3
+        layer = (data[pos + 1] >> 1) & 3
+        bitrate_index = data[pos + 2] >> 4
+        rate_index = (data[pos + 2] >> 2) & 3
+        if layer != 1:
+            return None  # not Layer III, header check only
+        if version == 1 or bitrate_index in (0, 15) or rate_index == 3:
+            return f"bad frame header at byte {pos}"
+        bitrate = MP3_BITRATES[version == 3][bitrate_index] * 1000
+        rate = MP3_SAMPLE_RATES[version][rate_index]
+        pos += (144 if version == 3 else 72) * bitrate // rate + ((data[pos + 2] >> 1) & 1)
+    return None if pos == end else "truncated last frame"
+
+
+CHECKS = {
+    ".wav": check_wav,
+    ".png": check_png,
+    ".webp": check_webp,
+    ".avif": check_avif,
+    ".opus": check_ogg,
+    ".ogg": check_ogg,
+    ".mp3": check_mp3,
+}
+
+
+def check_file(path: Path) -> str | None:
+    """Problem with the file's structure, or None if it looks whole."""
+    check = CHECKS.get(path.suffix.lower())
+    try:
+        if path.stat().st_size == 0:
+            return "empty file"
+        if check is None:
+            return None
+        with mapped(path) as data:
+            return check(data)
+    except (OSError, ValueError, struct.error, IndexError) as e:
+        return f"unreadable ({e})"
+
+
+def manifest_references(manifest: dict) -> dict[str, str]:
+    """
+    Every file URL in a manifest, with where it is referenced, e.g.
+    {"/ez/images/nez_512.webp": "nez: imageSrcset.webp.512"}.
+    """
+    references = {}
+
+    def walk(value, owner: str, keys: tuple) -> None:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(item, owner, (*keys, str(key)))
+        elif isinstance(value, str) and value.startswith("/") and "/" in value[1:]:
+            references.setdefault(value, f"{owner}: {'.'.join(keys)}")
+
+    for entry in manifest.get("words", []):
+        for key, value in entry.items():
+            if key not in ("provenance", "spriteClips"):
+                walk(value, entry.get("text", "?"), (key,))
+    walk(manifest.get("sprite") or {}, "sprite", ())
+    return references
+
+
+def verify_week(public_dir: Path, week_path: str) -> dict:
+    """
+    Check every file of a week and cross-check it with manifest.json.
+
+    Returns {"week", "files" (number checked), "broken" {relative path:
+    problem}, "missing" {relative path: reference}, "orphans" [relative
+    paths on disk the manifest doesn't mention], "unlisted" [words of
+    words_of_week.txt without a manifest entry], "dropped" [manifest words
+    no longer in words_of_week.txt], "repair" {word: [source fields whose
+    file is broken or missing]}}.
+    """
+    week_dir = Path(public_dir) / week_path
+    report = {
+        "week": week_path, "files": 0, "broken": {}, "missing": {}, "orphans": [],
+        "unlisted": [], "dropped": [], "repair": {},
+    }
+
+    manifest_file = week_dir / "manifest.json"
+    manifest = {}
+    if manifest_file.exists():
+        try:
+            manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            report["broken"]["manifest.json"] = f"unreadable ({e})"
+
+    words_file = week_dir / "words_of_week.txt"
+    if words_file.exists():
+        listed = [line.strip() for line in words_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+        entries = {entry.get("text") for entry in manifest.get("words", [])}
+        listed_lower = {word.lower() for word in listed}
+        report["unlisted"] = [word for word in dict.fromkeys(listed) if word not in entries]
+        report["dropped"] = [word for word in entries if word and word.lower() not in listed_lower]
+
+    prefix = f"/{week_path}/"
+    references = {
+        url[len(prefix):]: where
+        for url, where in manifest_references(manifest).items()
+        if url.startswith(prefix)
+    }
+
+    on_disk = sorted(
+        path.relative_to(week_dir).as_posix()
+        for folder in ("audio", "images") if (week_dir / folder).is_dir()
+        for path in (week_dir / folder).iterdir() if path.is_file()
+    )
+    for relative in on_disk:
+        if relative not in references:
+            report["orphans"].append(relative)
+            continue
+        report["files"] += 1
+        problem = check_file(week_dir / relative)
+        if problem:
+            report["broken"][relative] = problem
+
+    present = set(on_disk)
+    for relative, where in references.items():
+        if relative not in present:
+            report["missing"][relative] = where
+
+    for entry in manifest.get("words", []):
+        fields = [
+            field for field in SOURCE_FIELDS
+            if isinstance(entry.get(field), str) and entry[field].startswith(prefix)
+            and (entry[field][len(prefix):] in report["broken"] or entry[field][len(prefix):] in report["missing"])
+        ]
+        if fields:
+            report["repair"][entry["text"]] = fields
+    return report
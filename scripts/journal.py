@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Per-week write-ahead journal for the Dictée asset generator.
+
+manifest.json is only written once every word of a week is done, so without
+a journal an interrupted run loses every sentence it generated (they only
+exist in memory) and the provenance of every asset it wrote. Each completed
+step is appended to public/<week>/.journal.jsonl as one JSON line as soon as
+it finishes, e.g.
+
+    {"word": "chat", "fields": {"sentence": "..."}, "provenance": {...}}
+
+A run that finds a journal replays it over the manifest before deciding what
+to generate, so nothing that was already paid for is requested again. The
+journal is removed once the week's manifest has been written.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+
+JOURNAL_NAME = ".journal.jsonl"
+
+
+class WeekJournal:
+    """Append-only record of the steps completed for one week."""
+
+    def __init__(self, week_dir: Path):
+        self.path = Path(week_dir) / JOURNAL_NAME
+        self.lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def record(self, word: str, fields: dict, provenance: dict | None = None) -> None:
+        """Durably append one completed step for `word`."""
+        line = json.dumps(
+            {"word": word, "fields": fields, "provenance": provenance or {}},
+            ensure_ascii=False,
+        )
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def replay(self, entries: dict) -> int:
+        """
+        Apply the journal to `entries` ({word: manifest entry}) in place and
+        return the number of steps replayed. A torn last line (the run died
+        mid-write) is ignored and cut off the file, so the next record()
+        starts on a line of its own instead of being glued onto it.
+        """
+        if not self.path.exists():
+            return 0
+
+        with self.lock:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                complete = data.rfind(b"\n") + 1
+                if complete < len(data):
+                    f.truncate(complete)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        replayed = 0
+        for line in data[:complete].decode("utf-8", errors="replace").splitlines():
+            try:
+                step = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            word = step["word"]
+            entry = dict(entries.get(word) or {"id": word, "text": word})
+            entry.update(step.get("fields", {}))
+            entry["provenance"] = {**entry.get("provenance", {}), **step.get("provenance", {})}
+            entries[word] = entry
+            replayed += 1
+        return replayed
+
+    def clear(self) -> None:
+        """Drop the journal once its steps are safely in manifest.json."""
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Media metadata for the Dictée manifests.
+
+The client can't tell how long a clip is or how big a file is until it
+has downloaded it, so it can't decide what to prefetch. describe_file()
+reads what it needs from headers only: byte size and a content hash for
+every file, plus duration and sample rate for audio (WAV header, Ogg Opus
+granule position, MP3 frame count). media_tree() lays the results out
+like the entry's own URLs, and preload_order() ranks a week's assets for
+prefetching.
+
+Functions here only take and return picklable values.
+"""
+
+import hashlib
+import struct
+import wave
+from pathlib import Path
+
+from integrity import MP3_BITRATES, MP3_SAMPLE_RATES, OGG_MAX_PAGE, mapped
+
+
+HASH_LENGTH = 16  # hex digits of sha256, as in the registry
+
+OPUS_RATE = 48000  # Opus always decodes at 48 kHz
+
+# Entry fields that hold no asset URLs
+SKIPPED_FIELDS = ("provenance", "spriteClips", "imagePlaceholder", "media", "confusables", "blanks")
+
+# Words whose audio, then images, come first in a week's preload order
+PRELOAD_WORDS = 3
+PRELOAD_AUDIO = ("audioWord", "audioSentence")
+PRELOAD_IMAGES = ("image",)
+
+
+def wav_timing(path: Path) -> tuple[int, int]:
+    with wave.open(str(path), "rb") as wav:
+        return wav.getnframes(), wav.getframerate()
+
+
+def opus_timing(data) -> tuple[int, int]:
+    """Samples (at 48 kHz, after the pre-skip) and rate of an Ogg Opus file."""
+    payload = 27 + data[26]
+    if data[payload:payload + 8] != b"OpusHead":
+        raise ValueError("not an Ogg Opus file")
+    pre_skip = struct.unpack_from("<H", data, payload + 10)[0]
+    last = data.rfind(b"OggS", max(0, len(data) - OGG_MAX_PAGE))
+    granule = struct.unpack_from("<q", data, last + 6)[0]
+    return max(0, granule - pre_skip), OPUS_RATE
+
+
+def mp3_timing(data) -> tuple[int, int]:
+    """Samples and rate of an MP3 file, by walking its Layer III frames."""
+    pos = 0
+    if data[:3] == b"ID3":
+        size = data[6:10]
+        pos = 10 + ((size[0] << 21) | (size[1] << 14) | (size[2] << 7) | size[3])
+    end = len(data) - 128 if data[-128:-125] == b"TAG" else len(data)
+    samples = rate = 0
+    while pos + 4 <= end and data[pos] == 0xFF and data[pos + 1] & 0xE0 == 0xE0:
+        version = (data[pos + 1] >> 3) & 3
+        bitrate_index = data[pos + 2] >> 4
+        rate_index = (data[pos + 2] >> 2) & 3
+        if version == 1 or bitrate_index in (0, 15) or rate_index == 3:
+            break
+        rate = MP3_SAMPLE_RATES[version][rate_index]
+        bitrate = MP3_BITRATES[version == 3][bitrate_index] * 1000
+        samples += 1152 if version == 3 else 576
+        pos += (144 if version == 3 else 72) * bitrate // rate + ((data[pos + 2] >> 1) & 1)
+    if not rate:
+        raise ValueError("no MPEG frame")
+    return samples, rate
+
+
+def describe_file(path: Path) -> dict:
+    """
+    {"bytes", "hash"} of a file, plus {"durationMs", "sampleRate"} for
+    audio. Timing that can't be read is left out rather than guessed.
+    """
+    path = Path(path)
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    info = {"bytes": path.stat().st_size, "hash": hasher.hexdigest()[:HASH_LENGTH]}
+
+    suffix = path.suffix.lower()
+    try:
+        if suffix == ".wav":
+            samples, rate = wav_timing(path)
+        elif suffix in (".opus", ".mp3") and info["bytes"]:
+            with mapped(path) as data:
+                samples, rate = (opus_timing if suffix == ".opus" else mp3_timing)(data)
+        else:
+            return info
+    except (OSError, EOFError, ValueError, struct.error, IndexError, wave.Error):
+        return info
+    info["durationMs"] = round(samples * 1000 / rate) if rate else 0
+    info["sampleRate"] = rate
+    return info
+
+
+def entry_files(entry: dict) -> list[str]:
+    """Every asset URL of a manifest entry."""
+    urls = []
+
+    def walk(value) -> None:
+        if isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, str) and value.startswith("/") and "/" in value[1:]:
+            urls.append(value)
+
+    for key, value in entry.items():
+        if key not in SKIPPED_FIELDS:
+            walk(value)
+    return urls
+
+
+def media_tree(entry: dict, infos: dict[str, dict]) -> dict:
+    """
+    The entry's asset URLs replaced by their info from `infos` ({url:
+    info}), in the entry's own layout, e.g. {"audioWord": {...},
+    "imageSrcset": {"webp": {"512": {...}}}}. URLs without info are left out.
+    """
+    def walk(value):
+        if isinstance(value, dict):
+            tree = {key: walk(item) for key, item in value.items()}
+            return {key: item for key, item in tree.items() if item is not None} or None
+        if isinstance(value, str):
+            return infos.get(value)
+        return None
+
+    tree = {key: walk(value) for key, value in entry.items() if key not in SKIPPED_FIELDS}
+    return {key: value for key, value in tree.items() if value is not None}
+
+
+def preload_order(words: list[dict], first: int = PRELOAD_WORDS) -> list[dict]:
+    """
+    A week's assets in the order the client should prefetch them: the
+    first `first` words' audio, then their images, then the same for the
+    remaining words. Items are {"word", "asset"}; the client picks the
+    variant it plays or shows and looks up its size in the entry's media.
+    """
+    order = []
+    for group in (words[:first], words[first:]):
+        for assets in (PRELOAD_AUDIO, PRELOAD_IMAGES):
+            for entry in group:
+                order.extend({"word": entry["text"], "asset": asset} for asset in assets if entry.get(asset))
+    return order
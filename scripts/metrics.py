@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Run instrumentation for the Dictée asset generator.
+
+Stages (sentence, audioWord, audioSentence, image, post-processing, ...) are
+recorded as timed spans, and every API call through the rate limiter as a
+call record with its latency, bytes returned, retries and time spent
+sleeping. At the end of a run, summary() gives counts and p50/p95 per stage
+and per model. write_trace() exports every span and call either as JSON
+lines or as a Chrome trace (load it in chrome://tracing or Perfetto) to see
+the run as a timeline, one row per worker thread.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Metrics:
+    """Thread-safe collector of spans and API call records."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.spans: list[dict] = []
+        self.calls: list[dict] = []
+
+    def now(self) -> float:
+        """Seconds since the collector was created."""
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **args):
+        """Time the enclosed block as one span."""
+        start = self.now()
+        try:
+            yield
+        finally:
+            record = {
+                "name": name,
+                "cat": category,
+                "start": start,
+                "duration": self.now() - start,
+                "thread": threading.current_thread().name,
+                "args": args,
+            }
+            with self.lock:
+                self.spans.append(record)
+
+    def wrap(self, fn, name: str, category: str = "stage", **args):
+        """fn wrapped in a span, for handing to an executor."""
+        def timed(*fn_args, **fn_kwargs):
+            with self.span(name, category, **args):
+                return fn(*fn_args, **fn_kwargs)
+        return timed
+
+    def word_timings(self, names: tuple[str, ...]) -> dict[tuple[str, str], float]:
+        """{(word, stage): seconds} of the per-word spans named in `names`."""
+        with self.lock:
+            return {
+                (span["args"]["word"], span["name"]): span["duration"]
+                for span in self.spans
+                if span["name"] in names and "word" in span["args"]
+            }
+
+    def record_call(self, model: str, latency: float, size: int = 0, retries: int = 0, waited: float = 0.0, error: str | None = None) -> None:
+        """Record one API call (including its retries) that just returned."""
+        record = {
+            "model": model,
+            "start": self.now() - latency,
+            "latency": latency,
+            "bytes": size,
+            "retries": retries,
+            "waited": waited,
+            "error": error,
+            "thread": threading.current_thread().name,
+        }
+        with self.lock:
+            self.calls.append(record)
+
+    def summary(self) -> list[str]:
+        """One line per stage and per model, with p50/p95 in seconds."""
+        with self.lock:
+            spans = list(self.spans)
+            calls = list(self.calls)
+
+        lines = []
+        stages = {}
+        for span in spans:
+            stages.setdefault(span["name"], []).append(span["duration"])
+        for name, durations in stages.items():
+            lines.append(
+                f"{name}: {len(durations)}x, {sum(durations):.1f}s total, "
+                f"p50 {percentile(durations, 0.5):.2f}s, p95 {percentile(durations, 0.95):.2f}s"
+            )
+
+        models = {}
+        for call in calls:
+            models.setdefault(call["model"], []).append(call)
+        for model, records in models.items():
+            latencies = [r["latency"] for r in records]
+            errors = sum(1 for r in records if r["error"])
+            lines.append(
+                f"{model}: {len(records)} calls, p50 {percentile(latencies, 0.5):.2f}s, "
+                f"p95 {percentile(latencies, 0.95):.2f}s, {sum(r['bytes'] for r in records) / 1024:.0f} KB, "
+                f"{sum(r['retries'] for r in records)} retries, {sum(r['waited'] for r in records):.1f}s sleeping"
+                + (f", {errors} failed" if errors else "")
+            )
+        return lines
+
+    def write_trace(self, path: Path) -> None:
+        """
+        Export spans and calls: a .json path gets the Chrome trace event
+        format, anything else one JSON object per line.
+        """
+        path = Path(path)
+        with self.lock:
+            spans = list(self.spans)
+            calls = list(self.calls)
+
+        if path.suffix == ".json":
+            threads = {}
+            events = []
+            for span in spans:
+                events.append({
+                    "name": span["name"], "cat": span["cat"], "ph": "X",
+                    "ts": span["start"] * 1e6, "dur": span["duration"] * 1e6,
+                    "pid": os.getpid(), "tid": threads.setdefault(span["thread"], len(threads)),
+                    "args": span["args"],
+                })
+            for call in calls:
+                events.append({
+                    "name": call["model"], "cat": "api", "ph": "X",
+                    "ts": call["start"] * 1e6, "dur": call["latency"] * 1e6,
+                    "pid": os.getpid(), "tid": threads.setdefault(call["thread"], len(threads)),
+                    "args": {key: call[key] for key in ("bytes", "retries", "waited", "error")},
+                })
+            events.extend(
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for name, tid in threads.items()
+            )
+            text = json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, ensure_ascii=False)
+        else:
+            records = [{"type": "span", **span} for span in spans] + [{"type": "call", **call} for call in calls]
+            records.sort(key=lambda record: record["start"])
+            text = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
@@ -1,34 +1,208 @@
 #!/usr/bin/env python3
+"""
+Turn a CSV word bank (Group,Word rows, see en_word_list.csv) into one
+public/<Group>/words_of_week.txt per group, for generate_assets.py.
 
-# A simple script to turn a csv file that has word sounds + word and
-# creates a directory + word of week file to be used for generation.
+Rows are streamed into a staging file per group as they are read, so a
+multi-grade bank is never held in memory, and a group's rows don't have to
+be contiguous. Each group is then diffed against its words_of_week.txt and
+manifest.json: the file is only rewritten when the word list changed (so
+unchanged weeks keep their mtime), and the words added, removed and still
+without assets are reported.
 
-# Refer to en_word_list.csv
+With --generate, the groups that changed or have words without assets are
+then generated as one job (`generate --weeks ...`). Words that already
+have their assets are skipped by the generator without any API call, so
+only the added words cost anything.
 
+Usage:
+    python parse_en_wordlist.py                          # en_word_list.csv
+    python parse_en_wordlist.py grades_1-5.csv --dry-run
+    python parse_en_wordlist.py --generate -- --concurrency 8
+"""
+
+import argparse
 import csv
+import json
 import os
+import sys
+import tempfile
+from pathlib import Path
+
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_CSV = SCRIPT_DIR / "en_word_list.csv"
+DEFAULT_PUBLIC_DIR = SCRIPT_DIR.parent / "public"
+WORDS_NAME = "words_of_week.txt"
+
+
+def group_path(group: str) -> str:
+    """Week directory of a CSV group ("Short a" -> "Short_a")."""
+    return group.strip().replace(" ", "_")
+
+
+def stage_groups(csv_file: Path, staging_dir: Path) -> list[str]:
+    """
+    Stream the CSV's rows into staging_dir/<week path>, one word per line
+    in row order. Returns the week paths in order of first appearance.
+    """
+    paths = {}
+    current, handle = None, None
+    try:
+        with open(csv_file, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                group = (row.get("Group") or "").strip()
+                word = (row.get("Word") or "").strip()
+                if not group or not word:
+                    continue
+                path = group_path(group)
+                if path != current:
+                    # Rows normally come grouped; a group seen again is appended to
+                    if handle:
+                        handle.close()
+                    handle = open(staging_dir / path, "a", encoding="utf-8")
+                    current = path
+                    paths.setdefault(path, group)
+                handle.write(word + "\n")
+    finally:
+        if handle:
+            handle.close()
+    return list(paths)
+
+
+def read_lines(path: Path) -> list[str]:
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def manifest_words(manifest_file: Path) -> set[str]:
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            return {entry["text"] for entry in json.load(f).get("words", [])}
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return set()
+
+
+def diff_group(words: list[str], week_dir: Path) -> dict:
+    """
+    Compare a group's words with its week's words_of_week.txt and
+    manifest.json: {"changed", "added", "removed", "pending" (words without
+    a manifest entry)}.
+    """
+    current = read_lines(week_dir / WORDS_NAME)
+    known = {word.lower() for word in current}
+    listed = {word.lower() for word in words}
+    generated = manifest_words(week_dir / "manifest.json")
+    return {
+        "changed": words != current,
+        "added": [word for word in dict.fromkeys(words) if word.lower() not in known],
+        "removed": [word for word in dict.fromkeys(current) if word.lower() not in listed],
+        "pending": [word for word in dict.fromkeys(words) if word not in generated],
+    }
+
+
+def write_words(words_file: Path, words: list[str]) -> None:
+    """Atomically replace words_file with one word per line."""
+    words_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = words_file.with_name(f".{words_file.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("".join(word + "\n" for word in words))
+    os.replace(tmp_path, words_file)
+
+
+def ingest(csv_file: Path, public_dir: Path, dry_run: bool = False) -> list[str]:
+    """
+    Update public/<Group>/words_of_week.txt from csv_file, one group in
+    memory at a time. Returns the week paths that need generating (changed,
+    or with words that have no assets yet).
+    """
+    queue = []
+    changed = unchanged = 0
+    with tempfile.TemporaryDirectory(prefix="dictee-words-") as staging:
+        staging_dir = Path(staging)
+        for path in stage_groups(csv_file, staging_dir):
+            words = read_lines(staging_dir / path)
+            week_dir = public_dir / path
+            diff = diff_group(words, week_dir)
+
+            if diff["changed"]:
+                changed += 1
+                if not dry_run:
+                    write_words(week_dir / WORDS_NAME, words)
+                print(f"{path}: {len(words)} words, +{len(diff['added'])} -{len(diff['removed'])}"
+                      f"{'' if dry_run else f' (wrote {WORDS_NAME})'}")
+                for word in diff["added"]:
+                    print(f"  + {word}")
+                for word in diff["removed"]:
+                    print(f"  - {word}")
+            else:
+                unchanged += 1
+                print(f"{path}: {len(words)} words, unchanged")
+
+            waiting = [word for word in diff["pending"] if word not in diff["added"]]
+            if waiting:
+                print(f"  {len(waiting)} more word(s) without assets: {', '.join(waiting)}")
+            if diff["changed"] or diff["pending"]:
+                queue.append(path)
+
+    print(f"{changed} group(s) {'would change' if dry_run else 'changed'}, {unchanged} unchanged, {len(queue)} to generate")
+    return queue
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Write public/<Group>/words_of_week.txt from a Group,Word CSV, rewriting only changed groups",
+        epilog="With --generate, arguments after `--` are passed to `generate_assets.py generate`, e.g. -- --concurrency 8",
+    )
+    parser.add_argument(
+        "csv",
+        nargs="?",
+        type=Path,
+        default=DEFAULT_CSV,
+        help=f"Word bank with Group and Word columns (default: {DEFAULT_CSV.name})"
+    )
+    parser.add_argument(
+        "--public-dir",
+        type=Path,
+        default=DEFAULT_PUBLIC_DIR,
+        help="Directory holding the week folders (default: the app's public/)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would change without writing anything"
+    )
+    parser.add_argument(
+        "--generate",
+        action="store_true",
+        help="Then generate assets for the groups that changed or have words without assets"
+    )
+    parser.add_argument(
+        "--language",
+        default="en",
+        help="Language of the generated sentences and audio (default: en)"
+    )
+    argv = sys.argv[1:] if argv is None else argv
+    generate_args = []
+    if "--" in argv:
+        generate_args = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+
+    queue = ingest(args.csv, args.public_dir, dry_run=args.dry_run)
+    if not args.generate or args.dry_run or not queue:
+        return 0
+
+    import generate_assets as ga
+
+    ga.PUBLIC_DIR = args.public_dir
+    ga.METADATA_FILE = args.public_dir / "metadata.yaml"
+    print()
+    ga.main(["generate", "--weeks", ",".join(queue), "--language", args.language, *generate_args])
+    return 0
+
 
-word_data = {}
-
-with open('en_word_list.csv', mode='r') as file:
-    reader = csv.DictReader(file)
-    for row in reader:
-        group = row['Group']
-        word = row['Word']
-        if group not in word_data:
-            word_data[group] = []
-        word_data[group].append(word)
-
-for k in word_data.keys():
-    clean = k.replace(' ','_')
-
-    new_dir = os.path.join('..','public', clean)
-    if not os.path.isdir(new_dir):
-        os.mkdir(new_dir)
-    wow = os.path.join(new_dir,'words_of_week.txt')
-            
-    print(f'Writing words of the week for {k} in {wow}')
-    with open(wow, 'w+') as fh:
-        for word in word_data[k]:
-            fh.write(word +'\n')
-    
+if __name__ == "__main__":
+    sys.exit(main())
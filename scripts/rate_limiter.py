@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Per-model rate limiting for the Dictée asset generator.
+
+Each model (text, speech, image) gets its own token bucket. Calls go through
+RateLimiter.call(), which waits for a token, retries quota errors (HTTP 429 /
+RESOURCE_EXHAUSTED) with jittered exponential backoff, and adapts the bucket's
+rate to observed throttling: the rate is halved when the API pushes back and
+creeps back up towards the configured ceiling on every success (AIMD).
+
+An optional observer is told about every call once it returns or gives up,
+with its latency, the time spent waiting for tokens or backing off, and the
+number of retries. Retry messages go through an injectable `log` function,
+so they don't interleave with the caller's own output.
+"""
+
+import random
+import re
+import threading
+import time
+
+
+# Retry policy for quota errors
+MAX_RETRIES = 6
+BACKOFF_BASE = 2.0   # seconds, doubled on each retry
+BACKOFF_CAP = 60.0   # never sleep longer than this between retries
+
+# Adaptive rate control
+DECREASE_FACTOR = 0.5    # multiply rate by this when throttled
+INCREASE_FRACTION = 0.1  # add this fraction of the ceiling on success
+MIN_RATE_FRACTION = 1 / 16  # never drop below this fraction of the ceiling
+
+
+# Quota errors without a status code, recognized by their message: a
+# leading status ("429 RESOURCE_EXHAUSTED. ..."), never a 429 anywhere
+QUOTA_MESSAGE = re.compile(r"^\s*429\b|\b429 Too Many Requests\b|\bRESOURCE_EXHAUSTED\b|\bQuota exceeded\b")
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Return True if the exception is a 429 / quota exhaustion."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code is not None:
+        return code == 429
+    if getattr(error, "status", None) == "RESOURCE_EXHAUSTED":
+        return True
+    return QUOTA_MESSAGE.search(str(error)) is not None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket measured in requests per minute.
+
+    A rate of None or <= 0 disables limiting for the bucket. The current rate
+    adapts between MIN_RATE_FRACTION * max_rpm and max_rpm.
+    """
+
+    def __init__(self, name: str, max_rpm: float | None, burst: int = 1):
+        self.name = name
+        self.max_rpm = max_rpm if max_rpm and max_rpm > 0 else None
+        self.rpm = self.max_rpm
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+
+        # Counters for the end-of-run summary
+        self.calls = 0
+        self.throttled = 0
+        self.retries = 0
+        self.wait_time = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.updated = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rpm / 60)
+
+    def acquire(self) -> float:
+        """Block until a request may be sent. Returns the seconds waited."""
+        if self.max_rpm is None:
+            with self.lock:
+                self.calls += 1
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.calls += 1
+                    self.wait_time += waited
+                    return waited
+                wait = (1 - self.tokens) * 60 / self.rpm
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self) -> None:
+        """Additive increase back towards the configured ceiling."""
+        if self.max_rpm is None:
+            return
+        with self.lock:
+            self.rpm = min(self.max_rpm, self.rpm + self.max_rpm * INCREASE_FRACTION)
+
+    def on_throttled(self) -> None:
+        """Multiplicative decrease, once per burst of 429s."""
+        with self.lock:
+            self.throttled += 1
+            if self.max_rpm is None:
+                return
+            now = time.monotonic()
+            # Concurrent requests tend to fail together; only back off once
+            # per request interval so one burst doesn't collapse the rate.
+            if now - self.last_decrease < 60 / self.rpm:
+                return
+            self.last_decrease = now
+            self.rpm = max(self.max_rpm * MIN_RATE_FRACTION, self.rpm * DECREASE_FACTOR)
+            self._refill(now)
+            self.tokens = 0.0
+
+    def describe(self) -> str:
+        if self.max_rpm is None:
+            return "unlimited"
+        if self.rpm < self.max_rpm:
+            return f"{self.max_rpm:g} rpm (adapted to {self.rpm:.1f})"
+        return f"{self.max_rpm:g} rpm"
+
+
+class RateLimiter:
+    """A set of token buckets, one per model name."""
+
+    def __init__(self, limits: dict[str, float | None] | None = None, observer=None, log=None):
+        self.buckets: dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+        # observer(model, result, error, latency, waited, retries)
+        self.observer = observer
+        # log(message), for retry notices
+        self.log = log or (lambda message: print(message, flush=True))
+        self.configure(limits or {})
+
+    def configure(self, limits: dict[str, float | None]) -> None:
+        """(Re)create buckets for the given {model: requests per minute}."""
+        with self.lock:
+            for model, rpm in limits.items():
+                self.buckets[model] = TokenBucket(model, rpm)
+
+    def bucket(self, model: str) -> TokenBucket:
+        with self.lock:
+            if model not in self.buckets:
+                self.buckets[model] = TokenBucket(model, None)
+            return self.buckets[model]
+
+    def call(self, model: str, fn, /, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs) under the model's bucket.
+
+        `model` and `fn` are positional-only so the wrapped API call can
+        still take its own `model=` keyword.
+
+        Quota errors are retried with full-jitter exponential backoff up to
+        MAX_RETRIES times; any other exception propagates immediately.
+        """
+        bucket = self.bucket(model)
+        waited = 0.0
+        for attempt in range(MAX_RETRIES + 1):
+            waited += bucket.acquire()
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_quota_error(e) or attempt == MAX_RETRIES:
+                    self._observe(model, None, e, started, waited, attempt)
+                    raise
+                bucket.on_throttled()
+                delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+                self.log(f"    Quota hit on {model}, retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+                with bucket.lock:
+                    bucket.retries += 1
+                    bucket.wait_time += delay
+                time.sleep(delay)
+                waited += delay
+                continue
+            bucket.on_success()
+            self._observe(model, result, None, started, waited, attempt)
+            return result
+
+    def _observe(self, model: str, result, error: Exception | None, started: float, waited: float, retries: int) -> None:
+        """Report a finished call; latency is that of the last attempt."""
+        if self.observer is not None:
+            self.observer(model, result, error, time.perf_counter() - started, waited, retries)
+
+    def summary(self) -> list[str]:
+        """One line per bucket that was used."""
+        lines = []
+        for model, bucket in self.buckets.items():
+            if not bucket.calls:
+                continue
+            lines.append(
+                f"{model}: {bucket.calls} calls, {bucket.throttled} throttled, "
+                f"{bucket.retries} retries, {bucket.wait_time:.1f}s waiting ({bucket.describe()})"
+            )
+        return lines
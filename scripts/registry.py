@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+SQLite registry of everything the Dictée asset generator has produced.
+
+metadata.yaml and each week's manifest.json used to be the only state: the
+generator read and rewrote them whole, so two runs at once could lose each
+other's updates, and "what is missing everywhere" meant opening every
+manifest and stat-ing every file. The registry keeps the same information
+in one database (.asset_registry.sqlite next to public/):
+
+    metadata   the metadata.yaml week entries, in file order (other
+               top-level keys are kept in `settings`)
+    weeks      one row per week directory: manifest generatedAt and
+               top-level extras (sprite)
+    words      one row per manifest entry, in words_of_week.txt order
+    assets     one row per word and asset (sentence, audioWord,
+               audioSentence, image): present or not, URL, input hash
+               (provenance), content hash, size and generation time
+    media      size, content hash and audio timing of every file a
+               manifest references, by URL, with the size and mtime they
+               were read at (so unchanged files are never read again)
+
+manifest.json and metadata.yaml become exports: every write goes to the
+database first, in a write transaction (WAL mode, BEGIN IMMEDIATE, so
+concurrent processes and threads queue instead of clobbering each other),
+and the file is regenerated from the rows before the transaction commits.
+Files edited by hand are picked up: each export's size and mtime are
+recorded, and a file that no longer matches is imported again before use.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from media import describe_file
+
+
+REGISTRY_NAME = ".asset_registry.sqlite"
+BUSY_TIMEOUT = 60.0  # seconds a writer waits for another one to commit
+
+# Assets tracked per word; the sentence has no file
+ASSETS = ("sentence", "audioWord", "audioSentence", "image")
+
+# metadata.yaml entry fields with a column of their own
+METADATA_FIELDS = ("sounds", "path", "week_start", "week_end", "date_of_generation", "source", "language")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    position INTEGER PRIMARY KEY,
+    sounds TEXT,
+    path TEXT,
+    week_start TEXT,
+    week_end TEXT,
+    date_of_generation TEXT,
+    source TEXT,
+    language TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS settings (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS weeks (
+    path TEXT PRIMARY KEY,
+    generated_at TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS words (
+    week TEXT NOT NULL REFERENCES weeks(path) ON DELETE CASCADE,
+    text TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    sentence TEXT,
+    entry TEXT NOT NULL,
+    PRIMARY KEY (week, text)
+);
+CREATE TABLE IF NOT EXISTS assets (
+    week TEXT NOT NULL,
+    word TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    present INTEGER NOT NULL,
+    url TEXT,
+    input_hash TEXT,
+    content_hash TEXT,
+    bytes INTEGER,
+    mtime_ns INTEGER,
+    seconds REAL,
+    updated_at TEXT,
+    PRIMARY KEY (week, word, asset),
+    FOREIGN KEY (week, word) REFERENCES words(week, text) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS assets_missing ON assets(present, asset);
+CREATE TABLE IF NOT EXISTS media (
+    url TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    info TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exports (
+    file TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+def write_file(path: Path, data: bytes) -> None:
+    """Atomically replace path with data."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def file_digest(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()[:16]
+
+
+def render_manifest(manifest: dict) -> bytes:
+    return json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def render_metadata(metadata: dict) -> bytes:
+    import yaml
+
+    return yaml.dump(metadata, default_flow_style=False, allow_unicode=True).encode("utf-8")
+
+
+def read_metadata(metadata_file: Path) -> dict:
+    """metadata.yaml as written, with `dictee` as a list of week entries."""
+    import yaml
+
+    if not metadata_file.exists():
+        return {"dictee": []}
+    with open(metadata_file, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f) or {}
+    weeks = raw.get("dictee", [])
+    if not isinstance(weeks, list):
+        # Backward compat: convert old single-object format
+        weeks = [weeks] if weeks else []
+    return {**raw, "dictee": weeks}
+
+
+def exported_metadata(metadata_file: Path) -> dict:
+    """read_metadata() as the registry would return it once imported (fields as strings)."""
+    raw = json.loads(json.dumps(read_metadata(metadata_file), ensure_ascii=False, default=str))
+    raw["dictee"] = [
+        {
+            key: str(value) if key in METADATA_FIELDS else value
+            for key, value in entry.items()
+            if value is not None or key not in METADATA_FIELDS
+        }
+        for entry in raw["dictee"]
+    ]
+    return raw
+
+
+class AssetRegistry:
+    """
+    The registry database of one public/ directory; safe to share between
+    threads and processes.
+    """
+
+    def __init__(self, path: Path, public_dir: Path, readonly: bool = False):
+        self.path = Path(path)
+        self.public_dir = Path(public_dir)
+        self.local = threading.local()
+        # Read-only (plan, status): never create the database or write a row;
+        # without a database yet, metadata comes straight from metadata.yaml
+        self.readonly = readonly
+        self.empty = readonly and not self.path.exists()
+        public_dir = str(Path(public_dir).resolve())
+        if self.empty:
+            return
+        if readonly:
+            row = self.connect().execute("SELECT value FROM settings WHERE name = 'public_dir'").fetchone()
+            owner = row["value"] if row else public_dir
+        else:
+            self.connect().executescript(SCHEMA)
+
+            # Week paths are only unique within one public/ directory
+            with self.transaction() as db:
+                db.execute("INSERT OR IGNORE INTO settings (name, value) VALUES ('public_dir', ?)", (public_dir,))
+                owner = db.execute("SELECT value FROM settings WHERE name = 'public_dir'").fetchone()["value"]
+        if owner != public_dir:
+            raise ValueError(f"{self.path} is the registry of {owner}, not {public_dir} (set DICTEE_REGISTRY)")
+
+    def connect(self) -> sqlite3.Connection:
+        """This thread's connection (sqlite3 connections can't be shared)."""
+        db = getattr(self.local, "db", None)
+        if db is None:
+            if self.readonly:
+                db = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, timeout=BUSY_TIMEOUT, isolation_level=None)
+            else:
+                db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA foreign_keys=ON")
+            self.local.db = db
+        return db
+
+    @contextmanager
+    def transaction(self):
+        """A write transaction; other writers wait until it commits."""
+        db = self.connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    # Export bookkeeping
+
+    def _edited(self, db: sqlite3.Connection, path: Path) -> bool:
+        """True if the file exists and isn't the last export (or import) we recorded."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return False
+        row = db.execute("SELECT size, mtime_ns FROM exports WHERE file = ?", (str(path.resolve()),)).fetchone()
+        return row is None or (row["size"], row["mtime_ns"]) != (st.st_size, st.st_mtime_ns)
+
+    def _stamp(self, db: sqlite3.Connection, path: Path) -> None:
+        st = path.stat()
+        db.execute(
+            "INSERT OR REPLACE INTO exports (file, size, mtime_ns) VALUES (?, ?, ?)",
+            (str(path.resolve()), st.st_size, st.st_mtime_ns),
+        )
+
+    def _export(self, db: sqlite3.Connection, path: Path, data: bytes) -> None:
+        write_file(path, data)
+        self._stamp(db, path)
+
+    # metadata.yaml
+
+    def _import_metadata(self, db: sqlite3.Connection, metadata_file: Path) -> None:
+        raw = read_metadata(metadata_file)
+        db.execute("DELETE FROM metadata")
+        for position, entry in enumerate(raw["dictee"]):
+            self._insert_metadata(db, position, entry)
+        extra = {key: value for key, value in raw.items() if key != "dictee"}
+        db.execute(
+            "INSERT OR REPLACE INTO settings (name, value) VALUES ('metadata_extra', ?)",
+            (json.dumps(extra, ensure_ascii=False, default=str),),
+        )
+        self._stamp(db, metadata_file)
+
+    def _insert_metadata(self, db: sqlite3.Connection, position: int, entry: dict) -> None:
+        values = [None if entry.get(field) is None else str(entry[field]) for field in METADATA_FIELDS]
+        extra = {key: value for key, value in entry.items() if key not in METADATA_FIELDS}
+        db.execute(
+            f"INSERT OR REPLACE INTO metadata (position, {', '.join(METADATA_FIELDS)}, extra) "
+            f"VALUES (?, {', '.join('?' * len(METADATA_FIELDS))}, ?)",
+            (position, *values, json.dumps(extra, ensure_ascii=False, default=str)),
+        )
+
+    def _metadata(self, db: sqlite3.Connection) -> dict:
+        entries = []
+        for row in db.execute("SELECT * FROM metadata ORDER BY position"):
+            entry = {field: row[field] for field in METADATA_FIELDS if row[field] is not None}
+            entry.update(json.loads(row["extra"]))
+            entries.append(entry)
+        row = db.execute("SELECT value FROM settings WHERE name = 'metadata_extra'").fetchone()
+        extra = json.loads(row["value"]) if row else {}
+        return {**extra, "dictee": entries}
+
+    def metadata(self, metadata_file: Path) -> dict:
+        """metadata.yaml's content, with `dictee` as a list of week entries."""
+        if self.readonly:
+            if self.empty or self._edited(self.connect(), metadata_file):
+                return exported_metadata(metadata_file)
+            return self._metadata(self.connect())
+        with self.transaction() as db:
+            if self._edited(db, metadata_file):
+                self._import_metadata(db, metadata_file)
+            return self._metadata(db)
+
+    def update_metadata(self, metadata_file: Path, entries: list[dict]) -> list[bool | None]:
+        """
+        Replace the entries with the same sounds and week_start, append the
+        others, and export metadata.yaml if anything changed. Returns, per
+        entry, whether it replaced an existing one (None: it was identical).
+        """
+        replaced = []
+        with self.transaction() as db:
+            if self._edited(db, metadata_file):
+                self._import_metadata(db, metadata_file)
+            for entry in entries:
+                row = db.execute(
+                    "SELECT * FROM metadata WHERE sounds IS ? AND week_start IS ? ORDER BY position LIMIT 1",
+                    (entry.get("sounds"), entry.get("week_start")),
+                ).fetchone()
+                if row is not None:
+                    position = row["position"]
+                    if all(row[field] == (None if entry.get(field) is None else str(entry[field])) for field in METADATA_FIELDS):
+                        replaced.append(None)
+                        continue
+                else:
+                    position = db.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM metadata").fetchone()[0]
+                self._insert_metadata(db, position, entry)
+                replaced.append(row is not None)
+            if any(was is not None for was in replaced) or not metadata_file.exists():
+                self._export(db, metadata_file, render_metadata(self._metadata(db)))
+        return replaced
+
+    # manifest.json
+
+    def _save_manifest(self, db: sqlite3.Connection, manifest_file: Path, manifest: dict) -> None:
+        week = manifest_file.parent.name
+        public_dir = manifest_file.parent.parent
+        words = manifest.get("words", [])
+        extra = {key: value for key, value in manifest.items() if key not in ("generatedAt", "words")}
+        db.execute(
+            "INSERT INTO weeks (path, generated_at, extra) VALUES (?, ?, ?) "
+            "ON CONFLICT (path) DO UPDATE SET generated_at = excluded.generated_at, extra = excluded.extra",
+            (week, manifest.get("generatedAt"), json.dumps(extra, ensure_ascii=False)),
+        )
+
+        texts = [entry["text"] for entry in words]
+        db.execute(
+            f"DELETE FROM words WHERE week = ? AND text NOT IN ({', '.join('?' * len(texts))})",
+            (week, *texts),
+        )
+        now = datetime.now().isoformat(timespec="seconds")
+        for position, entry in enumerate(words):
+            db.execute(
+                "INSERT INTO words (week, text, position, sentence, entry) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (week, text) DO UPDATE SET position = excluded.position, "
+                "sentence = excluded.sentence, entry = excluded.entry",
+                (week, entry["text"], position, entry.get("sentence"), json.dumps(entry, ensure_ascii=False)),
+            )
+            provenance = entry.get("provenance", {})
+            known = {
+                row["asset"]: row
+                for row in db.execute("SELECT * FROM assets WHERE week = ? AND word = ?", (week, entry["text"]))
+            }
+            for asset in ASSETS:
+                url = entry.get(asset) if asset != "sentence" else None
+                content_hash = size = mtime_ns = None
+                present = bool(entry.get(asset))
+                if url:
+                    path = public_dir / url.lstrip("/")
+                    try:
+                        st = path.stat()
+                    except FileNotFoundError:
+                        present = False
+                    else:
+                        size, mtime_ns = st.st_size, st.st_mtime_ns
+                        row = known.get(asset)
+                        if row is not None and (row["bytes"], row["mtime_ns"]) == (size, mtime_ns) and row["content_hash"]:
+                            content_hash = row["content_hash"]
+                        else:
+                            content_hash = file_digest(path)
+                elif asset == "sentence" and present:
+                    content_hash = text_digest(entry[asset])
+                db.execute(
+                    "INSERT INTO assets (week, word, asset, present, url, input_hash, content_hash, bytes, mtime_ns, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (week, word, asset) DO UPDATE SET present = excluded.present, url = excluded.url, "
+                    "input_hash = excluded.input_hash, content_hash = excluded.content_hash, bytes = excluded.bytes, "
+                    "mtime_ns = excluded.mtime_ns, "
+                    "updated_at = CASE WHEN assets.content_hash IS excluded.content_hash THEN assets.updated_at ELSE excluded.updated_at END",
+                    (week, entry["text"], asset, int(present), url, provenance.get(asset), content_hash, size, mtime_ns, now),
+                )
+
+    def _manifest(self, db: sqlite3.Connection, week: str) -> dict:
+        row = db.execute("SELECT generated_at, extra FROM weeks WHERE path = ?", (week,)).fetchone()
+        words = [
+            json.loads(word["entry"])
+            for word in db.execute("SELECT entry FROM words WHERE week = ? ORDER BY position", (week,))
+        ]
+        return {"generatedAt": row["generated_at"], "words": words, **json.loads(row["extra"])}
+
+    def save_manifest(self, manifest_file: Path, manifest: dict, removed=()) -> None:
+        """
+        Record a week's manifest and export manifest.json from the registry.
+
+        Words are merged, not replaced: entries the registry has that
+        `manifest` lacks (another run added them since this one read the
+        week) are kept after its own, unless listed in `removed`. A result
+        identical to the last export apart from generatedAt is left alone,
+        file included.
+        """
+        week = manifest_file.parent.name
+        with self.transaction() as db:
+            if db.execute("SELECT 1 FROM weeks WHERE path = ?", (week,)).fetchone():
+                current = self._manifest(db, week)
+                listed = {entry["text"] for entry in manifest.get("words", [])}
+                others = [entry for entry in current["words"] if entry["text"] not in listed and entry["text"] not in removed]
+                manifest = {**manifest, "words": [*manifest.get("words", []), *others]}
+                if manifest_file.exists() and not self._edited(db, manifest_file) and (
+                    {**current, "generatedAt": None} == json.loads(render_manifest({**manifest, "generatedAt": None}))
+                ):
+                    return
+            self._save_manifest(db, manifest_file, manifest)
+            self._export(db, manifest_file, render_manifest(self._manifest(db, manifest_file.parent.name)))
+
+    def sync_manifest(self, manifest_file: Path) -> None:
+        """Import manifest.json if it was written or edited outside the registry."""
+        if self.readonly:
+            return
+        with self.transaction() as db:
+            if not self._edited(db, manifest_file):
+                return
+            try:
+                with open(manifest_file, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except json.JSONDecodeError:
+                return
+            self._save_manifest(db, manifest_file, manifest)
+            self._stamp(db, manifest_file)
+
+    def describe_files(self, urls: list[str]) -> dict[str, dict]:
+        """
+        media.describe_file() of every URL's file that exists, reading only
+        files that are new or changed since they were last described.
+        """
+        infos = {}
+        stale = {}
+        db = self.connect()
+        for url in dict.fromkeys(urls):
+            try:
+                st = (self.public_dir / url.lstrip("/")).stat()
+            except FileNotFoundError:
+                continue
+            row = db.execute("SELECT bytes, mtime_ns, info FROM media WHERE url = ?", (url,)).fetchone()
+            if row is not None and (row["bytes"], row["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                infos[url] = json.loads(row["info"])
+            else:
+                stale[url] = st
+
+        if stale:
+            described = {url: describe_file(self.public_dir / url.lstrip("/")) for url in stale}
+            with self.transaction() as db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO media (url, bytes, mtime_ns, info) VALUES (?, ?, ?, ?)",
+                    [(url, st.st_size, st.st_mtime_ns, json.dumps(described[url])) for url, st in stale.items()],
+                )
+            infos.update(described)
+        return infos
+
+    def record_timings(self, week: str, timings: dict[tuple[str, str], float]) -> None:
+        """Store how long each (word, asset) took to generate in this run."""
+        with self.transaction() as db:
+            db.executemany(
+                "UPDATE assets SET seconds = ? WHERE week = ? AND word = ? AND asset = ?",
+                [(seconds, week, word, asset) for (word, asset), seconds in timings.items()],
+            )
+
+    # Queries
+
+    def status(self) -> list[dict]:
+        """Per week and asset: words, present, bytes and mean generation time."""
+        if self.empty:
+            return []
+        rows = self.connect().execute(
+            "SELECT week, asset, COUNT(*) AS words, SUM(present) AS present, "
+            "COALESCE(SUM(bytes), 0) AS bytes, AVG(seconds) AS seconds "
+            "FROM assets GROUP BY week, asset ORDER BY week, asset"
+        )
+        return [dict(row) for row in rows]
+
+    def missing(self) -> list[tuple[str, str, str]]:
+        """(week, word, asset) of every asset not generated yet, in one indexed query."""
+        if self.empty:
+            return []
+        rows = self.connect().execute(
+            "SELECT assets.week, assets.word, assets.asset FROM assets "
+            "JOIN words ON words.week = assets.week AND words.text = assets.word "
+            "WHERE assets.present = 0 ORDER BY assets.week, words.position, assets.asset"
+        )
+        return [tuple(row) for row in rows]
+
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Offline similarity index for the Dictée game modes.
+
+AudioMatch picked its distractors at random from the current week and
+LettresPerdues blanked random letters unless a common pattern happened to
+match, so most rounds were easy. index_weeks() looks at the words of every
+week of a language at once and works out, for each word:
+
+    confusables  the words closest to it in spelling, best first
+                 (Levenshtein distance for every pair at once, with NumPy)
+    blanks       groups of letter indices to blank, best first: the week's
+                 target graphemes ("gn", "ph", "ez", ...), then the
+                 language's common patterns
+
+The client uses both as they are, with no computation at runtime.
+"""
+
+import re
+
+
+CONFUSABLES = 5  # words kept per entry
+
+# Share of a week's words a token of its `sounds` must appear in to count
+# as a target grapheme ("gn_ph" -> gn, ph; "l_and_r_Blends" -> l, r)
+TARGET_SHARE = 0.25
+TARGET_MAX_LENGTH = 3
+
+# Common letter patterns by language, as in src/utils/wordUtils.ts
+LANGUAGE_PATTERNS = {
+    "fr": ["ou", "on", "ch", "oi", "an", "en", "ai", "au", "eau", "ei", "eu"],
+    "en": ["th", "sh", "ch", "ck", "ee", "oo", "ea", "ou", "igh", "ai", "oa"],
+}
+
+# Pairs compared per NumPy step, to bound memory on large word banks
+BLOCK_PAIRS = 1 << 20
+
+
+def edit_distances(words: list[str]):
+    """
+    Levenshtein distance between every pair of words, as an (n, n) int16
+    array. Each step of the dynamic program runs for a block of pairs at
+    once; the insertion chain along a row becomes a running minimum.
+    """
+    import numpy as np
+
+    n = len(words)
+    width = max((len(word) for word in words), default=0)
+    codes = np.zeros((n, width), dtype=np.int32)
+    for i, word in enumerate(words):
+        codes[i, :len(word)] = [ord(c) for c in word]
+    lengths = np.array([len(word) for word in words], dtype=np.intp)
+    steps = np.arange(width + 1, dtype=np.int16)
+
+    distances = np.empty((n, n), dtype=np.int16)
+    block = max(1, BLOCK_PAIRS // max(n, 1))
+    for start in range(0, n, block):
+        rows = codes[start:start + block]
+        row_lengths = lengths[start:start + block]
+        # prev[p, q, j]: distance from rows[p][:i] to codes[q][:j]
+        prev = np.broadcast_to(steps, (len(rows), n, width + 1)).copy()
+        done = np.empty((len(rows), n), dtype=np.int16)
+        done[row_lengths == 0] = lengths
+        for i in range(1, width + 1):
+            cost = rows[:, None, i - 1, None] != codes[None, :, :]
+            best = np.minimum(prev[..., :-1] + cost, prev[..., 1:] + 1)
+            chain = np.empty_like(prev)
+            chain[..., 0] = i
+            chain[..., 1:] = best - steps[1:]
+            prev = np.minimum.accumulate(chain, axis=2) + steps
+            finished = row_lengths == i
+            if finished.any():
+                done[finished] = np.take_along_axis(prev[finished], lengths[None, :, None], axis=2)[..., 0]
+        distances[start:start + block] = done
+    return distances
+
+
+def confusables(words: list[str], k: int = CONFUSABLES) -> dict[str, list[str]]:
+    """
+    The k words closest in spelling to each word (compared in lower case),
+    by distance, then closeness in length, then alphabetically.
+    """
+    import numpy as np
+
+    texts = list(dict.fromkeys(word.lower() for word in words))
+    if len(texts) < 2:
+        return {word: [] for word in words}
+    spelled = {}
+    for word in words:
+        spelled.setdefault(word.lower(), word)
+
+    distances = edit_distances(texts).astype(np.int64)
+    lengths = np.array([len(text) for text in texts])
+    n = len(texts)
+    rank = np.argsort(np.argsort(texts))
+    keys = (distances * (lengths.max() + 1) + np.abs(lengths[:, None] - lengths[None, :])) * n + rank[None, :]
+    np.fill_diagonal(keys, np.iinfo(np.int64).max)
+
+    k = min(k, n - 1)
+    nearest = np.argpartition(keys, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(keys, nearest, axis=1).argsort(axis=1)
+    nearest = np.take_along_axis(nearest, order, axis=1)
+    by_text = {text: [spelled[texts[j]] for j in row] for text, row in zip(texts, nearest.tolist())}
+    return {word: by_text[word.lower()] for word in words}
+
+
+def target_graphemes(sounds: str, words: list[str]) -> list[str]:
+    """Short tokens of a week's `sounds` that enough of its words contain."""
+    lowered = [word.lower() for word in words]
+    targets = []
+    for token in re.split(r"[\s_\-&/,]+", (sounds or "").lower()):
+        if token and len(token) <= TARGET_MAX_LENGTH and token.isalpha() and token not in targets:
+            share = sum(token in word for word in lowered) / max(len(lowered), 1)
+            if share >= TARGET_SHARE:
+                targets.append(token)
+    return targets
+
+
+def blank_groups(word: str, targets: list[str], language: str) -> list[list[int]]:
+    """
+    Letter indices to blank in `word`, one group per grapheme occurrence,
+    best first: target graphemes anywhere (except the whole word), then
+    common patterns away from the word's first and last letters.
+    """
+    lowered = word.lower()
+    groups = []
+    for graphemes, inner in ((targets, False), (LANGUAGE_PATTERNS.get(language, LANGUAGE_PATTERNS["fr"]), True)):
+        for grapheme in graphemes:
+            for match in re.finditer(f"(?={re.escape(grapheme)})", lowered):
+                start, end = match.start(), match.start() + len(grapheme)
+                if end - start >= len(word) or (inner and (start == 0 or end >= len(word))):
+                    continue
+                group = list(range(start, end))
+                if not any(set(group) & set(other) for other in groups):
+                    groups.append(group)
+    return groups
+
+
+def index_weeks(weeks: list[dict], k: int = CONFUSABLES) -> dict[str, dict[str, dict]]:
+    """
+    Confusables and blanks for every word of `weeks` ([{"path", "sounds",
+    "language", "words"}]), with confusables drawn from every week of the
+    same language. Returns {week path: {word: {"confusables", "blanks"}}}.
+    """
+    index = {}
+    for language in dict.fromkeys(week["language"] for week in weeks):
+        same = [week for week in weeks if week["language"] == language]
+        nearest = confusables([word for week in same for word in week["words"]], k)
+        for week in same:
+            targets = target_graphemes(week["sounds"], week["words"])
+            index[week["path"]] = {
+                word: {"confusables": nearest[word], "blanks": blank_groups(word, targets, language)}
+                for word in week["words"]
+            }
+    return index
@@ -0,0 +1,115 @@
+import os
+
+from asset_cache import AssetCache, cache_key
+
+
+def blob_files(cache: AssetCache) -> list[str]:
+    return sorted(p.name for p in cache.root.rglob("*") if p.is_file())
+
+
+def test_cache_key_depends_on_inputs_only():
+    key = cache_key(model="tts", text="chat", voice="Aoede")
+    assert key == cache_key(voice="Aoede", text="chat", model="tts")
+    assert key != cache_key(model="tts", text="chats", voice="Aoede")
+    assert len(key) == 64
+
+
+def test_miss_then_hit(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    key = cache_key(text="chat")
+    assert cache.get_path(key, ".wav") is None
+    assert cache.get_text(key) is None
+
+    cache.put_text(key, "Le chat dort.")
+    assert cache.get_text(key) == "Le chat dort."
+    assert cache.path(key, ".txt").parent.name == key[:2]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_put_is_atomic_and_tracks_size(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    key = cache_key(text="chat")
+    path = cache.put(key, ".wav", b"x" * 100)
+    assert path.read_bytes() == b"x" * 100
+    cache.put(key, ".wav", b"y" * 40)
+    assert path.read_bytes() == b"y" * 40
+    assert cache.total_bytes == 40
+    # No temporary file left behind, and a new instance sees the same size
+    assert blob_files(cache) == [path.name]
+    assert AssetCache(cache.root).total_bytes == 40
+
+
+def test_materialize_hardlinks_the_blob(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    key = cache_key(text="chat")
+    blob = cache.put(key, ".wav", b"audio")
+    dest = tmp_path / "week" / "audio" / "chat_word.wav"
+    assert cache.materialize(key, ".wav", dest)
+    assert dest.read_bytes() == b"audio"
+    assert os.path.samefile(dest, blob)
+    assert not cache.materialize(cache_key(text="chien"), ".wav", tmp_path / "week" / "chien.wav")
+
+
+def test_link_over_a_link_to_the_same_blob(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    blob = cache.put(cache_key(text="chat"), ".png", b"image")
+    dest = tmp_path / "week" / "chat.png"
+    cache.link(blob, dest)
+    cache.link(blob, dest)
+    assert os.path.samefile(dest, blob)
+    assert sorted(p.name for p in dest.parent.iterdir()) == ["chat.png"]
+    assert blob.stat().st_nlink == 2
+
+
+def test_link_replaces_another_file(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    blob = cache.put(cache_key(text="chat"), ".png", b"new")
+    dest = tmp_path / "chat.png"
+    dest.write_bytes(b"old")
+    cache.link(blob, dest)
+    assert dest.read_bytes() == b"new"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cache", "chat.png"]
+
+
+def test_hit_refreshes_atime_but_keeps_mtime(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    key = cache_key(text="chat")
+    blob = cache.put(key, ".wav", b"audio")
+    os.utime(blob, (1_000_000, 2_000_000))
+    cache.get_path(key, ".wav")
+    st = blob.stat()
+    assert st.st_mtime == 2_000_000
+    assert st.st_atime > 2_000_000
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = AssetCache(tmp_path / "cache", max_bytes=300)
+    keys = [cache_key(text=word) for word in ("a", "b", "c")]
+    for age, key in enumerate(keys):
+        blob = cache.put(key, ".bin", b"x" * 100)
+        os.utime(blob, (1_000_000 + age, 1_000_000 + age))
+
+    # Reading "a" makes "b" the least recently used, even though "a" is older
+    cache.get_path(keys[0], ".bin")
+    cache.put(cache_key(text="d"), ".bin", b"x" * 100)
+
+    assert cache.get_path(keys[1], ".bin") is None
+    assert cache.get_path(keys[0], ".bin") is not None
+    assert cache.total_bytes == 300
+    assert cache.evicted == 1
+
+
+def test_discard_copies_removes_linked_blobs_only(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    linked = cache.put(cache_key(text="chat"), ".wav", b"broken")
+    kept = cache.put(cache_key(text="chien"), ".wav", b"fine")
+    week_file = tmp_path / "chat_word.wav"
+    cache.link(linked, week_file)
+    plain = tmp_path / "copy.wav"
+    plain.write_bytes(b"fine")
+
+    assert cache.discard_copies([week_file, plain]) == 1
+    assert not linked.exists()
+    assert kept.exists()
+    assert week_file.read_bytes() == b"broken"
+    assert cache.total_bytes == len(b"fine")
@@ -0,0 +1,188 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import audio_processing
+from audio_processing import (
+    PEAK_CEILING_DB,
+    TARGET_LOUDNESS_DB,
+    TRIM_PADDING,
+    clean_pcm,
+    clean_wav,
+    encode_wav,
+    read_wav,
+    speed_variant_path,
+    split_at_pause,
+    stretch_wav,
+    time_stretch,
+    variant_path,
+    write_wav,
+)
+
+RATE = 24000
+
+
+def tone(seconds: float, amplitude: float = 0.5):
+    t = np.arange(round(seconds * RATE)) / RATE
+    return amplitude * np.sin(2 * np.pi * 220 * t)
+
+
+def silence(seconds: float):
+    return np.zeros(round(seconds * RATE))
+
+
+def pcm(*parts):
+    return np.round(np.concatenate(parts) * 32767).astype("<i2")
+
+
+def test_split_in_longest_pause():
+    # "word ... sentence", the sentence with a short pause of its own
+    samples = pcm(silence(0.1), tone(0.4), silence(0.6), tone(0.5), silence(0.1), tone(0.5), silence(0.1))
+    cut = split_at_pause(samples, RATE)
+    assert cut is not None
+    assert 0.5 * RATE <= cut <= 1.1 * RATE
+    assert abs(cut - 0.8 * RATE) <= 0.02 * RATE
+
+
+def test_no_split_without_pause():
+    assert split_at_pause(pcm(silence(0.1), tone(1.0), silence(0.1)), RATE) is None
+
+
+def test_no_split_when_pause_is_too_short():
+    assert split_at_pause(pcm(tone(0.4), silence(0.1), tone(0.4)), RATE) is None
+
+
+def test_no_split_between_similar_pauses():
+    # Neither pause is clearly the one between word and sentence
+    samples = pcm(tone(0.4), silence(0.4), tone(0.4), silence(0.35), tone(0.4))
+    assert split_at_pause(samples, RATE) is None
+
+
+def test_no_split_with_too_little_speech_on_one_side():
+    assert split_at_pause(pcm(tone(0.05), silence(0.6), tone(0.8)), RATE) is None
+
+
+def test_silent_or_empty_clip():
+    assert split_at_pause(pcm(silence(1.0)), RATE) is None
+    assert split_at_pause(np.zeros(0, dtype="<i2"), RATE) is None
+
+
+def test_encode_wav_writes_each_format(tmp_path):
+    sf = pytest.importorskip("soundfile")
+    wav = tmp_path / "chat_word.wav"
+    write_wav(wav, pcm(tone(0.6)), RATE)
+
+    variants = encode_wav(wav, ["opus", "mp3"])
+    assert variants == {"opus": tmp_path / "chat_word.opus", "mp3": tmp_path / "chat_word.mp3"}
+    for path in variants.values():
+        assert sf.info(str(path)).duration == pytest.approx(0.6, abs=0.06)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["chat_word.mp3", "chat_word.opus", "chat_word.wav"]
+
+
+def test_encode_wav_keeps_fresh_variants_unless_forced(tmp_path):
+    pytest.importorskip("soundfile")
+    wav = tmp_path / "chat_word.wav"
+    write_wav(wav, pcm(tone(0.3)), RATE)
+    opus = encode_wav(wav, ["opus"])["opus"]
+    os.utime(wav, (1_000_000, 1_000_000))
+
+    written = opus.stat().st_mtime_ns
+    encode_wav(wav, ["opus"])
+    assert opus.stat().st_mtime_ns == written
+    encode_wav(wav, ["opus"], force=True)
+    assert opus.stat().st_mtime_ns != written
+    assert variant_path(wav, "opus") == opus
+
+
+def dbfs(samples) -> float:
+    return 20 * np.log10(np.sqrt(np.mean((np.asarray(samples, dtype=np.float64) / 32768) ** 2)))
+
+
+def test_clean_trims_silence_and_normalizes_loudness():
+    cleaned = clean_pcm(pcm(silence(0.5), tone(0.5, 0.02), silence(0.5)), RATE)
+    assert 0.5 * RATE <= len(cleaned) <= (0.5 + 2 * TRIM_PADDING + 0.02) * RATE
+    speech = cleaned[round(TRIM_PADDING * RATE) + 480:-round(TRIM_PADDING * RATE) - 480]
+    assert dbfs(speech) == pytest.approx(TARGET_LOUDNESS_DB, abs=0.5)
+    # Faded edges: no click at either end
+    assert abs(int(cleaned[0])) < 10 and abs(int(cleaned[-1])) < 10
+
+
+def test_clean_keeps_peaks_under_the_ceiling():
+    loud = tone(0.5, 0.1)
+    loud[RATE // 4] = 0.8
+    cleaned = clean_pcm(pcm(silence(0.2), loud, silence(0.2)), RATE)
+    peak = 20 * np.log10(np.abs(cleaned.astype(np.float64)).max() / 32768)
+    assert peak == pytest.approx(PEAK_CEILING_DB, abs=0.1)
+    assert dbfs(cleaned) < TARGET_LOUDNESS_DB
+
+
+def test_clean_leaves_silence_alone():
+    quiet = pcm(silence(0.5))
+    assert np.array_equal(clean_pcm(quiet, RATE), quiet)
+
+
+def dominant_frequency(samples) -> float:
+    spectrum = np.abs(np.fft.rfft(np.asarray(samples, dtype=np.float64)))
+    return np.fft.rfftfreq(len(samples), 1 / RATE)[np.argmax(spectrum)]
+
+
+@pytest.mark.parametrize("speed", [0.5, 0.75, 1.25, 2.0])
+def test_time_stretch_changes_length_not_pitch(speed):
+    samples = pcm(tone(1.0))
+    stretched = time_stretch(samples, RATE, speed)
+    assert stretched.dtype == np.dtype("<i2")
+    assert len(stretched) == round(len(samples) / speed)
+    middle = stretched[len(stretched) // 4:-len(stretched) // 4]
+    assert dominant_frequency(middle) == pytest.approx(220, abs=5)
+
+
+def test_time_stretch_at_normal_speed():
+    samples = pcm(tone(0.2))
+    assert np.array_equal(time_stretch(samples, RATE, 1.0), samples)
+    assert len(time_stretch(samples[:0], RATE, 0.75)) == 0
+
+
+def test_stretch_wav_writes_each_speed(tmp_path):
+    pytest.importorskip("soundfile")
+    wav = tmp_path / "chat_word.wav"
+    write_wav(wav, pcm(tone(0.6)), RATE)
+
+    variants = stretch_wav(wav, [0.75, 1.25], ["opus"])
+    assert list(variants) == [0.75, 1.25]
+    for speed, formats in variants.items():
+        assert formats["wav"] == speed_variant_path(wav, speed) == tmp_path / f"chat_word_{speed:g}x.wav"
+        assert formats["opus"].exists()
+        samples, rate = read_wav(formats["wav"])
+        assert (len(samples), rate) == (round(0.6 * RATE / speed), RATE)
+
+
+@pytest.mark.parametrize("chunk", [1000, 4096, 1 << 16])
+def test_clean_wav_in_chunks_matches_clean_pcm(tmp_path, monkeypatch, chunk):
+    monkeypatch.setattr(audio_processing, "CLEAN_CHUNK", chunk)
+    samples = pcm(silence(0.3), tone(0.4, 0.05), silence(0.2), tone(0.3, 0.2), silence(0.4))
+    raw = tmp_path / "raw.wav"
+    write_wav(raw, samples, RATE)
+
+    before, after = clean_wav(raw, dest_path=tmp_path / "chat.wav")
+    cleaned, rate = read_wav(tmp_path / "chat.wav")
+    assert rate == RATE
+    assert np.array_equal(cleaned, clean_pcm(samples, RATE))
+    assert (before, after) == (len(samples) / RATE, len(cleaned) / RATE)
+    # The source is left as it was
+    assert np.array_equal(read_wav(raw)[0], samples)
+
+
+def test_clean_wav_in_place_and_of_silence(tmp_path):
+    wav = tmp_path / "chat.wav"
+    write_wav(wav, pcm(silence(0.2), tone(0.3), silence(0.2)), RATE)
+    before, after = clean_wav(wav)
+    assert after < before
+    assert len(read_wav(wav)[0]) == round(after * RATE)
+
+    quiet = tmp_path / "quiet.wav"
+    write_wav(quiet, pcm(silence(0.3)), RATE)
+    assert clean_wav(quiet, dest_path=tmp_path / "copy.wav") == (0.3, 0.3)
+    assert (tmp_path / "copy.wav").read_bytes() == quiet.read_bytes()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["chat.wav", "copy.wav", "quiet.wav"]
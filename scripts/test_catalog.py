@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from catalog import CATALOG_NAME, PRECACHE_NAME, build_catalog
+
+WEEKS = [{"sounds": "ou", "path": "ou", "week_start": "2026-01-05", "language": "fr"}]
+
+
+@pytest.fixture
+def public(tmp_path):
+    week_dir = tmp_path / "public" / "ou"
+    (week_dir / "audio").mkdir(parents=True)
+    (week_dir / "images").mkdir()
+    (week_dir / "audio" / "loup_word.opus").write_bytes(b"opus v1")
+    (week_dir / "images" / "loup.png").write_bytes(b"png")
+    (week_dir / "images" / "loup_512.webp").write_bytes(b"webp")
+    manifest = {
+        "generatedAt": "2026-01-05T10:00:00",
+        "words": [{
+            "id": "loup",
+            "text": "loup",
+            "audioWord": "/ou/audio/loup_word.opus",
+            "image": "/ou/images/loup.png",
+            "imageSrcset": {"webp": {"512": "/ou/images/loup_512.webp"}},
+            "provenance": {"audioWord": "abc"},
+        }],
+    }
+    (week_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    return tmp_path / "public"
+
+
+def load(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def static_names(public) -> list[str]:
+    return sorted(p.name for p in (public / "static").iterdir() if not p.name.startswith("."))
+
+
+def test_catalog_and_precache(public):
+    stats = build_catalog(public, WEEKS)
+    catalog = load(public / CATALOG_NAME)
+    word = catalog["weeks"][0]["words"][0]
+    assert "provenance" not in word
+    assert word["audioWord"].startswith("/static/loup_word.") and word["audioWord"].endswith(".opus")
+    assert (public / word["audioWord"].lstrip("/")).read_bytes() == b"opus v1"
+    assert os.path.samefile(public / word["audioWord"].lstrip("/"), public / "ou" / "audio" / "loup_word.opus")
+    assert json.loads(gzip.decompress((public / (CATALOG_NAME + ".gz")).read_bytes())) == catalog
+
+    precache = load(public / PRECACHE_NAME)
+    assert precache["core"] == [{"url": f"/{CATALOG_NAME}", "revision": catalog["version"]}]
+    assert precache["assets"] == {
+        "opus": [word["audioWord"]],
+        "png": [word["image"]],
+        "webp@512": [word["imageSrcset"]["webp"]["512"]],
+    }
+    assert (stats["assets"], stats["hashed"], stats["removed"]) == (3, 3, 0)
+
+
+def test_content_change_changes_fingerprint_and_prunes_the_old_copy(public):
+    build_catalog(public, WEEKS)
+    old_url = load(public / CATALOG_NAME)["weeks"][0]["words"][0]["audioWord"]
+    old_version = load(public / CATALOG_NAME)["version"]
+
+    clip = public / "ou" / "audio" / "loup_word.opus"
+    clip.unlink()  # replaced, as the generator does, not edited in place
+    clip.write_bytes(b"opus v2")
+    stats = build_catalog(public, WEEKS)
+
+    catalog = load(public / CATALOG_NAME)
+    new_url = catalog["weeks"][0]["words"][0]["audioWord"]
+    assert new_url != old_url
+    assert catalog["version"] != old_version
+    assert (public / new_url.lstrip("/")).read_bytes() == b"opus v2"
+    assert not (public / old_url.lstrip("/")).exists()
+    assert new_url in load(public / PRECACHE_NAME)["assets"]["opus"]
+    assert (stats["hashed"], stats["linked"], stats["removed"]) == (1, 1, 1)
+    assert len(static_names(public)) == 3
+
+
+def test_unchanged_rebuild_reads_nothing(public):
+    build_catalog(public, WEEKS)
+    written = (public / CATALOG_NAME).stat().st_mtime_ns
+    stats = build_catalog(public, WEEKS)
+    assert (stats["hashed"], stats["linked"], stats["removed"]) == (0, 0, 0)
+    assert (public / CATALOG_NAME).stat().st_mtime_ns == written
@@ -0,0 +1,204 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+Image = pytest.importorskip("PIL.Image")
+
+import generate_assets as ga
+from asset_cache import AssetCache, cache_key
+from audio_processing import write_wav
+
+RATE = 24000
+HOUR = 3600
+
+
+def tone(seconds: float):
+    t = np.arange(round(seconds * RATE)) / RATE
+    return np.round(0.5 * np.sin(2 * np.pi * 220 * t) * 32767).astype("<i2")
+
+
+def set_age(path, seconds: float) -> None:
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def week(tmp_path, monkeypatch):
+    """A week directory, and a cache holding an old blob of the clip and image."""
+    monkeypatch.setattr(ga, "PUBLIC_DIR", tmp_path / "public")
+    cache = AssetCache(tmp_path / "cache")
+
+    clip = cache.path(cache_key(text="chat v1"), ".wav")
+    clip.parent.mkdir(parents=True, exist_ok=True)
+    write_wav(clip, tone(0.5), RATE)
+    image = cache.path(cache_key(text="chat v1"), ".png")
+    image.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (200, 100), "red").save(image)
+    for blob in (clip, image):
+        set_age(blob, 2 * HOUR)
+
+    week_dir = ga.PUBLIC_DIR / "wk"
+    (week_dir / "audio").mkdir(parents=True)
+    (week_dir / "images").mkdir()
+    return week_dir, cache, clip, image
+
+
+def test_variants_of_a_clip_restored_from_an_older_blob(week, monkeypatch):
+    week_dir, cache, blob, _ = week
+    monkeypatch.setattr(ga, "audio_formats", ["opus"])
+    monkeypatch.setattr(ga, "audio_speeds", [0.75])
+    audio_dir = week_dir / "audio"
+    wav = audio_dir / "chat_word.wav"
+    entry = {"text": "chat", "audioWord": "/wk/audio/chat_word.wav"}
+
+    # A newer clip, with its variants
+    write_wav(wav, tone(1.0), RATE)
+    set_age(wav, HOUR)
+    ga.collect_audio_encodes(entry, "wk", ga.submit_audio_encodes(entry, audio_dir))
+    ga.collect_speed_variants(entry, "wk", ga.submit_speed_variants(entry, audio_dir))
+
+    # The run goes back to the first clip, served by the cache with its old mtime
+    cache.link(blob, wav)
+    assert wav.stat().st_mtime < (audio_dir / "chat_word.opus").stat().st_mtime
+    ga.collect_audio_encodes(entry, "wk", ga.submit_audio_encodes(entry, audio_dir, refresh=["audioWord"]))
+    ga.collect_speed_variants(entry, "wk", ga.submit_speed_variants(entry, audio_dir, refresh=["audioWord"]))
+
+    assert sf.info(str(audio_dir / "chat_word.opus")).duration == pytest.approx(0.5, abs=0.05)
+    stretched = sf.info(str(audio_dir / "chat_word_0.75x.wav"))
+    assert stretched.duration == pytest.approx(0.5 / 0.75, abs=0.01)
+
+
+def test_variants_of_an_image_restored_from_an_older_blob(week, monkeypatch):
+    week_dir, cache, _, blob = week
+    monkeypatch.setattr(ga, "image_formats", ["webp"])
+    monkeypatch.setattr(ga, "image_widths", [64])
+    images_dir = week_dir / "images"
+    png = images_dir / "chat.png"
+    entry = {"text": "chat", "image": "/wk/images/chat.png"}
+
+    Image.new("RGB", (100, 100), "blue").save(png)
+    set_age(png, HOUR)
+    ga.collect_image_variants(entry, "wk", ga.submit_image_variants(entry, images_dir))
+    with Image.open(images_dir / "chat_64.webp") as variant:
+        assert variant.size == (64, 64)
+
+    cache.link(blob, png)
+    ga.collect_image_variants(entry, "wk", ga.submit_image_variants(entry, images_dir, refresh=True))
+    with Image.open(images_dir / "chat_64.webp") as variant:
+        assert variant.size == (64, 32)
+        assert variant.convert("RGB").getpixel((32, 16))[0] > 200
+
+
+def test_sprite_rebuilt_for_a_clip_restored_from_an_older_blob(week):
+    week_dir, cache, blob, _ = week
+    wav = week_dir / "audio" / "chat_word.wav"
+    entry = {"text": "chat", "audioWord": "/wk/audio/chat_word.wav", "provenance": {"audioWord": "v2"}}
+
+    write_wav(wav, tone(1.0), RATE)
+    set_age(wav, HOUR)
+    ga.build_week_sprite("wk", [entry])
+    assert entry["spriteClips"]["audioWord"]["duration"] == 1.0
+    assert entry["provenance"]["spriteClips"] == {"audioWord": "v2"}
+
+    # Unchanged: the sprite is kept as it is
+    sprite = week_dir / "audio" / ga.SPRITE_NAME
+    built = sprite.stat().st_mtime_ns
+    ga.build_week_sprite("wk", [entry], reuse=True)
+    assert sprite.stat().st_mtime_ns == built
+
+    cache.link(blob, wav)
+    entry["provenance"]["audioWord"] = "v1"
+    ga.build_week_sprite("wk", [entry], reuse=True)
+    assert entry["spriteClips"]["audioWord"]["duration"] == 0.5
+    assert entry["provenance"]["spriteClips"] == {"audioWord": "v1"}
+    assert sf.info(str(sprite)).duration == pytest.approx(0.5 + 2 * ga.SPRITE_GAP)
+
+
+def test_verify_repair_deletes_only_broken_files_and_their_blobs(tmp_path, monkeypatch):
+    from test_integrity import break_webp, make_png, make_wav, make_webp, truncate
+
+    monkeypatch.setattr(ga, "PUBLIC_DIR", tmp_path / "public")
+    week_dir = ga.PUBLIC_DIR / "wk"
+    (week_dir / "audio").mkdir(parents=True)
+    (week_dir / "images").mkdir()
+    (week_dir / "words_of_week.txt").write_text("chat\nchien\n", encoding="utf-8")
+    cache = AssetCache(tmp_path / "cache")
+
+    blobs = {}
+    for word in ("chat", "chien"):
+        for name, make in ((f"audio/{word}_word.wav", make_wav), (f"images/{word}.png", make_png)):
+            blob = cache.path(cache_key(file=name), Path(name).suffix)
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            make(blob)
+            cache.link(blob, week_dir / name)
+            blobs[name] = blob
+        make_webp(week_dir / "images" / f"{word}_512.webp")
+    truncate(blobs["audio/chat_word.wav"])
+    truncate(blobs["images/chat.png"])
+    break_webp(week_dir / "images" / "chat_512.webp")
+    manifest = {"words": [
+        {
+            "text": word,
+            "audioWord": f"/wk/audio/{word}_word.wav",
+            "image": f"/wk/images/{word}.png",
+            "imageSrcset": {"webp": {"512": f"/wk/images/{word}_512.webp"}},
+        }
+        for word in ("chat", "chien")
+    ]}
+    (week_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    repaired = []
+    monkeypatch.setattr(ga, "run_generate", repaired.append)
+    args = ga.build_parser().parse_args([
+        "verify", "--repair", "--weeks", "wk", "--cache-dir", str(cache.root), "--audio-cleanup", "--workers", "1",
+    ])
+    ga.run_verify(args)
+
+    remaining = sorted(p.relative_to(week_dir).as_posix() for p in week_dir.glob("*/*"))
+    assert remaining == ["audio/chien_word.wav", "images/chien.png", "images/chien_512.webp"]
+    assert not blobs["audio/chat_word.wav"].exists()
+    assert not blobs["images/chat.png"].exists()
+    assert blobs["audio/chien_word.wav"].exists() and blobs["images/chien.png"].exists()
+
+    # The affected week is regenerated with the options verify was given
+    assert [(args.weeks, args.audio_cleanup, args.plan) for args in repaired] == [("wk", True, False)]
+
+
+def test_verify_without_repair_changes_nothing(tmp_path, monkeypatch):
+    from test_integrity import make_png, truncate
+
+    monkeypatch.setattr(ga, "PUBLIC_DIR", tmp_path / "public")
+    week_dir = ga.PUBLIC_DIR / "wk"
+    (week_dir / "images").mkdir(parents=True)
+    make_png(week_dir / "images" / "chat.png")
+    truncate(week_dir / "images" / "chat.png")
+    manifest = {"words": [{"text": "chat", "image": "/wk/images/chat.png"}]}
+    (week_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    monkeypatch.setattr(ga, "run_generate", pytest.fail)
+
+    with pytest.raises(SystemExit) as exit_info:
+        ga.run_verify(ga.build_parser().parse_args(["verify", "--weeks", "wk", "--workers", "1"]))
+    assert exit_info.value.code == 1
+    assert (week_dir / "images" / "chat.png").exists()
+
+
+def test_plan_and_status_do_not_create_the_registry(tmp_path, monkeypatch, capsys):
+    public = tmp_path / "public"
+    (public / "wk").mkdir(parents=True)
+    (public / "wk" / "words_of_week.txt").write_text("chat\nchien\n", encoding="utf-8")
+    monkeypatch.setattr(ga, "PUBLIC_DIR", public)
+    monkeypatch.setattr(ga, "METADATA_FILE", public / "metadata.yaml")
+    monkeypatch.setattr(ga, "REGISTRY_FILE", str(tmp_path / "registry.sqlite"))
+    monkeypatch.setattr(ga, "registry", None)
+    monkeypatch.setattr(ga, "registry_readonly", False)
+
+    ga.main(["plan", "--weeks", "wk"])
+    ga.main(["status"])
+    assert "No registry yet" in capsys.readouterr().out
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["public"]
+    assert sorted(p.name for p in (public / "wk").iterdir()) == ["words_of_week.txt"]
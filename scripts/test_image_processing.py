@@ -0,0 +1,68 @@
+import base64
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from image_processing import PLACEHOLDER_SIZE, available_image_formats, image_placeholder, optimize_image, variant_path
+
+
+def make_image(path, size=(300, 200)):
+    image = Image.new("RGB", size, "white")
+    image.paste((200, 30, 30), (0, 0, size[0] // 2, size[1]))
+    image.save(path)
+    return path
+
+
+@pytest.mark.parametrize("fmt", ["webp", "avif"])
+def test_variants_keep_the_aspect_ratio(tmp_path, fmt):
+    if not available_image_formats([fmt]):
+        pytest.skip(f"Pillow can't write {fmt}")
+    src = make_image(tmp_path / "chat.png")
+
+    variants = optimize_image(src, [64, 128], [fmt])
+    assert variants == {fmt: {64: variant_path(src, 64, fmt), 128: variant_path(src, 128, fmt)}}
+    for width, path in variants[fmt].items():
+        with Image.open(path) as variant:
+            assert variant.format == fmt.upper()
+            assert variant.size == (width, round(200 * width / 300))
+            # Left half red, right half white, as in the source
+            rgb = variant.convert("RGB")
+            assert rgb.getpixel((width // 8, 5))[1] < 100
+            assert min(rgb.getpixel((width - width // 8, 5))) > 200
+
+
+def test_widths_larger_than_the_source_are_skipped(tmp_path):
+    src = make_image(tmp_path / "chat.png")
+    assert list(optimize_image(src, [256, 512], ["webp"])["webp"]) == [256]
+    # Every width too large: the source width is used instead
+    assert list(optimize_image(src, [512, 1024], ["webp"])["webp"]) == [300]
+    with Image.open(variant_path(src, 300, "webp")) as variant:
+        assert variant.size == (300, 200)
+
+
+def test_fresh_variants_are_kept_unless_forced(tmp_path):
+    src = make_image(tmp_path / "chat.png")
+    path = optimize_image(src, [64], ["webp"])["webp"][64]
+    written = path.stat().st_mtime_ns
+    optimize_image(src, [64], ["webp"])
+    assert path.stat().st_mtime_ns == written
+    optimize_image(src, [64], ["webp"], force=True)
+    assert path.stat().st_mtime_ns != written
+
+
+@pytest.mark.parametrize("size, thumb", [((300, 200), (32, 21)), ((200, 400), (16, 32)), ((20, 10), (20, 10))])
+def test_placeholder(tmp_path, size, thumb):
+    src = make_image(tmp_path / "chat.png", size)
+    placeholder = image_placeholder(src)
+    assert (placeholder["width"], placeholder["height"]) == size
+    assert placeholder["color"] in ("#ffffff", "#c81e1e")
+
+    prefix = "data:image/webp;base64,"
+    assert placeholder["src"].startswith(prefix)
+    data = base64.b64decode(placeholder["src"][len(prefix):])
+    assert len(data) < 1024
+    with Image.open(io.BytesIO(data)) as preview:
+        assert preview.size == thumb
+        assert max(preview.size) <= PLACEHOLDER_SIZE
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from audio_processing import write_wav
+from integrity import check_file, verify_week
+
+
+def make_wav(path):
+    write_wav(path, np.zeros(2400, dtype="<i2"), 24000)
+
+
+def make_png(path):
+    Image.new("RGB", (64, 48), "green").save(path)
+
+
+def make_webp(path):
+    Image.new("RGB", (64, 48), "green").save(path, format="WEBP")
+
+
+def truncate(path):
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) // 2])
+
+
+def break_webp(path):
+    data = bytearray(path.read_bytes())
+    data[12:16] = b"XXXX"
+    path.write_bytes(bytes(data))
+
+
+@pytest.mark.parametrize("name, make", [("a.wav", make_wav), ("a.png", make_png), ("a.webp", make_webp)])
+def test_whole_files_pass(tmp_path, name, make):
+    make(tmp_path / name)
+    assert check_file(tmp_path / name) is None
+
+
+@pytest.mark.parametrize("name, make, damage, problem", [
+    ("a.wav", make_wav, truncate, "truncated"),
+    ("a.png", make_png, truncate, "truncated"),
+    ("a.webp", make_webp, break_webp, "unknown WebP chunk"),
+])
+def test_damaged_files_are_reported(tmp_path, name, make, damage, problem):
+    path = tmp_path / name
+    make(path)
+    damage(path)
+    assert problem in check_file(path)
+
+
+def test_empty_file(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"")
+    assert check_file(tmp_path / "a.png") == "empty file"
+
+
+def test_verify_week(tmp_path):
+    week_dir = tmp_path / "wk"
+    (week_dir / "audio").mkdir(parents=True)
+    (week_dir / "images").mkdir()
+    (week_dir / "words_of_week.txt").write_text("chat\nchien\nloup\n", encoding="utf-8")
+    make_wav(week_dir / "audio" / "chat_word.wav")
+    make_png(week_dir / "images" / "chat.png")
+    truncate(week_dir / "images" / "chat.png")
+    make_webp(week_dir / "images" / "chat_512.webp")
+    make_png(week_dir / "images" / "old.png")
+    manifest = {"words": [
+        {
+            "text": "chat",
+            "audioWord": "/wk/audio/chat_word.wav",
+            "image": "/wk/images/chat.png",
+            "imageSrcset": {"webp": {"512": "/wk/images/chat_512.webp"}},
+        },
+        {"text": "chien", "audioWord": "/wk/audio/chien_word.wav"},
+        {"text": "ours", "image": "/wk/images/chat.png"},
+    ]}
+    (week_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    report = verify_week(tmp_path, "wk")
+    assert report["files"] == 3
+    assert list(report["broken"]) == ["images/chat.png"]
+    assert report["missing"] == {"audio/chien_word.wav": "chien: audioWord"}
+    assert report["orphans"] == ["images/old.png"]
+    assert report["unlisted"] == ["loup"]
+    assert report["dropped"] == ["ours"]
+    assert report["repair"] == {"chat": ["image"], "chien": ["audioWord"], "ours": ["image"]}
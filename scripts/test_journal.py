@@ -0,0 +1,58 @@
+import json
+
+from journal import WeekJournal
+
+
+def test_replay_applies_steps_in_order(tmp_path):
+    journal = WeekJournal(tmp_path)
+    journal.record("chat", {"sentence": "Le chat dort."}, {"sentence": "a"})
+    journal.record("chat", {"audioWord": "/wk/audio/chat_word.wav"}, {"audioWord": "b"})
+    journal.record("chien", {"sentence": "Le chien court."})
+
+    entries = {"chat": {"id": "chat", "text": "chat", "image": "/wk/images/chat.png"}}
+    assert journal.replay(entries) == 3
+    assert entries["chat"] == {
+        "id": "chat",
+        "text": "chat",
+        "image": "/wk/images/chat.png",
+        "sentence": "Le chat dort.",
+        "audioWord": "/wk/audio/chat_word.wav",
+        "provenance": {"sentence": "a", "audioWord": "b"},
+    }
+    assert entries["chien"]["sentence"] == "Le chien court."
+
+
+def test_replay_without_journal(tmp_path):
+    entries = {}
+    assert WeekJournal(tmp_path).replay(entries) == 0
+    assert entries == {}
+
+
+def test_replay_truncates_torn_tail(tmp_path):
+    journal = WeekJournal(tmp_path)
+    journal.record("chat", {"sentence": "Le chat dort."})
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"word": "chien", "fields": {"sent')
+
+    entries = {}
+    assert journal.replay(entries) == 1
+    assert list(entries) == ["chat"]
+    assert journal.path.read_bytes().endswith(b"\n")
+
+    # The next step lands on a line of its own and survives the next replay
+    journal.record("chien", {"sentence": "Le chien court."})
+    lines = journal.path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["word"] for line in lines] == ["chat", "chien"]
+
+    entries = {}
+    assert journal.replay(entries) == 2
+    assert entries["chien"]["sentence"] == "Le chien court."
+
+
+def test_clear(tmp_path):
+    journal = WeekJournal(tmp_path)
+    journal.record("chat", {"sentence": "Le chat dort."})
+    assert journal.exists()
+    journal.clear()
+    assert not journal.exists()
+    journal.clear()
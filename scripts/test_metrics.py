@@ -0,0 +1,19 @@
+import pytest
+
+from metrics import percentile
+
+
+@pytest.mark.parametrize("fraction, expected", [(0.0, 1), (0.1, 1), (0.5, 5), (0.51, 6), (0.95, 10), (1.0, 10)])
+def test_percentile_nearest_rank(fraction, expected):
+    assert percentile(list(range(10, 0, -1)), fraction) == expected
+
+
+def test_percentile_single_value():
+    assert percentile([3.5], 0.5) == 3.5
+    assert percentile([3.5], 0.99) == 3.5
+
+
+def test_percentile_small_list_median_is_lower_value():
+    # ceil(0.5 * 2) - 1 = 0: the 50th percentile of two values is the lower one
+    assert percentile([2.0, 1.0], 0.5) == 1.0
+    assert percentile([2.0, 1.0], 0.9) == 2.0
@@ -0,0 +1,108 @@
+import pytest
+
+import rate_limiter
+from rate_limiter import MIN_RATE_FRACTION, TokenBucket, is_quota_error
+
+
+class FakeClock:
+    """Stands in for time.monotonic() and time.sleep() in rate_limiter."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_unlimited_bucket_never_waits(clock):
+    bucket = TokenBucket("text", None)
+    assert [bucket.acquire() for _ in range(100)] == [0.0] * 100
+    assert bucket.calls == 100
+    assert clock.slept == []
+
+
+def test_burst_then_one_token_per_interval(clock):
+    bucket = TokenBucket("text", 60, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert bucket.calls == 5
+    assert bucket.wait_time == pytest.approx(2.0)
+
+
+def test_tokens_refill_up_to_capacity(clock):
+    bucket = TokenBucket("text", 60, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 3600
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_throttling_halves_the_rate_once_per_interval(clock):
+    bucket = TokenBucket("speech", 60, burst=5)
+    bucket.on_throttled()
+    bucket.on_throttled()  # same burst of 429s
+    assert bucket.rpm == 30
+    assert bucket.throttled == 2
+    assert bucket.tokens == 0.0
+    assert bucket.acquire() == pytest.approx(2.0)
+
+    clock.now += 60
+    for _ in range(10):
+        bucket.on_throttled()
+        clock.now += 60
+    assert bucket.rpm == 60 * MIN_RATE_FRACTION
+
+
+def test_success_recovers_up_to_the_ceiling(clock):
+    bucket = TokenBucket("image", 10)
+    bucket.on_throttled()
+    assert bucket.rpm == 5
+    for _ in range(3):
+        bucket.on_success()
+    assert bucket.rpm == pytest.approx(8)
+    for _ in range(10):
+        bucket.on_success()
+    assert bucket.rpm == 10
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, code=None, status=None):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+@pytest.mark.parametrize("error", [
+    ApiError("rate limited", code=429),
+    ApiError("slow down", status="RESOURCE_EXHAUSTED"),
+    Exception("429 RESOURCE_EXHAUSTED. {'error': {'code': 429}}"),
+    Exception("HTTP Error 429 Too Many Requests"),
+    Exception("Quota exceeded for aiplatform.googleapis.com/online_prediction_requests"),
+])
+def test_quota_errors(error):
+    assert is_quota_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    ApiError("429 in the message, but the code says otherwise", code=500),
+    Exception("Request 84291 failed: invalid argument"),
+    Exception("wrote 4290 bytes, expected 4429"),
+    ValueError("no audio in response"),
+])
+def test_other_errors(error):
+    assert not is_quota_error(error)
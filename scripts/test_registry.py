@@ -0,0 +1,133 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("yaml")
+
+from registry import AssetRegistry
+
+
+@pytest.fixture
+def public(tmp_path):
+    week_dir = tmp_path / "public" / "wk"
+    (week_dir / "audio").mkdir(parents=True)
+    (week_dir / "audio" / "chat_word.wav").write_bytes(b"RIFF")
+    return tmp_path / "public"
+
+
+@pytest.fixture
+def registry(tmp_path, public):
+    return AssetRegistry(tmp_path / "registry.sqlite", public)
+
+
+def entry(word: str, **fields) -> dict:
+    return {"id": word, "text": word, "sentence": f"Le {word}.", **fields}
+
+
+def manifest(*words, generated_at="2026-01-05T10:00:00", **extra) -> dict:
+    return {"generatedAt": generated_at, "words": list(words), **extra}
+
+
+def exported_words(manifest_file) -> list[str]:
+    return [word["text"] for word in json.loads(manifest_file.read_text(encoding="utf-8"))["words"]]
+
+
+def test_manifest_round_trip(registry, public):
+    manifest_file = public / "wk" / "manifest.json"
+    saved = manifest(entry("chat", audioWord="/wk/audio/chat_word.wav", image="/wk/images/chat.png"), sprite={"gap": 0.5})
+    registry.save_manifest(manifest_file, saved)
+
+    assert json.loads(manifest_file.read_text(encoding="utf-8")) == saved
+    status = {row["asset"]: (row["words"], row["present"]) for row in registry.status()}
+    assert status == {"audioSentence": (1, 0), "audioWord": (1, 1), "image": (1, 0), "sentence": (1, 1)}
+    assert registry.missing() == [("wk", "chat", "audioSentence"), ("wk", "chat", "image")]
+
+
+def test_merge_keeps_words_missing_from_the_manifest(registry, public):
+    manifest_file = public / "wk" / "manifest.json"
+    registry.save_manifest(manifest_file, manifest(entry("chat"), entry("chien")))
+
+    # Another run that only knew about "loup" doesn't drop the others
+    registry.save_manifest(manifest_file, manifest(entry("loup")))
+    assert exported_words(manifest_file) == ["loup", "chat", "chien"]
+
+    # Words removed from the list are dropped, the rest are kept
+    registry.save_manifest(manifest_file, manifest(entry("chat", sentence="Le chat dort.")), removed=["chien"])
+    assert exported_words(manifest_file) == ["chat", "loup"]
+    words = json.loads(manifest_file.read_text(encoding="utf-8"))["words"]
+    assert words[0]["sentence"] == "Le chat dort."
+
+
+def test_identical_manifest_is_not_written_again(registry, public):
+    manifest_file = public / "wk" / "manifest.json"
+    registry.save_manifest(manifest_file, manifest(entry("chat")))
+    os.utime(manifest_file, ns=(1_000_000_000, 1_000_000_000))
+    registry.sync_manifest(manifest_file)  # the touch looks like a hand edit
+
+    registry.save_manifest(manifest_file, manifest(entry("chat"), generated_at="2026-02-01T10:00:00"))
+    assert manifest_file.stat().st_mtime_ns == 1_000_000_000
+
+
+def test_hand_edited_manifest_is_imported(registry, public):
+    manifest_file = public / "wk" / "manifest.json"
+    registry.save_manifest(manifest_file, manifest(entry("chat")))
+    edited = manifest(entry("chat", sentence="Le chat joue."))
+    manifest_file.write_text(json.dumps(edited), encoding="utf-8")
+    os.utime(manifest_file, ns=(1_000_000_000, 1_000_000_000))
+
+    registry.sync_manifest(manifest_file)
+    registry.save_manifest(manifest_file, manifest(entry("chien")))
+    words = json.loads(manifest_file.read_text(encoding="utf-8"))["words"]
+    assert [(word["text"], word["sentence"]) for word in words] == [("chien", "Le chien."), ("chat", "Le chat joue.")]
+
+
+def test_metadata_round_trip(registry, public):
+    metadata_file = public / "metadata.yaml"
+    week = {"sounds": "ou", "path": "ou", "week_start": "2026-01-05", "week_end": "2026-01-09", "language": "fr"}
+    assert registry.update_metadata(metadata_file, [week]) == [False]
+    assert registry.metadata(metadata_file) == {"dictee": [week]}
+
+    # Unchanged: metadata.yaml isn't written again
+    exported = metadata_file.stat().st_mtime_ns
+    assert registry.update_metadata(metadata_file, [dict(week)]) == [None]
+    assert metadata_file.stat().st_mtime_ns == exported
+
+    # A hand edit wins
+    metadata_file.write_text(metadata_file.read_text(encoding="utf-8").replace("2026-01-09", "2026-01-10"), encoding="utf-8")
+    assert registry.metadata(metadata_file)["dictee"][0]["week_end"] == "2026-01-10"
+
+
+def test_readonly_without_database(tmp_path, public):
+    path = tmp_path / "registry.sqlite"
+    (public / "metadata.yaml").write_text(
+        "dictee:\n- sounds: ou\n  path: ou\n  week_start: 2026-01-05\n  language: fr\n", encoding="utf-8",
+    )
+    manifest_file = public / "wk" / "manifest.json"
+    manifest_file.write_text(json.dumps(manifest(entry("chat"))), encoding="utf-8")
+
+    registry = AssetRegistry(path, public, readonly=True)
+    assert registry.metadata(public / "metadata.yaml") == {
+        "dictee": [{"sounds": "ou", "path": "ou", "week_start": "2026-01-05", "language": "fr"}],
+    }
+    registry.sync_manifest(manifest_file)
+    assert registry.status() == [] and registry.missing() == []
+    assert list(tmp_path.glob("registry.sqlite*")) == []
+
+
+def test_readonly_never_writes(tmp_path, public, registry):
+    metadata_file = public / "metadata.yaml"
+    manifest_file = public / "wk" / "manifest.json"
+    registry.update_metadata(metadata_file, [{"sounds": "ou", "path": "wk", "week_start": "2026-01-05"}])
+    registry.save_manifest(manifest_file, manifest(entry("chat")))
+    registry.connect().close()
+    before = (tmp_path / "registry.sqlite").read_bytes()
+
+    # Hand edits are read from the files, not imported
+    manifest_file.write_text(json.dumps(manifest(entry("chien"))), encoding="utf-8")
+    metadata_file.write_text("dictee:\n- sounds: eu\n", encoding="utf-8")
+    readonly = AssetRegistry(tmp_path / "registry.sqlite", public, readonly=True)
+    readonly.sync_manifest(manifest_file)
+    assert readonly.metadata(metadata_file) == {"dictee": [{"sounds": "eu"}]}
+    assert {row[1] for row in readonly.missing()} == {"chat"}
+    assert (tmp_path / "registry.sqlite").read_bytes() == before
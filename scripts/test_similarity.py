@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import similarity
+from similarity import edit_distances
+
+
+def levenshtein(a: str, b: str) -> int:
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        row = [i]
+        for j, cb in enumerate(b, 1):
+            row.append(min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = row
+    return prev[-1]
+
+
+def check(words):
+    distances = edit_distances(words)
+    assert distances.shape == (len(words), len(words))
+    for i, a in enumerate(words):
+        for j, b in enumerate(words):
+            assert distances[i, j] == levenshtein(a, b), (a, b)
+
+
+def test_edit_distances_known_pairs():
+    check(["chat", "chien", "chats", "", "kitten", "sitting", "été", "ete", "a"])
+
+
+def test_edit_distances_random_words():
+    rng = random.Random(4)
+    check(["".join(rng.choice("abcé") for _ in range(rng.randint(0, 9))) for _ in range(40)])
+
+
+def test_edit_distances_in_blocks(monkeypatch):
+    # Several blocks of rows must give the same result as one
+    monkeypatch.setattr(similarity, "BLOCK_PAIRS", 10)
+    rng = random.Random(7)
+    check(["".join(rng.choice("xyz") for _ in range(rng.randint(0, 6))) for _ in range(12)])
+
+
+def test_edit_distances_empty():
+    assert edit_distances([]).shape == (0, 0)
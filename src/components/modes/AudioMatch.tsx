@@ -40,8 +40,15 @@ export default function AudioMatch({
   };
 
   useEffect(() => {
-    // Generate 3 options: correct word + 2 random distractors
-    const distractors = getRandomWords(allWords, 2, word.text);
+    // Generate 3 options: correct word + 2 distractors, from the words
+    // closest in spelling when the manifest has them, else at random
+    const confusables = shuffleArray(
+      (word.confusables ?? []).slice(0, 4).filter(text => text !== word.text)
+    ).slice(0, 2);
+    const distractors = [
+      ...confusables,
+      ...getRandomWords(allWords.filter(w => !confusables.includes(w.text)), 2 - confusables.length, word.text),
+    ];
     const allOptions = shuffleArray([word.text, ...distractors]);
     setOptions(allOptions);
     setSelected(null);
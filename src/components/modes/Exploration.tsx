@@ -1,9 +1,24 @@
 import { useState } from 'react';
-import { Word } from '../../types';
+import { ImageFormat, ImageSizes, Word } from '../../types';
 import { useSpeech } from '../../hooks/useSpeech';
 import { useLanguage } from '../../i18n/LanguageContext';
 import StarCounter from '../common/StarCounter';
 
+// Best format first; the browser takes the first <source> it supports
+const IMAGE_SOURCE_TYPES: [ImageFormat, string][] = [
+  ['avif', 'image/avif'],
+  ['webp', 'image/webp'],
+];
+
+// The card is at most max-w-md wide
+const IMAGE_SIZES = '(min-width: 480px) 448px, 90vw';
+
+function toSrcSet(sizes: ImageSizes): string {
+  return Object.entries(sizes)
+    .map(([width, path]) => `${path} ${width}w`)
+    .join(', ');
+}
+
 interface ExplorationProps {
   word: Word;
   allWords: Word[];
@@ -26,6 +41,7 @@ export default function Exploration({
   const { speak, speakAudio, speaking } = useSpeech(language);
   const [imageLoaded, setImageLoaded] = useState(false);
   const [imageError, setImageError] = useState(false);
+  const placeholder = word.imagePlaceholder;
 
   const playWord = () => {
     if (word.audioWord) {
@@ -92,21 +108,40 @@ export default function Exploration({
 
           {/* Image */}
           {word.image && !imageError && (
-            <div className="relative mb-4 rounded-2xl overflow-hidden bg-orange-100">
-              {!imageLoaded && (
+            <div
+              className="relative mb-4 rounded-2xl overflow-hidden bg-orange-100"
+              style={placeholder ? { backgroundColor: placeholder.color } : undefined}
+            >
+              {!imageLoaded && placeholder && (
+                <div
+                  className="absolute inset-0 bg-cover bg-center blur-lg scale-110"
+                  style={{ backgroundImage: `url(${placeholder.src})` }}
+                />
+              )}
+              {!imageLoaded && !placeholder && (
                 <div className="absolute inset-0 flex items-center justify-center">
                   <span className="text-4xl animate-pulse">🖼️</span>
                 </div>
               )}
-              <img
-                src={word.image}
-                alt={word.text}
-                className={`w-full object-contain transition-opacity duration-300 ${
-                  imageLoaded ? 'opacity-100' : 'opacity-0'
-                }`}
-                onLoad={() => setImageLoaded(true)}
-                onError={() => setImageError(true)}
-              />
+              <picture>
+                {IMAGE_SOURCE_TYPES.map(([format, type]) => {
+                  const sizes = word.imageSrcset?.[format];
+                  return sizes ? (
+                    <source key={format} type={type} srcSet={toSrcSet(sizes)} sizes={IMAGE_SIZES} />
+                  ) : null;
+                })}
+                <img
+                  src={word.image}
+                  alt={word.text}
+                  width={placeholder?.width}
+                  height={placeholder?.height}
+                  className={`relative w-full h-auto object-contain transition-opacity duration-300 ${
+                    imageLoaded ? 'opacity-100' : 'opacity-0'
+                  }`}
+                  onLoad={() => setImageLoaded(true)}
+                  onError={() => setImageError(true)}
+                />
+              </picture>
             </div>
           )}
 
@@ -54,7 +54,7 @@ export default function LettresPerdues({
 
   useEffect(() => {
     const numMissing = word.text.length > 4 ? 2 : 1;
-    const generated = generateMissingLetters(word.text, numMissing, language);
+    const generated = generateMissingLetters(word.text, numMissing, language, word.blanks);
     setPuzzle(generated);
 
     // Initialize empty slots
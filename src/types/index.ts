@@ -1,3 +1,48 @@
+export type AudioFormat = 'opus' | 'mp3' | 'wav';
+
+export type AudioVariants = Partial<Record<AudioFormat, string>>;
+
+export type ImageFormat = 'avif' | 'webp';
+
+// Width in pixels (as a string key) -> path
+export type ImageSizes = Record<string, string>;
+
+// Offsets of a clip inside the week's audio sprite, in seconds
+export interface SpriteClip {
+  start: number;
+  duration: number;
+}
+
+// What the client paints while an image loads
+export interface ImagePlaceholder {
+  width: number;
+  height: number;
+  color: string; // Dominant colour, "#rrggbb"
+  src: string;   // Tiny blurred WebP as a data: URL
+}
+
+// Size and content hash of a file, plus duration and sample rate for audio
+export interface MediaInfo {
+  bytes: number;
+  hash: string;
+  durationMs?: number;
+  sampleRate?: number;
+}
+
+export type AudioMedia = Partial<Record<AudioFormat, MediaInfo>>;
+
+export interface AudioSprite {
+  formats: AudioVariants;
+  gap: number;
+  media?: { formats?: AudioMedia };
+}
+
+// One asset in a week's prefetch order
+export interface PreloadItem {
+  word: string;
+  asset: 'audioWord' | 'audioSentence' | 'image';
+}
+
 export interface Word {
   id: string;
   text: string;
@@ -5,6 +50,36 @@ export interface Word {
   audioWord?: string;    // Path to word audio file
   audioSentence?: string; // Path to sentence audio file
   image?: string;         // Path to image file
+  audioFormats?: {        // Every encoded variant of each clip, by format
+    audioWord?: AudioVariants;
+    audioSentence?: AudioVariants;
+  };
+  audioSpeeds?: {         // Time-stretched copies of each clip, by playback speed ("0.75", "1", ...)
+    audioWord?: Record<string, AudioVariants>;
+    audioSentence?: Record<string, AudioVariants>;
+  };
+  imageSrcset?: Partial<Record<ImageFormat, ImageSizes>>; // Resized image variants
+  imagePlaceholder?: ImagePlaceholder; // Size and preview of the image, available before it loads
+  spriteClips?: {         // Where each clip sits in the week's audio sprite
+    audioWord?: SpriteClip;
+    audioSentence?: SpriteClip;
+  };
+  confusables?: string[]; // Words closest in spelling across weeks, best first (Audio-Match distractors)
+  blanks?: number[][];    // Groups of letter indices to blank, best first (Lettres Perdues)
+  media?: {               // MediaInfo of every file above, in the same layout
+    audioWord?: MediaInfo;
+    audioSentence?: MediaInfo;
+    image?: MediaInfo;
+    audioFormats?: {
+      audioWord?: AudioMedia;
+      audioSentence?: AudioMedia;
+    };
+    audioSpeeds?: {
+      audioWord?: Record<string, AudioMedia>;
+      audioSentence?: Record<string, AudioMedia>;
+    };
+    imageSrcset?: Partial<Record<ImageFormat, Record<string, MediaInfo>>>;
+  };
 }
 
 export interface WordProgress {
@@ -38,6 +113,8 @@ export type SupportedLanguage = 'fr' | 'en';
 export interface WordManifest {
   generatedAt: string;
   words: Word[];
+  sprite?: AudioSprite;
+  preload?: PreloadItem[]; // First words' audio, then their images, then the rest
 }
 
 export interface WeekEntry {
@@ -53,3 +130,24 @@ export interface WeekEntry {
 export interface DicteeMetadata {
   dictee: WeekEntry[];
 }
+
+// public/catalog.json: every week's words, with content-hashed asset URLs
+export interface CatalogWeek extends Partial<WeekEntry> {
+  path: string;
+  generatedAt?: string;
+  words: Word[];
+  sprite?: AudioSprite;
+  preload?: PreloadItem[];
+}
+
+export interface Catalog {
+  version: string;
+  weeks: CatalogWeek[];
+}
+
+// public/precache.json: what a service worker can cache for offline use
+export interface PrecacheManifest {
+  version: string;
+  core: { url: string; revision: string }[];
+  assets: Record<string, string[]>; // "opus", "mp3", "webp@512", ... -> URLs
+}
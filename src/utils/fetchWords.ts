@@ -1,4 +1,41 @@
-import { Word, WordManifest } from '../types';
+import { AudioFormat, AudioVariants, Word, WordManifest } from '../types';
+
+// Smallest first; WAV is always playable
+const AUDIO_MIME_TYPES: [AudioFormat, string][] = [
+  ['opus', 'audio/ogg; codecs=opus'],
+  ['mp3', 'audio/mpeg'],
+];
+
+let supportedFormats: AudioFormat[] | null = null;
+
+function getSupportedFormats(): AudioFormat[] {
+  if (supportedFormats === null) {
+    const probe = typeof Audio !== 'undefined' ? new Audio() : null;
+    supportedFormats = AUDIO_MIME_TYPES
+      .filter(([, mime]) => probe?.canPlayType(mime))
+      .map(([format]) => format);
+  }
+  return supportedFormats;
+}
+
+function pickAudio(fallback: string | undefined, variants?: AudioVariants): string | undefined {
+  if (!variants) return fallback;
+  const format = getSupportedFormats().find(f => variants[f]);
+  return format ? variants[format] : fallback;
+}
+
+/**
+ * Points audioWord/audioSentence at the smallest encoded variant
+ * this browser can play.
+ */
+function withBestAudio(word: Word): Word {
+  if (!word.audioFormats) return word;
+  return {
+    ...word,
+    audioWord: pickAudio(word.audioWord, word.audioFormats.audioWord),
+    audioSentence: pickAudio(word.audioSentence, word.audioFormats.audioSentence),
+  };
+}
 
 /**
  * Fetches words from the generated manifest file.
@@ -12,7 +49,7 @@ export async function fetchWords(weekPath?: string): Promise<Word[]> {
     const manifestResponse = await fetch(`${base}/manifest.json`);
     if (manifestResponse.ok) {
       const manifest: WordManifest = await manifestResponse.json();
-      return manifest.words;
+      return manifest.words.map(withBestAudio);
     }
   } catch (error) {
     console.log('Manifest not found, falling back to text file');
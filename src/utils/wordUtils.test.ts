@@ -0,0 +1,24 @@
+import { describe, expect, it } from 'vitest';
+import { generateMissingLetters } from './wordUtils';
+
+describe('generateMissingLetters', () => {
+  it('removes whole blank groups when they fit', () => {
+    const result = generateMissingLetters('chou', 2, 'fr', [[2, 3], [0, 1]]);
+    expect(result.displayWord).toBe('ch__');
+    expect(result.missingLetters).toEqual(['o', 'u']);
+  });
+
+  it('never blanks more letters than count', () => {
+    for (let count = 1; count <= 4; count++) {
+      const result = generateMissingLetters('chapeau', count, 'fr', [[4, 5, 6], [0, 1]]);
+      expect(result.missingIndices).toHaveLength(count);
+    }
+    expect(generateMissingLetters('chapeau', 1, 'fr', [[4, 5, 6]]).displayWord).toBe('chap_au');
+    expect(generateMissingLetters('chapeau', 4, 'fr', [[4, 5, 6], [0, 1]]).displayWord).toBe('_hap___');
+  });
+
+  it('keeps a letter visible', () => {
+    const result = generateMissingLetters('chou', 4, 'fr', [[0, 1, 2, 3]]);
+    expect(result.displayWord).toBe('c__u');
+  });
+});
@@ -1,6 +1,7 @@
 import { SupportedLanguage } from '../types';
 
 // Letter patterns to target for missing letter mode, keyed by language
+// (mirrored in scripts/similarity.py)
 const LANGUAGE_PATTERNS: Record<SupportedLanguage, string[]> = {
   fr: ['ou', 'on', 'ch', 'oi', 'an', 'en', 'ai', 'au', 'eau', 'ei', 'eu'],
   en: ['th', 'sh', 'ch', 'ck', 'ee', 'oo', 'ea', 'ou', 'igh', 'ai', 'oa'],
@@ -12,15 +13,30 @@ interface MissingLetterResult {
   missingIndices: number[];
 }
 
-export function generateMissingLetters(word: string, count: number = 1, language: SupportedLanguage = 'fr'): MissingLetterResult {
+export function generateMissingLetters(word: string, count: number = 1, language: SupportedLanguage = 'fr', blanks?: number[][]): MissingLetterResult {
   const letters = word.split('');
   const missingIndices: number[] = [];
   const missingLetters: string[] = [];
 
+  // Precomputed blanks (the week's target graphemes first), each group
+  // removed whole when it fits in count, as long as a letter stays visible
+  for (const group of blanks ?? []) {
+    if (missingIndices.length >= count) break;
+    const fresh = group
+      .filter(i => i >= 0 && i < letters.length && !missingIndices.includes(i))
+      .slice(0, count - missingIndices.length);
+    if (fresh.length === 0 || missingIndices.length + fresh.length >= letters.length) continue;
+    for (const i of fresh) {
+      missingIndices.push(i);
+      missingLetters.push(letters[i]);
+    }
+  }
+
   const patterns = LANGUAGE_PATTERNS[language] ?? LANGUAGE_PATTERNS.fr;
 
   // Try to find and remove language-specific patterns first
   for (const pattern of patterns) {
+    if (missingIndices.length >= count) break;
     const patternIndex = word.toLowerCase().indexOf(pattern);
     if (patternIndex > 0 && patternIndex < word.length - pattern.length) {
       // Found a pattern not at start or end